@@ -1,2 +1,6 @@
 from .genus_innovus import GenusInnovusFlow
-from .yosys_openroad import YosysOpenroadFlow
\ No newline at end of file
+from .yosys_openroad import YosysOpenroadFlow
+from .batch import BatchEvaluator
+from .pareto import ParetoPruner
+from .scheduler import CostModel, JobScheduler
+from .multi_fidelity import MultiFidelityCampaign
@@ -0,0 +1,307 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from utils import mkdir, info, warn, init_worker, create_hash, assert_error, RoutineCheckError
+from .cache import CachedFailureError
+from .scheduler import CostModel, JobScheduler
+
+
+def evaluate_point(
+    flow_class: type,
+    design_config: dict,
+    tech_config: dict,
+    syn_options: dict,
+    pnr_options: dict,
+    rundir: str,
+    flow_kwargs: dict,
+) -> tuple:
+    """
+        Evaluate a single design point, executed in a worker process.
+        Return the results, and whether they were loaded from the flow result cache.
+    """
+    flow = flow_class(design_config, tech_config, syn_options, pnr_options, rundir, **flow_kwargs)
+    results = flow.run()
+    return results, getattr(flow, 'cache_hit', False)
+
+
+def synthesize_point(
+    flow_class: type,
+    design_config: dict,
+    tech_config: dict,
+    syn_options: dict,
+    rundir: str,
+    flow_kwargs: dict,
+) -> dict:
+    """
+        Run the synthesis shared by several design points, executed in a worker process.
+    """
+    flow = flow_class(design_config, tech_config, syn_options, dict(), rundir, **flow_kwargs)
+    return flow.run_syn()
+
+
+def implement_point(
+    flow_class: type,
+    design_config: dict,
+    tech_config: dict,
+    syn_options: dict,
+    pnr_options: dict,
+    rundir: str,
+    syn_rundir: str,
+    syn_output: dict,
+    flow_kwargs: dict,
+) -> tuple:
+    """
+        Run place and route of a design point on a shared synthesis, executed in a worker process.
+        Return the results, and whether they were loaded from the flow result cache.
+    """
+    flow = flow_class(design_config, tech_config, syn_options, pnr_options, rundir,
+                      syn_rundir=syn_rundir, **flow_kwargs)
+    if flow.load_cache() is not None:
+        return flow.results, True
+    try:
+        flow.run_pnr(syn_output)
+    except RoutineCheckError as e:
+        flow.store_failure(e)
+        raise
+    flow.store_cache()
+    return flow.results, False
+
+
+class BatchEvaluator():
+    """
+        Evaluate a batch of design points of YosysOpenroadFlow or GenusInnovusFlow.
+        Each point runs in its own rundir on a process pool with bounded concurrency,
+        and results are yielded in completion order.
+
+        In fanout mode (GenusInnovusFlow), synthesis runs once per unique
+        (design_config, syn_options) in a shared rundir, and the place and route
+        jobs of all dependent points run concurrently on its output.
+
+        Queued jobs run in the order of the scheduler, by default shortest expected job first,
+        with the runtime estimated by the cost model from the flow kind, runmode, steps and design size.
+    """
+
+    def __init__(
+        self,
+        flow_class: type,
+        tech_config: dict,
+        rundir: str,
+        max_workers: int = 4,
+        *,
+        quiet: bool = True,
+        fanout: bool = False,
+        scheduler: JobScheduler = None,
+        cost_model: CostModel = None,
+        **flow_kwargs,
+    ) -> None:
+        self.flow_class = flow_class
+        self.tech_config = tech_config
+        self.rundir = rundir
+        self.max_workers = max_workers
+        self.quiet = quiet
+        self.fanout = fanout
+        self.scheduler = scheduler if scheduler is not None else JobScheduler('sjf')
+        self.cost_model = cost_model if cost_model is not None else CostModel()
+        self.flow_kwargs = flow_kwargs
+        if fanout:
+            assert hasattr(flow_class, 'run_syn') and hasattr(flow_class, 'run_pnr'), \
+                assert_error('%s does not support fanout mode' % flow_class.__name__)
+
+    def get_point_rundir(self, index: int) -> str:
+        return os.path.join(self.rundir, 'point-%d' % index)
+
+    def get_syn_key(self, design_config: dict, syn_options: dict) -> str:
+        return create_hash(json.dumps([design_config, syn_options], sort_keys=True, default=str))
+
+    def get_syn_rundir(self, syn_key: str) -> str:
+        return os.path.join(self.rundir, 'syn-%s' % syn_key[:16])
+
+    def get_cost(self, record: dict, stages: tuple = ('syn', 'pnr')) -> float:
+        return self.cost_model.estimate(
+            self.flow_class,
+            record['design_config'],
+            record['syn_options'],
+            record['pnr_options'],
+            stages=stages,
+        )
+
+    def observe(self, cost: float, started: float) -> None:
+        self.cost_model.observe(getattr(self.flow_class, 'kind', None), cost, time.time() - started)
+
+    def run(self, points: list):
+        """
+            Evaluate points, each point is a tuple of (design_config, syn_options, pnr_options).
+            Yield a record per point as soon as it finishes.
+        """
+        if self.fanout:
+            yield from self.run_fanout(points)
+            return
+
+        mkdir(self.rundir)
+        for index, (design_config, syn_options, pnr_options) in enumerate(points):
+            record = {
+                'index': index,
+                'rundir': self.get_point_rundir(index),
+                'design_config': design_config,
+                'syn_options': syn_options,
+                'pnr_options': pnr_options,
+            }
+            self.scheduler.push(record, cost=self.get_cost(record))
+        running = dict()
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker if self.quiet else None,
+        )
+        try:
+            while self.scheduler or running:
+                # keep at most max_workers points in flight
+                while self.scheduler and len(running) < self.max_workers:
+                    record = self.scheduler.pop()
+                    future = executor.submit(
+                        evaluate_point,
+                        self.flow_class,
+                        record['design_config'],
+                        self.tech_config,
+                        record['syn_options'],
+                        record['pnr_options'],
+                        record['rundir'],
+                        self.flow_kwargs,
+                    )
+                    running[future] = (record, time.time())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record, started = running.pop(future)
+                    try:
+                        record['results'], cache_hit = future.result()
+                        record['error'] = None
+                        # a cache hit tells nothing about the runtime of the flow
+                        if not cache_hit:
+                            self.observe(self.get_cost(record), started)
+                        info("point %d finished" % record['index'])
+                    except Exception as e:
+                        record['results'] = None
+                        record['error'] = repr(e)
+                        warn("point %d failed: %s" % (record['index'], record['error']))
+                    yield record
+        finally:
+            self.scheduler.clear()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run_fanout(self, points: list):
+        """
+            Evaluate points with one synthesis per unique synthesis config.
+        """
+        mkdir(self.rundir)
+
+        # group points by synthesis configs, cached points finish immediately
+        groups = dict()
+        for index, (design_config, syn_options, pnr_options) in enumerate(points):
+            record = {
+                'index': index,
+                'rundir': self.get_point_rundir(index),
+                'design_config': design_config,
+                'syn_options': syn_options,
+                'pnr_options': pnr_options,
+            }
+            syn_key = self.get_syn_key(design_config, syn_options)
+            syn_rundir = os.path.join(self.get_syn_rundir(syn_key), 'genus-rundir')
+            flow = self.flow_class(design_config, self.tech_config, syn_options, pnr_options,
+                                   record['rundir'], syn_rundir=syn_rundir, **self.flow_kwargs)
+            try:
+                results = flow.load_cache()
+            except CachedFailureError as e:
+                record['results'] = None
+                record['error'] = repr(e)
+                warn("point %d failed: %s" % (index, record['error']))
+                yield record
+                continue
+            if results is not None:
+                record['results'] = results
+                record['error'] = None
+                yield record
+                continue
+            groups.setdefault(syn_key, []).append(record)
+
+        info("fanout: %d synthesis job(s) for %d point(s)" % (len(groups), sum(map(len, groups.values()))))
+
+        for syn_key, records in groups.items():
+            self.scheduler.push(('syn', syn_key, records), cost=self.get_cost(records[0], stages=('syn',)))
+        running = dict()
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker if self.quiet else None,
+        )
+        try:
+            while self.scheduler or running:
+                while self.scheduler and len(running) < self.max_workers:
+                    task = self.scheduler.pop()
+                    kind, syn_key, payload = task
+                    syn_dir = self.get_syn_rundir(syn_key)
+                    if kind == 'syn':
+                        record = payload[0]
+                        future = executor.submit(
+                            synthesize_point,
+                            self.flow_class,
+                            record['design_config'],
+                            self.tech_config,
+                            record['syn_options'],
+                            syn_dir,
+                            self.flow_kwargs,
+                        )
+                    else:
+                        record, syn_output = payload
+                        future = executor.submit(
+                            implement_point,
+                            self.flow_class,
+                            record['design_config'],
+                            self.tech_config,
+                            record['syn_options'],
+                            record['pnr_options'],
+                            record['rundir'],
+                            os.path.join(syn_dir, 'genus-rundir'),
+                            syn_output,
+                            self.flow_kwargs,
+                        )
+                    running[future] = (task, time.time())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    (kind, syn_key, payload), started = running.pop(future)
+                    if kind == 'syn':
+                        try:
+                            syn_output = future.result()
+                        except Exception as e:
+                            warn("synthesis %s failed: %s" % (syn_key[:16], repr(e)))
+                            for record in payload:
+                                record['results'] = None
+                                record['error'] = repr(e)
+                                yield record
+                            continue
+                        self.observe(self.get_cost(payload[0], stages=('syn',)), started)
+                        for record in payload:
+                            self.scheduler.push(('pnr', syn_key, (record, syn_output)),
+                                                cost=self.get_cost(record, stages=('pnr',)))
+                        continue
+
+                    record, _ = payload
+                    try:
+                        record['results'], cache_hit = future.result()
+                        record['error'] = None
+                        if not cache_hit:
+                            self.observe(self.get_cost(record, stages=('pnr',)), started)
+                        info("point %d finished" % record['index'])
+                    except Exception as e:
+                        record['results'] = None
+                        record['error'] = repr(e)
+                        warn("point %d failed: %s" % (record['index'], record['error']))
+                    yield record
+        finally:
+            self.scheduler.clear()
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,119 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+from utils import mkdir, info, create_hash, file_digest, RoutineCheckError
+from manager.common import classify_failure, DETERMINISTIC, RUNTIME_CONFIG_KEYS
+
+
+# run-specific entries which don't change the results
+VOLATILE_KEYS = RUNTIME_CONFIG_KEYS
+
+
+def is_file_key(key: str) -> bool:
+    """
+        Config entries referring to input files, e.g., verilog_files, lib_files, setup_sdc_file, qrc_techfiles.
+    """
+    return key.endswith('_file') or key.endswith('_files') or key.endswith('techfiles')
+
+
+def collect_input_files(configs: dict) -> list:
+    """
+        Collect all existing files referenced by the configs.
+    """
+    files = set()
+    for key, value in configs.items():
+        if isinstance(value, dict):
+            files.update(collect_input_files(value))
+        elif is_file_key(key):
+            values = value if isinstance(value, (list, tuple)) else [value]
+            files.update(v for v in values if isinstance(v, str) and os.path.isfile(v))
+    return sorted(files)
+
+
+class CachedFailureError(RoutineCheckError):
+    """
+        An identical run failed deterministically before, see FlowResultCache.store_failure.
+    """
+
+    def __init__(self, error):
+        Exception.__init__(self, error)
+        self.error = error
+        self.msg = "Cached deterministic failure: %s" % error
+
+    def __str__(self):
+        return self.msg
+
+
+class FlowResultCache():
+    """
+        Persistent flow result cache addressed by configs and input file contents.
+        Entries are written atomically, so concurrent workers can share a cache directory.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+        mkdir(self.cache_dir)
+
+    def get_key(self, configs: dict) -> str:
+        """
+            Canonical hash of the merged configs and the digests of all referenced files.
+        """
+        def strip(d):
+            return {k: strip(v) if isinstance(v, dict) else v for k, v in d.items() if k not in VOLATILE_KEYS}
+
+        canonical = strip(configs)
+        digests = {path: file_digest(path) for path in collect_input_files(canonical)}
+        contents = json.dumps({'configs': canonical, 'files': digests}, sort_keys=True, default=str)
+        return create_hash(contents)
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], '%s.json' % key)
+
+    def load_entry(self, key: str) -> dict:
+        try:
+            with open(self.get_path(key), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, key: str):
+        """
+            Return the cached results, or None on a cache miss.
+
+            Raises:
+                CachedFailureError: If an identical run failed deterministically.
+        """
+        entry = self.load_entry(key)
+        if entry is None:
+            return None
+        info("Flow result cache hit: %s" % self.get_path(key))
+        if entry.get('failure') is not None:
+            raise CachedFailureError(entry['failure']['error'])
+        return entry['results']
+
+    def store_failure(self, key: str, error: BaseException) -> bool:
+        """
+            Remember a deterministic failure, so that the same configs never run again.
+            Transient failures and cancellations are not stored. Return True if stored.
+        """
+        failure_class = classify_failure(error)
+        if failure_class != DETERMINISTIC:
+            return False
+        self.store(key, None, failure={'class': failure_class, 'error': str(error)})
+        return True
+
+    def store(self, key: str, results: dict, failure: dict = None) -> None:
+        path = self.get_path(key)
+        mkdir(os.path.dirname(path))
+        # write to a temporary file in the same directory, then rename atomically
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'key': key, 'results': results, 'failure': failure}, f, indent=4)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
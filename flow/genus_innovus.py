@@ -5,13 +5,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from manager.genus import GenusManager, GenusTimingReportParser, GenusPowerReportParser, GenusAreaReportParser
 from manager.innovus import InnovusManager, InnovusAreaReportParser, InnovusPowerReportParser, InnovusTimingReportParser
-from utils import mkdir, dump_json, if_exist
+from manager.common import ReportCache, get_report_cache
+from utils import mkdir, dump_json, if_exist, RoutineCheckError, RoutineCancelledError
+from .cache import FlowResultCache
+from .pareto import ParetoPruner
 
 class GenusInnovusFlow():
     """
         An Easy-to-use user API to call Cadence design flow
     """
 
+    # flow kind of the job server and the cost model
+    kind = 'genus_innovus'
+    # runmodes of genus and innovus if the options give none, also assumed by the cost model
+    default_syn_runmode = 'fast'
+    default_pnr_runmode = 'fast'
+
     def __init__(
         self,
         design_config: dict,
@@ -19,12 +28,29 @@ class GenusInnovusFlow():
         syn_options: dict,
         pnr_options: dict,
         rundir: str,
+        *,
+        cache_dir: str = None,
+        syn_rundir: str = None,
+        pruner: ParetoPruner = None,
+        report_cache: ReportCache = None,
     ) -> None:
         self.design_config = design_config
         self.tech_config = tech_config
         self.genus_options = syn_options
         self.innovus_options = pnr_options
         self.rundir = rundir
+        # the synthesis rundir may be shared by points only differing in pnr_options
+        self.syn_rundir = syn_rundir or os.path.join(rundir, 'genus-rundir')
+        self.cache = FlowResultCache(cache_dir) if cache_dir else None
+        # the results were loaded from the cache, the run took no tool time
+        self.cache_hit = False
+        # prune points dominated after placement, innovus must run in normal runmode:
+        # it is the default with a pruner, any other runmode given but skip is an error
+        self.pruner = pruner
+        if pruner is not None and pnr_options.get('runmode', 'normal') not in ('normal', 'skip'):
+            raise ValueError("pareto pruning needs innovus runmode normal, got %s" % pnr_options['runmode'])
+        # parsed reports, shared by the flows of the process and stored next to the reports
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
 
         self.results = dict()
 
@@ -34,9 +60,9 @@ class GenusInnovusFlow():
 
     def get_genus_configs(self) -> dict:
         configs = {
-            'rundir': os.path.join(self.rundir, 'genus-rundir'),
+            'rundir': self.syn_rundir,
             'steps': ['syn', 'report'],
-            'runmode': 'fast',
+            'runmode': self.default_syn_runmode,
             'clk_period_ns': 0.0,
         }
         configs.update(self.design_config)
@@ -56,7 +82,7 @@ class GenusInnovusFlow():
                 'cts',
                 'routing',
            ],
-            'runmode': 'fast',
+            'runmode': self.default_pnr_runmode if self.pruner is None else 'normal',
         }
         configs.update(genus_output)
         configs.update(self.tech_config)
@@ -64,15 +90,70 @@ class GenusInnovusFlow():
 
         return configs
 
+    def get_cache_key(self) -> str:
+        return self.cache.get_key({
+            'genus': self.get_genus_configs(),
+            'innovus': self.get_innovus_configs(dict()),
+        })
+
+    def load_cache(self):
+        """
+            Return the cached results of an identical run, or None
+        """
+        if self.cache is None:
+            return None
+        results = self.cache.load(self.get_cache_key())
+        if results is not None:
+            self.results = results
+            self.cache_hit = True
+        return results
+
+    def store_failure(self, error: BaseException) -> None:
+        """
+            Remember a deterministic failure of the flow, an identical run raises CachedFailureError
+        """
+        if self.cache is not None:
+            self.cache.store_failure(self.get_cache_key(), error)
+
+    def store_cache(self) -> None:
+        # pruning depends on the front at the time, never cache pruned results
+        if self.cache is not None and not self.results.get('Pruned'):
+            self.cache.store(self.get_cache_key(), self.results)
+
     def run(self):
+        """
+            Run the design flow, or return the cached results of an identical run
+        """
+        if self.load_cache() is not None:
+            return self.results
+
+        try:
+            self.run_impl()
+        except RoutineCheckError as e:
+            self.store_failure(e)
+            raise
+        self.store_cache()
+        return self.results
+
+    def run_impl(self):
         """
             Run the design flow
         """
-        # run genus
+        genus_output = self.run_syn()
+        return self.run_pnr(genus_output)
+
+    def run_syn(self) -> dict:
+        """
+            Run genus, return the genus output used by get_innovus_configs
+        """
         genus_configs = self.get_genus_configs()
         genus_manager = GenusManager(genus_configs)
-        genus_output = genus_manager.run()
+        return genus_manager.run()
 
+    def run_pnr(self, genus_output: dict):
+        """
+            Run innovus on the genus output, and collect results of all stages
+        """
         self.results['Post-Syn Timing'] = self.get_timing('postSyn')
         self.results['Post-Syn Power'] = self.get_power('postSyn')
         self.results['Post-Syn Area'] = self.get_area('postSyn')
@@ -81,8 +162,22 @@ class GenusInnovusFlow():
         if self.innovus_options.get('runmode') != 'skip':
             innovus_configs = self.get_innovus_configs(genus_output)
             innovus_manager = InnovusManager(innovus_configs)
-            innovus_output = innovus_manager.run()
+            if self.pruner is not None:
+                self.results['Pruned'] = False
+                innovus_manager.add_step_callback(self.prune_after_placement)
+            try:
+                innovus_output = innovus_manager.run()
+            except RoutineCancelledError:
+                if not self.results.get('Pruned'):
+                    raise
+
+        if self.results.get('Pruned'):
+            # keep the post-place estimates which pruned the point
+            self.results['Post-Route Timing'] = None
+            self.results['Post-Route Power'] = None
+            self.results['Post-Route Area'] = None
 
+        elif self.innovus_options.get('runmode') != 'skip':
             self.results['Post-Place Timing'] = self.get_timing('postPlace')
             self.results['Post-Route Timing'] = self.get_timing('postRoute')
             self.results['Post-Place Power'] = self.get_power('postPlace')
@@ -100,55 +195,70 @@ class GenusInnovusFlow():
 
         return self.results
 
-        
+    def prune_after_placement(self, innovus_manager: InnovusManager, step_name: str) -> None:
+        """
+            Innovus step callback, cancel the remaining steps if the post-place estimates
+            are dominated by the pareto front.
+        """
+        if step_name != 'placement':
+            return
+        self.results['Post-Place Timing'] = self.get_timing('postPlace')
+        self.results['Post-Place Power'] = self.get_power('postPlace')
+        self.results['Post-Place Area'] = self.get_area('postPlace')
+
+        estimates = [
+            self.results['Post-Place Timing'],
+            self.results['Post-Place Power'],
+            self.results['Post-Place Area'],
+        ]
+        if self.pruner.check(estimates, self.rundir) is not None:
+            self.results['Pruned'] = True
+            innovus_manager.cancel()
+
     def get_area(self, stage: str) -> float:
         if stage == 'postSyn':
-            report_path = os.path.join(self.rundir, 'genus-rundir', 'reports', 'area.rpt')
-            report_parser = GenusAreaReportParser(report_path)
+            report_path = os.path.join(self.syn_rundir, 'reports', 'area.rpt')
+            report_parser_class = GenusAreaReportParser
 
         elif stage == 'postPlace':
             report_path = os.path.join(self.rundir, 'innovus-rundir', 'reports', 'preCTS_area.rpt')
-            report_parser = InnovusAreaReportParser(report_path)
+            report_parser_class = InnovusAreaReportParser
 
         elif stage == 'postRoute':
             report_path = os.path.join(self.rundir, 'innovus-rundir', 'reports', 'postRoute_area.rpt')
-            report_parser = InnovusAreaReportParser(report_path)
+            report_parser_class = InnovusAreaReportParser
 
         else:
             raise NotImplementedError(f"Stage {stage} is not supported in get_area")
 
-        report_list = report_parser.run()
-        report_dict = {r['instance']: r for r in report_list}
         key_name = 'total_area' if stage != 'postSyn' else 'cell_area'
-        area = report_dict[self.top_module][key_name]
+        area = self.report_cache.get_row(report_parser_class, report_path, self.top_module)[key_name]
 
         return area
     
     def get_power(self, stage: str) -> float:
         if stage == 'postSyn':
-            report_path = os.path.join(self.rundir, 'genus-rundir', 'reports', 'power.rpt')
-            report_parser = GenusPowerReportParser(report_path)
+            report_path = os.path.join(self.syn_rundir, 'reports', 'power.rpt')
+            report_parser_class = GenusPowerReportParser
         
         elif stage == 'postPlace':
             report_path = os.path.join(self.rundir, 'innovus-rundir', 'reports', 'preCTS_power.rpt')
-            report_parser = InnovusPowerReportParser(report_path)
+            report_parser_class = InnovusPowerReportParser
 
         elif stage == 'postRoute':
             report_path = os.path.join(self.rundir, 'innovus-rundir', 'reports', 'postRoute_power.rpt')
-            report_parser = InnovusPowerReportParser(report_path)
+            report_parser_class = InnovusPowerReportParser
 
         else:
             raise NotImplementedError(f"Stage {stage} is not supported in get_power")
         
-        report_list = report_parser.run()
-        report_dict = {r['instance']: r for r in report_list}
-        power = report_dict[self.top_module]['total']
+        power = self.report_cache.get_row(report_parser_class, report_path, self.top_module)['total']
         
         return power
 
     def get_timing(self, stage: str, path_name: str = None) -> float:
         if stage == 'postSyn':
-            report_dir = os.path.join(self.rundir, 'genus-rundir', 'reports')
+            report_dir = os.path.join(self.syn_rundir, 'reports')
             report_parser_class = GenusTimingReportParser
 
         elif stage == 'postPlace':
@@ -167,6 +277,7 @@ class GenusInnovusFlow():
         else:
             report_path = os.path.join(report_dir, 'timing.rpt')
 
-        report_list = report_parser_class(report_path).run()
-        arrival_time = report_list[0]['arrival_time'] if len(report_list) else 0
+        # only the worst path, the parsers read no further
+        worst_paths = self.report_cache.get(report_parser_class, report_path, max_timing_paths=1)
+        arrival_time = worst_paths[0]['arrival_time'] if worst_paths else 0
         return arrival_time
@@ -0,0 +1,250 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import time
+from typing import Callable, Union
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from utils import mkdir, info, warn, init_worker, dump_json
+from .batch import synthesize_point, implement_point
+from .pareto import pareto_ranks
+from .scheduler import CostModel, JobScheduler
+from .yosys_openroad import YosysOpenroadFlow
+
+# fidelities above the post-synthesis estimate, cheapest first, with their OpenroadManager runmode
+PNR_FIDELITIES = (
+    ('fast', 'fast'),  # fast_flow.tcl
+    ('full', 'default'),  # full_flow.tcl
+)
+
+
+def promote_fraction(fraction: float, min_count: int = 1) -> Callable:
+    """
+        Promotion rule keeping the best fraction of the ranked points, at least min_count of them.
+    """
+    def promote(records: list) -> list:
+        count = max(min_count, int(math.ceil(fraction * len(records))))
+        return records[:count]
+    return promote
+
+
+class MultiFidelityCampaign():
+    """
+        Evaluate design points of YosysOpenroadFlow on a ladder of fidelities:
+        the post-synthesis estimate of yosys, then openroad fast_flow, then full_flow.
+
+        Every point gets the estimate. After each fidelity, the points are ranked by Pareto rank over
+        the objectives at that fidelity, ties broken by the sum of the normalized objectives, and only
+        the points kept by the promotion rule go up to the next fidelity.
+        All fidelities run on the netlist of the first one, each in a place and route rundir of its own,
+        and the results of every fidelity reached are recorded per point.
+    """
+
+    def __init__(
+        self,
+        tech_config: dict,
+        rundir: str,
+        max_workers: int = 4,
+        *,
+        promote: Union[float, Callable] = 0.25,
+        objectives: tuple = ('delay', 'area'),
+        quiet: bool = True,
+        scheduler: JobScheduler = None,
+        cost_model: CostModel = None,
+        **flow_kwargs,
+    ) -> None:
+        """
+            Args:
+                promote (float | Callable, optional): Fraction of the ranked points promoted at each fidelity,
+                    or a rule mapping the ranked records of a fidelity to the records to promote. Defaults to 0.25.
+                objectives (tuple, optional): Results ranked at each fidelity, all minimized. Defaults to ('delay', 'area').
+                flow_kwargs: Keyword arguments of YosysOpenroadFlow, the netlist is always kept for the next fidelities.
+        """
+        self.tech_config = tech_config
+        self.rundir = rundir
+        self.max_workers = max_workers
+        self.promote = promote if callable(promote) else promote_fraction(promote)
+        self.objectives = objectives
+        self.quiet = quiet
+        self.scheduler = scheduler if scheduler is not None else JobScheduler('sjf')
+        self.cost_model = cost_model if cost_model is not None else CostModel()
+        self.flow_kwargs = dict(flow_kwargs, remove_netlist=False)
+
+    @property
+    def fidelities(self) -> list:
+        return ['syn'] + [name for name, _ in PNR_FIDELITIES]
+
+    @property
+    def summary_path(self) -> str:
+        return os.path.join(self.rundir, 'campaign.json')
+
+    def get_point_rundir(self, index: int) -> str:
+        return os.path.join(self.rundir, 'point-%d' % index)
+
+    def get_syn_rundir(self, record: dict) -> str:
+        return os.path.join(record['rundir'], 'yosys-rundir')
+
+    def get_pnr_options(self, record: dict, name: str, runmode: str) -> dict:
+        pnr_options = dict(record['pnr_options'])
+        pnr_options['runmode'] = runmode
+        pnr_options['rundir'] = os.path.join(record['rundir'], 'openroad-%s' % name)
+        return pnr_options
+
+    def rank(self, records: list, fidelity: str) -> list:
+        """
+            Order records by Pareto rank at the fidelity, points with missing results are dropped.
+        """
+        records = [
+            record for record in records
+            if all(record['results'][fidelity].get(key) is not None for key in self.objectives)
+        ]
+        if not records:
+            return []
+        objectives = [[record['results'][fidelity][key] for key in self.objectives] for record in records]
+        ranks = pareto_ranks(objectives)
+
+        # normalize each objective to [0, 1] over the records for tie-breaking
+        lows = [min(column) for column in zip(*objectives)]
+        spans = [(max(column) - low) or 1.0 for column, low in zip(zip(*objectives), lows)]
+        scores = [sum((x - low) / span for x, low, span in zip(point, lows, spans)) for point in objectives]
+
+        for record, rank in zip(records, ranks):
+            record['ranks'][fidelity] = rank
+        order = sorted(range(len(records)), key=lambda i: (ranks[i], scores[i], records[i]['index']))
+        return [records[i] for i in order]
+
+    def run_fidelity(self, tasks: list) -> None:
+        """
+            Run (record, fidelity, cost, fn, args) tasks on a process pool in scheduler order,
+            and store the results or the error of each in its record.
+        """
+        for task in tasks:
+            self.scheduler.push(task, cost=task[2])
+        running = dict()
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker if self.quiet else None,
+        )
+        try:
+            while self.scheduler or running:
+                while self.scheduler and len(running) < self.max_workers:
+                    task = self.scheduler.pop()
+                    _, _, _, fn, args = task
+                    running[executor.submit(fn, *args)] = (task, time.time())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    (record, fidelity, cost, _, _), started = running.pop(future)
+                    try:
+                        output = future.result()
+                    except Exception as e:
+                        record['errors'][fidelity] = repr(e)
+                        warn("point %d failed at fidelity %s: %s" % (record['index'], fidelity, repr(e)))
+                        continue
+                    # place and route checks the flow result cache first
+                    cache_hit = False
+                    if fidelity != 'syn':
+                        output, cache_hit = output
+                    if not cache_hit:
+                        self.cost_model.observe(YosysOpenroadFlow.kind, cost, time.time() - started)
+
+                    if fidelity == 'syn':
+                        record['syn_output'] = output
+                        record['results'][fidelity] = {'delay': output['delay'], 'area': output['area']}
+                    else:
+                        record['results'][fidelity] = {'delay': output['post_pnr_delay'], 'area': output['post_pnr_area']}
+                    record['fidelity'] = fidelity
+                    info("point %d finished fidelity %s" % (record['index'], fidelity))
+        finally:
+            self.scheduler.clear()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_syn_tasks(self, records: list) -> list:
+        tasks = []
+        for record in records:
+            cost = self.cost_model.estimate(
+                YosysOpenroadFlow,
+                record['design_config'],
+                record['syn_options'],
+                record['pnr_options'],
+                stages=('syn',),
+            )
+            args = (
+                YosysOpenroadFlow,
+                record['design_config'],
+                self.tech_config,
+                record['syn_options'],
+                record['rundir'],
+                self.flow_kwargs,
+            )
+            tasks.append((record, 'syn', cost, synthesize_point, args))
+        return tasks
+
+    def get_pnr_tasks(self, records: list, name: str, runmode: str) -> list:
+        tasks = []
+        for record in records:
+            pnr_options = self.get_pnr_options(record, name, runmode)
+            # the post-synthesis area tells the place and route runtime better than the RTL size
+            cost = self.cost_model.estimate(
+                YosysOpenroadFlow,
+                record['design_config'],
+                record['syn_options'],
+                pnr_options,
+                stages=('pnr',),
+                area=record['results']['syn'].get('area'),
+            )
+            args = (
+                YosysOpenroadFlow,
+                record['design_config'],
+                self.tech_config,
+                record['syn_options'],
+                pnr_options,
+                record['rundir'],
+                self.get_syn_rundir(record),
+                record['syn_output'],
+                self.flow_kwargs,
+            )
+            tasks.append((record, name, cost, implement_point, args))
+        return tasks
+
+    def run(self, points: list) -> list:
+        """
+            Evaluate points, each point is a tuple of (design_config, syn_options, pnr_options).
+
+            Returns:
+                list: A record per point, with the results, errors and Pareto ranks of each fidelity it reached,
+                      and its highest finished fidelity, also dumped to campaign.json in the rundir.
+        """
+        mkdir(self.rundir)
+        records = []
+        for index, (design_config, syn_options, pnr_options) in enumerate(points):
+            records.append({
+                'index': index,
+                'rundir': self.get_point_rundir(index),
+                'design_config': design_config,
+                'syn_options': syn_options,
+                'pnr_options': pnr_options,
+                'fidelity': None,
+                'results': dict(),
+                'errors': dict(),
+                'ranks': dict(),
+            })
+
+        self.run_fidelity(self.get_syn_tasks(records))
+        fidelity = 'syn'
+        for name, runmode in PNR_FIDELITIES:
+            ranked = self.rank([record for record in records if fidelity in record['results']], fidelity)
+            promoted = self.promote(ranked)
+            info("fidelity %s: promote %d of %d point(s) to %s" % (fidelity, len(promoted), len(ranked), name))
+            if not promoted:
+                break
+            self.run_fidelity(self.get_pnr_tasks(promoted, name, runmode))
+            fidelity = name
+        self.rank([record for record in records if fidelity in record['results']], fidelity)
+
+        for record in records:
+            record.pop('syn_output', None)
+        dump_json(records, self.summary_path)
+        return records
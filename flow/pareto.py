@@ -0,0 +1,114 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import fcntl
+import tempfile
+from utils import mkdir, info
+
+
+def dominates(a: list, b: list, margin: float = 0.0) -> bool:
+    """
+        Whether objective vector a dominates b, all objectives are minimized.
+        With a margin, a must be better than b by at least margin (relative) in every objective.
+    """
+    assert len(a) == len(b)
+    return all(x + margin * abs(x) <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+
+def pareto_front(points: list, key=lambda point: point) -> list:
+    """
+        The non-dominated points, key maps a point to its objective vector.
+    """
+    return [
+        point for point in points
+        if not any(dominates(key(other), key(point)) for other in points if other is not point)
+    ]
+
+
+def pareto_ranks(points: list, key=lambda point: point) -> list:
+    """
+        Rank of each point by non-dominated sorting: 0 for the front, 1 for the front of the
+        remaining points, and so on.
+    """
+    objectives = [key(point) for point in points]
+    ranks = [None] * len(points)
+    remaining = list(range(len(points)))
+    rank = 0
+    while remaining:
+        front = [
+            i for i in remaining
+            if not any(dominates(objectives[j], objectives[i]) for j in remaining if j != i)
+        ]
+        for i in front:
+            ranks[i] = rank
+        remaining = [i for i in remaining if ranks[i] is None]
+        rank += 1
+    return ranks
+
+
+class ParetoPruner():
+    """
+        Pareto front of a campaign shared by all its workers through a JSON file.
+
+        Points report their early estimates, e.g., post-place timing, power and area, and a point
+        dominated by the front (by the margin) is pruned before the expensive steps. Estimates
+        are compared with estimates of the same stage, never with final results.
+    """
+
+    def __init__(self, front_path: str, margin: float = 0.05) -> None:
+        self.front_path = front_path
+        self.margin = margin
+
+    @property
+    def lock_path(self) -> str:
+        return self.front_path + '.lock'
+
+    def load_front(self) -> list:
+        """
+            Entries of the current front, each with 'objectives' and 'rundir'.
+        """
+        try:
+            with open(self.front_path, 'r') as f:
+                return json.load(f)['front']
+        except FileNotFoundError:
+            return []
+
+    def dump_front(self, front: list) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.front_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'margin': self.margin, 'front': front}, f, indent=4)
+            os.replace(tmp_path, self.front_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def check(self, objectives: list, rundir: str) -> dict:
+        """
+            Check a point against the front and insert it if it is not dominated.
+
+            Args:
+                objectives (list): The objective vector of the point, all minimized.
+                rundir (str): The rundir of the point, recorded in the front.
+
+            Returns:
+                dict: The dominating front entry, or None if the point is kept.
+        """
+        mkdir(os.path.dirname(os.path.abspath(self.front_path)))
+        with open(self.lock_path, 'a') as lock:
+            # check and insert atomically among concurrent workers
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                front = self.load_front()
+                for entry in front:
+                    if dominates(entry['objectives'], objectives, self.margin):
+                        info("pareto: %s is dominated by %s" % (rundir, entry['rundir']))
+                        return entry
+
+                front.append({'objectives': list(objectives), 'rundir': rundir})
+                self.dump_front(pareto_front(front, key=lambda entry: entry['objectives']))
+                return None
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
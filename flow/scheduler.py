@@ -0,0 +1,190 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import time
+import heapq
+import itertools
+import threading
+
+# reference runtime in seconds of each stage of a flow by runmode, for a design of reference size
+STAGE_COSTS = {
+    'yosys_openroad': {
+        'syn': {'default': 120},
+        'pnr': {'fast': 600, 'default': 3600},
+    },
+    'genus_innovus': {
+        'syn': {'fast': 900, 'normal': 1800},
+        'pnr': {'fast': 2 * 3600, 'normal': 4 * 3600},
+    },
+}
+
+# share of the stage runtime taken by each step, a stage running a subset of steps costs less
+STEP_WEIGHTS = {
+    'genus_innovus': {
+        'syn': {'syn': 0.8, 'report': 0.2},
+        'pnr': {'init': 0.02, 'floorplan': 0.03, 'powerplan': 0.05, 'placement': 0.3, 'cts': 0.2, 'routing': 0.4},
+    },
+}
+
+# reference design size: bytes of RTL, or post-synthesis area from a prior stage
+REFERENCE_VERILOG_BYTES = 100e3
+REFERENCE_AREA = 10e3
+
+# runtime of unknown job kinds, e.g., chipyard
+DEFAULT_COST = 3600
+
+
+class CostModel(object):
+    """
+        Estimate the runtime of a flow job from its flow kind, runmode, steps and design size.
+        A stage without a runmode in its options runs in the default runmode of the flow class,
+        e.g., GenusInnovusFlow.default_pnr_runmode.
+        The estimates are calibrated per flow kind by the runtimes of finished jobs, see observe.
+    """
+
+    def __init__(self, size_exponent: float = 1.0, smoothing: float = 0.2) -> None:
+        self.size_exponent = size_exponent
+        self.smoothing = smoothing
+        # flow kind -> log of the measured / estimated runtime ratio
+        self.log_scales = dict()
+        self.lock = threading.Lock()
+
+    def get_size_factor(self, design_config: dict, area: float = None) -> float:
+        if area:
+            size = area / REFERENCE_AREA
+        else:
+            size = 0
+            for path in design_config.get('verilog_files', []):
+                try:
+                    size += os.path.getsize(path)
+                except OSError:
+                    pass
+            size /= REFERENCE_VERILOG_BYTES
+        if size <= 0:
+            return 1.0
+        return size ** self.size_exponent
+
+    def get_stage_cost(self, kind: str, stage: str, options: dict, default_runmode: str = None) -> float:
+        costs = STAGE_COSTS[kind][stage]
+        runmode = options.get('runmode', default_runmode)
+        if runmode == 'skip':
+            return 0.0
+        # an unknown runmode may take as long as the slowest one
+        cost = costs.get(runmode, max(costs.values()))
+
+        weights = STEP_WEIGHTS.get(kind, dict()).get(stage)
+        if weights and 'steps' in options:
+            cost *= sum(weights.get(step, 0) for step in options['steps'])
+        return cost
+
+    def estimate(
+        self,
+        flow_class: type,
+        design_config: dict,
+        syn_options: dict,
+        pnr_options: dict,
+        stages: tuple = ('syn', 'pnr'),
+        area: float = None,
+    ) -> float:
+        """
+            Expected runtime in seconds of the given stages of a flow job.
+
+            Args:
+                flow_class (type): YosysOpenroadFlow or GenusInnovusFlow, by its kind,
+                    other classes (or None) cost DEFAULT_COST.
+                area (float, optional): Post-synthesis area from a prior stage, more telling of the
+                    place and route runtime than the RTL size. Defaults to None.
+        """
+        kind = getattr(flow_class, 'kind', None)
+        if kind not in STAGE_COSTS:
+            return DEFAULT_COST
+        options = {'syn': syn_options, 'pnr': pnr_options}
+        cost = sum(
+            self.get_stage_cost(kind, stage, options[stage], getattr(flow_class, 'default_%s_runmode' % stage, None))
+            for stage in stages
+        )
+        cost *= self.get_size_factor(design_config, area)
+        with self.lock:
+            return cost * math.exp(self.log_scales.get(kind, 0.0))
+
+    def observe(self, kind: str, estimated: float, elapsed: float) -> None:
+        """
+            Calibrate the estimates of a flow kind by the measured runtime of a finished job.
+        """
+        if kind not in STAGE_COSTS or estimated <= 0 or elapsed <= 0:
+            return
+        with self.lock:
+            # estimated already includes the current scale
+            error = math.log(elapsed / estimated)
+            self.log_scales[kind] = self.log_scales.get(kind, 0.0) + self.smoothing * error
+
+
+class JobScheduler(object):
+    """
+        Priority queue of jobs.
+
+        Policies:
+            'fifo': in submission order.
+            'sjf': shortest expected job first.
+            'priority': highest user priority first, shortest expected job first within a priority.
+
+        Waiting jobs age, so that long or low priority jobs do not starve:
+        every second of waiting forgives aging seconds of expected runtime.
+        A priority level is worth priority_step seconds of expected runtime.
+        All jobs age at the same rate, so the order is fixed at submission and a heap suffices.
+    """
+
+    POLICIES = ('fifo', 'sjf', 'priority')
+
+    def __init__(self, policy: str = 'sjf', aging: float = 1.0, priority_step: float = 4 * 3600) -> None:
+        if policy not in self.POLICIES:
+            raise NotImplementedError("scheduling policy %s is not supported" % policy)
+        self.policy = policy
+        self.aging = aging
+        self.priority_step = priority_step
+        self.counter = itertools.count()
+        self.heap = []
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def get_key(self, cost: float, priority: int, submitted: float) -> float:
+        """
+            Jobs with smaller keys run first.
+            The score of a waiting job, cost - aging * (now - submitted), is key - aging * now,
+            where the last term is the same for all jobs.
+        """
+        if self.policy == 'fifo':
+            return submitted
+        key = cost + self.aging * submitted
+        if self.policy == 'priority':
+            key -= priority * self.priority_step
+        return key
+
+    def push(self, item, cost: float = 0, priority: int = 0, submitted: float = None) -> None:
+        """
+            Queue an item, submitted defaults to now.
+        """
+        seq = next(self.counter)
+        if submitted is None:
+            submitted = time.time()
+        heapq.heappush(self.heap, (self.get_key(cost, priority, submitted), seq, item))
+
+    def clear(self) -> None:
+        self.heap.clear()
+
+    def peek(self):
+        return self.heap[0][2] if self.heap else None
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def rank(self, items: list, costs: list, priorities: list, submitted: list) -> list:
+        """
+            Return items in the order they should run, e.g., for jobs queued elsewhere.
+        """
+        keys = [self.get_key(*args) for args in zip(costs, priorities, submitted)]
+        order = sorted(range(len(items)), key=lambda i: (keys[i], i))
+        return [items[i] for i in order]
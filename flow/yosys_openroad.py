@@ -4,12 +4,20 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from manager.yosys import YosysManager
 from manager.openroad import OpenroadManager
+from utils import RoutineCheckError
+from .cache import FlowResultCache
 
 class YosysOpenroadFlow():
     """
         An Easy-to-use user API to call Yosys and OpenROAD flow
     """
 
+    # flow kind of the job server and the cost model
+    kind = 'yosys_openroad'
+    # runmodes of yosys and openroad if the options give none, also assumed by the cost model
+    default_syn_runmode = 'default'
+    default_pnr_runmode = 'default'
+
     def __init__(
         self,
         design_config: dict,
@@ -19,14 +27,21 @@ class YosysOpenroadFlow():
         rundir: str,
         *,
         remove_netlist: bool = True,
+        cache_dir: str = None,
+        syn_rundir: str = None,
     ) -> None:
         self.design_config = design_config
         self.tech_config = tech_config
         self.syn_options = syn_options
         self.pnr_options = pnr_options
         self.rundir = rundir
+        # the synthesis rundir may be shared by runs only differing in pnr_options
+        self.syn_rundir = syn_rundir or os.path.join(rundir, 'yosys-rundir')
 
         self.remove_netlist = remove_netlist
+        self.cache = FlowResultCache(cache_dir) if cache_dir else None
+        # the results were loaded from the cache, the run took no tool time
+        self.cache_hit = False
 
         self.results = dict()
 
@@ -36,7 +51,7 @@ class YosysOpenroadFlow():
 
     def get_syn_configs(self) -> dict:
         configs = {
-            'rundir': os.path.join(self.rundir, 'yosys-rundir'),
+            'rundir': self.syn_rundir,
             'clk_period_ns': 0.0,
         }
         configs.update(self.design_config)
@@ -48,7 +63,7 @@ class YosysOpenroadFlow():
     def get_pnr_configs(self, syn_output: dict) -> dict:
         configs = {
             'rundir': os.path.join(self.rundir, 'openroad-rundir'),
-            'runmode': 'default',
+            'runmode': self.default_pnr_runmode,
         }
         configs['verilog_file'] = syn_output['verilog_file']
         configs.update(self.design_config)
@@ -57,14 +72,75 @@ class YosysOpenroadFlow():
 
         return configs
 
+    def get_cache_key(self) -> str:
+        return self.cache.get_key({
+            'syn': self.get_syn_configs(),
+            'pnr': self.get_pnr_configs({'verilog_file': None}),
+        })
+
+    def load_cache(self):
+        """
+            Return the cached results of an identical run, or None
+        """
+        if self.cache is None:
+            return None
+        results = self.cache.load(self.get_cache_key())
+        if results is not None:
+            self.results = results
+            self.cache_hit = True
+        return results
+
+    def store_failure(self, error: BaseException) -> None:
+        """
+            Remember a deterministic failure of the flow, an identical run raises CachedFailureError
+        """
+        if self.cache is not None:
+            self.cache.store_failure(self.get_cache_key(), error)
+
+    def store_cache(self) -> None:
+        if self.cache is not None:
+            self.cache.store(self.get_cache_key(), self.results)
+
     def run(self):
+        """
+            Run the design flow, or return the cached results of an identical run
+        """
+        if self.load_cache() is not None:
+            return self.results
+
+        try:
+            self.run_impl()
+        except RoutineCheckError as e:
+            self.store_failure(e)
+            raise
+        self.store_cache()
+        return self.results
+
+    def run_impl(self):
         """
             Run the design flow
         """
+        syn_output = self.run_syn()
+        self.run_pnr(syn_output)
+
+        # remove netlist to save disk
+        if self.remove_netlist:
+            os.remove(syn_output['verilog_file'])
+
+        return self.results
+
+    def run_syn(self) -> dict:
+        """
+            Run yosys, return the yosys output used by get_pnr_configs
+        """
         syn_configs = self.get_syn_configs()
         syn_manager = YosysManager(syn_configs)
-        syn_output = syn_manager.run()
-        
+        return syn_manager.run()
+
+    def run_pnr(self, syn_output: dict):
+        """
+            Run openroad on the yosys output, and collect results of both stages
+        """
         self.results['post_syn_delay'] = syn_output['delay']
         self.results['post_syn_area'] = syn_output['area']
 
@@ -80,8 +156,4 @@ class YosysOpenroadFlow():
             self.results['post_pnr_delay'] = None
             self.results['post_pnr_area'] = None
 
-        # remove netlist to save disk
-        if self.remove_netlist:
-            os.remove(syn_output['verilog_file'])
-
         return self.results
\ No newline at end of file
@@ -144,7 +144,7 @@ class ChipyardManager(BaseManager):
                 self.vlsi_finish_flag,
             )
         # time budget: 1 hours
-        self.routine_check(3600, cmd, condition, 1)
+        self.routine_check(3600, cmd, condition, 1, step='vlsi')
 
         # clean
         if vlsi_configs.get('clean_up', True):
@@ -197,7 +197,7 @@ class ChipyardManager(BaseManager):
             )
 
         # time budget: 1 hour
-        self.routine_check(3600, cmd, condition, 1)
+        self.routine_check(3600, cmd, condition, 1, step='verilator')
 
         # cleanup
         if verilator_configs.get('clean_up', True):
@@ -1 +1,9 @@
-from .base_manager import BaseManager
\ No newline at end of file
+from .base_manager import BaseManager, RUNTIME_CONFIG_KEYS
+from .license_pool import LicensePool, LicenseSlot
+from .fingerprint import StepFingerprints, get_tech_files
+from .log_watcher import LogWatcher, LICENSE_PATTERNS, MEMORY_PATTERNS, NFS_PATTERNS
+from .executor import Executor, LocalExecutor, BatchQueueExecutor, SLURM_COMMANDS
+from .session import ToolSession, SessionExecutor, get_session_pool
+from .retry import RetryPolicy, classify_failure, TRANSIENT, DETERMINISTIC
+from .scanner import ReportScanner
+from .report_cache import ReportCache, get_report_cache
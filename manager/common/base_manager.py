@@ -1,7 +1,42 @@
 import abc
-from time import sleep
+import asyncio
 from typing import Callable
-from utils import timestamp, execute, dump_yaml, mkdir, get_dir, RoutineCheckError
+from utils import dump_yaml, mkdir, get_dir, warn, CancelToken, RoutineCheckError, RoutineCancelledError, ToolFatalError
+from .license_pool import LicensePool, DEFAULT_LICENSE_LOCK_DIR
+from .log_watcher import LogWatch, get_log_watcher
+from .executor import Executor, Job, create_executor
+from .session import SessionExecutor, DEFAULT_SESSION_DIR
+from .retry import RetryPolicy, classify_failure
+
+# manager configs of where and how a tool runs, which never change its results,
+# ignored by the flow result cache and the innovus prefix tree
+RUNTIME_CONFIG_KEYS = (
+    'rundir',
+    'input_path',
+    'output_path',
+    'resume',
+    'init_checkpoint',
+    'license_slots',
+    'license_lock_dir',
+    'license_priority',
+    'retry',
+    'fatal_patterns',
+    'kill_grace',
+    'executor',
+    'sessions',
+    'session_dir',
+    'session_reset_code',
+    'pruner',
+)
+
+
+def release_late_license(future: asyncio.Future) -> None:
+    """
+        Release the slot of a license acquisition that finished after its awaiting task was cancelled.
+    """
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result().release()
+
 
 class BaseManager(abc.ABC):
     """
@@ -14,6 +49,11 @@ class BaseManager(abc.ABC):
     def __init__(self, configs: dict) -> None:
         super(BaseManager, self).__init__()
         self.configs = configs
+        self.cancel_token = CancelToken()
+        # wall time, CPU time and largest process RSS of each tool invocation, keyed by step
+        self.resource_usage = dict()
+        # the retry budget is shared by all routine checks of the manager
+        self.retry_policy = self.create_retry_policy()
         mkdir(self.rundir)
 
     @property
@@ -40,48 +80,369 @@ class BaseManager(abc.ABC):
         default_output_path = f'{self.rundir}/{self.name}-output.yml'
         return self.configs.get('output_path', default_output_path)
 
+    @property
+    def kill_grace(self) -> float:
+        """
+            Seconds between SIGTERM and SIGKILL when reclaiming a timed-out or cancelled tool.
+        """
+        return self.configs.get('kill_grace', 10)
+
+    @property
+    def executor(self) -> Executor:
+        """
+            Backend launching the tool commands, selected by 'executor' in configs (local by default),
+            or warm tool sessions, see use_sessions.
+        """
+        if self.use_sessions:
+            return self.create_session_executor()
+        return create_executor(self.configs, self.rundir)
+
+    @property
+    def session_cmd(self) -> str:
+        """
+            Command starting the tool in interactive mode, None if the tool does not support sessions.
+            In session mode, routine_check takes Tcl code instead of a shell command,
+            and the output of step <name> goes to <log_dir>/<name>.
+        """
+        return None
+
+    @property
+    def default_session_reset_code(self) -> str:
+        """
+            Tcl code bringing a session back to a clean state between jobs.
+        """
+        return ''
+
+    @property
+    def use_sessions(self) -> bool:
+        """
+            Run the tool scripts in warm sessions reused across steps and managers of the process,
+            enabled by 'sessions' in configs, the number of idle sessions to keep.
+        """
+        return bool(self.configs.get('sessions')) and self.session_cmd is not None
+
+    def create_session_executor(self) -> SessionExecutor:
+        # idle sessions hold their licenses, keep no more than there are
+        size = self.configs.get('sessions')
+        license_pool = self.license_pool
+        if license_pool is not None:
+            size = min(size, license_pool.slots.get(self.license_tool) or size)
+        return SessionExecutor(
+            self.session_cmd,
+            self.log_dir,
+            size=size,
+            reset_code=self.configs.get('session_reset_code', self.default_session_reset_code),
+            license_pool=license_pool,
+            license_tool=self.license_tool,
+            license_priority=self.configs.get('license_priority', 0),
+            cancel_token=self.cancel_token,
+            session_dir=self.configs.get('session_dir', DEFAULT_SESSION_DIR),
+        )
+
+    def create_retry_policy(self) -> RetryPolicy:
+        """
+            Retry policy of transient tool failures, configured by 'retry' in configs,
+            e.g., {'max_retries': 3, 'base_delay': 30, 'max_delay': 1800, 'budget': 10}, False disables retries.
+        """
+        retry_configs = self.configs.get('retry', dict())
+        if retry_configs is False:
+            return RetryPolicy(max_retries=0)
+        return RetryPolicy(**retry_configs)
+
+    @property
+    def license_tool(self) -> str:
+        """
+            Name of the licensed tool launched by routine_check, None if it needs no license.
+        """
+        return None
+
+    @property
+    def license_pool(self) -> LicensePool:
+        """
+            Host-wide license slots, enabled by 'license_slots' in configs, e.g., {'genus': 4, 'innovus': 2}.
+        """
+        license_slots = self.configs.get('license_slots')
+        if not license_slots or self.license_tool is None:
+            return None
+        return LicensePool(license_slots, self.configs.get('license_lock_dir', DEFAULT_LICENSE_LOCK_DIR))
+
+    def acquire_license(self):
+        """
+            Wait for a license slot of the tool, returns None if licenses are not limited.
+        """
+        license_pool = self.license_pool
+        if license_pool is None:
+            return None
+        return license_pool.acquire(
+            self.license_tool,
+            priority=self.configs.get('license_priority', 0),
+            cancel_token=self.cancel_token,
+        )
+
+    async def acquire_license_async(self):
+        """
+            Wait for a license slot like acquire_license in a worker thread. The thread cannot be interrupted,
+            so if the awaiting task is cancelled, a slot acquired by the thread afterwards is released at once.
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(self.acquire_license))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(release_late_license)
+            raise
+
+    @property
+    def default_fatal_patterns(self) -> dict:
+        """
+            Regular expressions of log lines after which the tool run is lost, keyed by error category.
+        """
+        return dict()
+
+    @property
+    def fatal_patterns(self) -> dict:
+        """
+            Fatal log patterns, overridden by 'fatal_patterns' in configs, e.g., {'license': ['Could not checkout']}.
+            An empty dict disables log watching.
+        """
+        return self.configs.get('fatal_patterns', self.default_fatal_patterns)
+
+    def watch_log(self, log_path) -> LogWatch:
+        """
+            Follow the log of a tool run, return None if there is nothing to watch.
+        """
+        if not log_path or not self.fatal_patterns:
+            return None
+        return get_log_watcher().watch(log_path, self.fatal_patterns)
+
+    def check_log(self, log_watch: LogWatch) -> None:
+        """
+            Check the remaining lines of the log, raise ToolFatalError if it reported a fatal error.
+        """
+        if log_watch is None:
+            return
+        get_log_watcher().unwatch(log_watch)
+        if log_watch.matched:
+            raise ToolFatalError(log_watch.category, log_watch.line)
+
+    def cancel(self) -> None:
+        """
+            Cancel the running tool (if any) and all following routine checks.
+            Safe to call from another thread, e.g., a campaign coordinator.
+        """
+        self.cancel_token.cancel()
+
+    def record_usage(self, step: str, job: Job) -> None:
+        """
+            Record the resource usage of a finished tool job under the step name, see get_process_usage.
+            max_process_rss_mb is the largest RSS of a single process of the tool, not the peak of the process tree.
+        """
+        if job.returncode is None:
+            return
+        step = step or 'step%d' % len(self.resource_usage)
+        self.resource_usage[step] = job.get_usage()
+
     def routine_check(
         self,
         period: int,
         cmd: str,
         condition: Callable,
         wait: int = 1,
+        step: str = None,
+        log_path=None,
+        executor: Executor = None,
     ):
         """
-        Perform a routine check by executing a command and checking a condition periodically.
+        Perform a routine check by executing a command and checking a condition once it exits.
 
         Args:
             period (int): The total duration in seconds for the routine check.
             cmd (str): The command to execute.
             condition (Callable): A callable object that represents the condition to be checked.
-            wait (int, optional): The duration in seconds to wait between each check. Defaults to 1.
+            wait (int, optional): The polling interval in seconds, only used on platforms without pidfd. Defaults to 1.
+            step (str, optional): The step name to record the resource usage under. Defaults to None.
+            log_path (str | list, optional): The log of the tool (or candidate paths), followed for fatal_patterns
+                to abort the tool early. Defaults to None.
+            executor (Executor, optional): The backend running cmd, instead of the executor of the manager. Defaults to None.
+
+        Transient failures (license, NFS, out of memory) are retried with exponential backoff,
+        see RetryPolicy and 'retry' in configs.
 
         Raises:
             RoutineCheckError: If the condition is not satisfied within the specified period.
+            RoutineCancelledError: If the manager is cancelled before the command finishes.
+            ToolFatalError: If the log reports a fatal error.
 
         """
+        attempt = 0
+        while True:
+            try:
+                return self.run_check(period, cmd, condition, wait, step, log_path, executor)
+            except RoutineCheckError as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                warn("%s failed (%s), retry in %g seconds" % (step or cmd, classify_failure(e), delay))
+                if self.cancel_token.wait(delay):
+                    raise RoutineCancelledError
+                attempt += 1
+
+    def run_check(
+        self,
+        period: int,
+        cmd: str,
+        condition: Callable,
+        wait: int = 1,
+        step: str = None,
+        log_path=None,
+        executor: Executor = None,
+    ):
+        """
+            One attempt of routine_check.
+        """
         # early exit if condition is already satisfied
         if condition():
             return
-        
-        # run cmd async, return on finish or timeout
-        start = timestamp()
-        process = execute(cmd, verbose=True, wait=False)
-        while (timestamp() - start) < period:
-            if process.poll() is not None:
+        if self.cancel_token.cancelled:
+            raise RoutineCancelledError
+
+        # a session holds its own license slot
+        license_slot = None if self.use_sessions else self.acquire_license()
+        log_watch = None
+        try:
+            # run cmd async, wake up on exit, timeout or cancellation
+            log_watch = self.watch_log(log_path)
+            cancel_tokens = [self.cancel_token, log_watch.token if log_watch else None]
+            job = (executor or self.executor).launch(cmd, name=step or 'job')
+            try:
+                exited = job.wait(period, cancel_tokens, interval=wait)
+            except BaseException:
+                # e.g. KeyboardInterrupt, never leave the tool tree behind
+                job.kill(self.kill_grace)
+                self.record_usage(step, job)
+                raise
+            if exited:
+                self.record_usage(step, job)
                 if not condition():
-                    raise RoutineCheckError
-                else:
-                    return
-            sleep(wait)
+                    self.check_log(log_watch)
+                    raise RoutineCheckError(job.returncode)
+                return
+
+            # timeout, cancelled or fatal log line, reclaim the process tree and raise error
+            job.kill(self.kill_grace)
+            self.record_usage(step, job)
+            if self.cancel_token.cancelled:
+                raise RoutineCancelledError
+            self.check_log(log_watch)
+            raise RoutineCheckError(timed_out=True)
+        finally:
+            if log_watch:
+                get_log_watcher().unwatch(log_watch)
+            if license_slot:
+                license_slot.release()
+
+    async def routine_check_async(
+        self,
+        period: int,
+        cmd: str,
+        condition: Callable,
+        step: str = None,
+        log_path=None,
+        executor: Executor = None,
+    ):
+        """
+        Asyncio counterpart of routine_check, the event loop is free while the tool runs.
+
+        Args:
+            period (int): The total duration in seconds for the routine check.
+            cmd (str): The command to execute.
+            condition (Callable): A callable object that represents the condition to be checked.
+            step (str, optional): The step name to record the resource usage under. Defaults to None.
+            log_path (str | list, optional): The log of the tool (or candidate paths), followed for fatal_patterns
+                to abort the tool early. Defaults to None.
+            executor (Executor, optional): The backend running cmd, instead of the executor of the manager. Defaults to None.
 
-        # timeout, terminate the process and raise error
-        process.terminate()
-        raise RoutineCheckError    
+        Transient failures (license, NFS, out of memory) are retried with exponential backoff,
+        see RetryPolicy and 'retry' in configs.
+
+        Raises:
+            RoutineCheckError: If the condition is not satisfied within the specified period.
+            RoutineCancelledError: If the manager is cancelled before the command finishes.
+            ToolFatalError: If the log reports a fatal error.
+
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self.run_check_async(period, cmd, condition, step, log_path, executor)
+            except RoutineCheckError as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                warn("%s failed (%s), retry in %g seconds" % (step or cmd, classify_failure(e), delay))
+                if await self.cancel_token.wait_async(delay):
+                    raise RoutineCancelledError
+                attempt += 1
+
+    async def run_check_async(
+        self,
+        period: int,
+        cmd: str,
+        condition: Callable,
+        step: str = None,
+        log_path=None,
+        executor: Executor = None,
+    ):
+        """
+            One attempt of routine_check_async.
+        """
+        if condition():
+            return
+        if self.cancel_token.cancelled:
+            raise RoutineCancelledError
+
+        license_slot = None if self.use_sessions else await self.acquire_license_async()
+        log_watch = None
+        try:
+            log_watch = self.watch_log(log_path)
+            cancel_tokens = [self.cancel_token, log_watch.token if log_watch else None]
+            # local jobs are plain Popen children watched through their pidfd, so that they are reaped
+            # with wait4 and their resource usage is kept (asyncio subprocesses are reaped by the child watcher)
+            job = await asyncio.to_thread((executor or self.executor).launch, cmd, step or 'job')
+            try:
+                exited = await job.wait_async(period, cancel_tokens)
+            except BaseException:
+                # e.g. the coordinating task is cancelled
+                await asyncio.shield(job.kill_async(self.kill_grace))
+                self.record_usage(step, job)
+                raise
+            if exited:
+                self.record_usage(step, job)
+                if not condition():
+                    self.check_log(log_watch)
+                    raise RoutineCheckError(job.returncode)
+                return
+
+            await job.kill_async(self.kill_grace)
+            self.record_usage(step, job)
+            if self.cancel_token.cancelled:
+                raise RoutineCancelledError
+            self.check_log(log_watch)
+            raise RoutineCheckError(timed_out=True)
+        finally:
+            if log_watch:
+                get_log_watcher().unwatch(log_watch)
+            if license_slot:
+                license_slot.release()
 
     @abc.abstractmethod
     def run_impl(self) -> None:
         raise NotImplementedError
+
+    async def run_impl_async(self) -> None:
+        """
+            Managers without a native asyncio implementation run in a worker thread.
+        """
+        await asyncio.to_thread(self.run_impl)
     
 
     @abc.abstractmethod
@@ -97,10 +458,22 @@ class BaseManager(abc.ABC):
 
         return self.generate_output()
 
+    async def run_async(self) -> dict:
+        """
+            Asyncio counterpart of run, so that one event loop can drive many tool runs.
+        """
+        if self.input_path:
+            mkdir(get_dir(self.input_path))
+            dump_yaml(self.configs, self.input_path)
+        await self.run_impl_async()
+
+        return self.generate_output()
+
     def generate_output(self) -> dict:
         output = self.generate_output_impl()
         if self.output_path:
             mkdir(get_dir(self.output_path))
-            dump_yaml(output, self.output_path)
+            # resource usage only goes to the output yaml, the returned output feeds downstream configs
+            dump_yaml(dict(output, resource_usage=self.resource_usage), self.output_path)
 
         return output
\ No newline at end of file
@@ -0,0 +1,277 @@
+import os
+import abc
+import uuid
+import shlex
+import select
+import asyncio
+import subprocess
+from utils import execute, wait_process, wait_process_async, kill_process_tree, kill_process_tree_async, \
+    get_process_usage, mkdir, info, warn, timestamp, CancelToken
+
+
+# sbatch/squeue/scancel command templates, see BatchQueueExecutor
+SLURM_COMMANDS = {
+    'submit': 'sbatch --parsable -J {name} -o {output} {script}',
+    'poll': 'squeue -h -j {job_id} -o %T',
+    'cancel': 'scancel {job_id}',
+}
+
+# states reported by a scheduler for jobs which will not run any more
+FINISHED_STATES = (
+    'COMPLETED', 'FAILED', 'CANCELLED', 'TIMEOUT', 'NODE_FAIL',
+    'OUT_OF_MEMORY', 'BOOT_FAIL', 'DEADLINE', 'PREEMPTED',
+)
+
+
+class Job(abc.ABC):
+    """
+        A launched tool command, waited on and reclaimed by BaseManager.routine_check.
+    """
+
+    def __init__(self) -> None:
+        self.start_time = timestamp()
+        self.end_time = None
+
+    @property
+    @abc.abstractmethod
+    def returncode(self) -> int:
+        """
+            Exit code once the job is finished, None while it runs.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def wait(self, timeout: float, cancel_tokens: list = None, interval: float = 1) -> bool:
+        """
+            Block until the job finishes, the timeout expires or any token is cancelled.
+            Return True if the job finished.
+        """
+        raise NotImplementedError
+
+    async def wait_async(self, timeout: float, cancel_tokens: list = None) -> bool:
+        # wait in a worker thread, woken up through an extra token if the task is cancelled
+        task_token = CancelToken()
+        try:
+            return await asyncio.to_thread(self.wait, timeout, list(cancel_tokens or []) + [task_token])
+        finally:
+            task_token.cancel()
+
+    @abc.abstractmethod
+    def kill(self, grace: float = 10) -> None:
+        """
+            Terminate the job and everything it started.
+        """
+        raise NotImplementedError
+
+    async def kill_async(self, grace: float = 10) -> None:
+        await asyncio.to_thread(self.kill, grace)
+
+    def get_usage(self) -> dict:
+        end_time = self.end_time or timestamp()
+        return {
+            'wall_time_s': round(end_time - self.start_time, 3),
+            'returncode': self.returncode,
+        }
+
+
+class LocalJob(Job):
+    """
+        A process tree on the local host.
+    """
+
+    def __init__(self, cmd: str) -> None:
+        super().__init__()
+        self.process = execute(cmd, verbose=True, wait=False)
+
+    @property
+    def returncode(self) -> int:
+        return self.process.returncode
+
+    def wait(self, timeout: float, cancel_tokens: list = None, interval: float = 1) -> bool:
+        return wait_process(self.process, timeout, cancel_tokens, interval=interval)
+
+    async def wait_async(self, timeout: float, cancel_tokens: list = None) -> bool:
+        return await wait_process_async(self.process, timeout, cancel_tokens)
+
+    def kill(self, grace: float = 10) -> None:
+        kill_process_tree(self.process, grace)
+
+    async def kill_async(self, grace: float = 10) -> None:
+        await kill_process_tree_async(self.process, grace)
+
+    def get_usage(self) -> dict:
+        return get_process_usage(self.process, timestamp() - self.start_time)
+
+
+class BatchJob(Job):
+    """
+        A job of a batch scheduler, submitted as a wrapper script which records the exit code.
+    """
+
+    def __init__(self, executor, cmd: str, name: str) -> None:
+        super().__init__()
+        self.executor = executor
+        self.name = name
+        self.job_id = None
+        self.exit_code = None
+        self.poll_errors = 0
+
+        tag = '%s-%s' % (name, uuid.uuid4().hex[:8])
+        self.script_path = os.path.join(executor.job_dir, '%s.sh' % tag)
+        self.output_path = os.path.join(executor.job_dir, '%s.out' % tag)
+        self.exit_path = os.path.join(executor.job_dir, '%s.exit' % tag)
+        with open(self.script_path, 'w') as f:
+            f.write("#!/bin/bash\n")
+            f.write("/bin/bash -c %s\n" % shlex.quote(cmd))
+            f.write("echo $? > %s\n" % shlex.quote(self.exit_path))
+
+        info("submitting %s: %s" % (name, cmd))
+        output = executor.run_command('submit', name=name, script=self.script_path, output=self.output_path)
+        if output is None or not output.split():
+            raise RuntimeError("failed to submit job %s" % name)
+        # e.g. '12345', '12345;cluster' or 'Submitted batch job 12345'
+        self.job_id = output.split()[-1].split(';')[0]
+        info("job %s submitted as %s" % (name, self.job_id))
+
+    @property
+    def returncode(self) -> int:
+        return self.exit_code
+
+    def read_exit_code(self):
+        try:
+            with open(self.exit_path, 'r') as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def poll(self) -> bool:
+        """
+            Return True if the job finished, and set its exit code.
+        """
+        if self.exit_code is not None:
+            return True
+        exit_code = self.read_exit_code()
+        if exit_code is None:
+            output = self.executor.run_command('poll', job_id=self.job_id)
+            if output is None:
+                # transient scheduler errors are tolerated, a purged job id fails repeatedly
+                self.poll_errors += 1
+                if self.poll_errors < self.executor.max_poll_errors:
+                    return False
+            elif output.strip() and output.split()[0].upper() not in FINISHED_STATES:
+                self.poll_errors = 0
+                return False
+            # left the queue, the exit code may show up late on a shared filesystem
+            exit_code = self.read_exit_code()
+            if exit_code is None:
+                exit_code = -1
+        self.exit_code = exit_code
+        self.end_time = timestamp()
+        return True
+
+    def wait(self, timeout: float, cancel_tokens: list = None, interval: float = 1) -> bool:
+        cancel_tokens = [token for token in (cancel_tokens or []) if token is not None]
+        deadline = timestamp() + timeout
+        while not any(token.cancelled for token in cancel_tokens):
+            if self.poll():
+                return True
+            remaining = deadline - timestamp()
+            if remaining <= 0:
+                return False
+            # sleep until the next poll, waking up early on cancellation
+            select.select(cancel_tokens, [], [], min(self.executor.poll_interval, remaining))
+        return False
+
+    def kill(self, grace: float = 10) -> None:
+        if self.poll():
+            return
+        self.executor.run_command('cancel', job_id=self.job_id)
+        if not self.wait(grace):
+            warn("job %s is still queued after cancel" % self.job_id)
+            self.exit_code = -1
+            self.end_time = timestamp()
+
+
+class Executor(abc.ABC):
+    """
+        Backend launching the tool commands of a manager.
+    """
+
+    @abc.abstractmethod
+    def launch(self, cmd: str, name: str = 'job') -> Job:
+        raise NotImplementedError
+
+
+class LocalExecutor(Executor):
+    """
+        Run commands as process trees of the local host.
+    """
+
+    def launch(self, cmd: str, name: str = 'job') -> Job:
+        return LocalJob(cmd)
+
+
+class BatchQueueExecutor(Executor):
+    """
+        Run commands as jobs of a batch scheduler through its CLI, e.g., Slurm sbatch/squeue/scancel.
+
+        Command templates are formatted with:
+            submit: {name}, {script}, {output}, prints the job id (last token, before any ';').
+            poll: {job_id}, prints the job state, nothing once the job left the queue.
+            cancel: {job_id}.
+        Commands keep their rundir, log and timeout semantics, as the rundir and the job directory
+        must be on a filesystem shared with the compute nodes. Only wall time and exit code are
+        recorded as resource usage.
+    """
+
+    def __init__(
+        self,
+        job_dir: str,
+        submit: str = SLURM_COMMANDS['submit'],
+        poll: str = SLURM_COMMANDS['poll'],
+        cancel: str = SLURM_COMMANDS['cancel'],
+        poll_interval: float = 10,
+        max_poll_errors: int = 3,
+    ) -> None:
+        self.job_dir = job_dir
+        self.commands = {'submit': submit, 'poll': poll, 'cancel': cancel}
+        self.poll_interval = poll_interval
+        self.max_poll_errors = max_poll_errors
+        mkdir(self.job_dir)
+
+    def run_command(self, kind: str, **kwargs):
+        """
+            Run a scheduler command, return its stdout, or None if it failed.
+        """
+        cmd = self.commands[kind].format(**{k: shlex.quote(v) for k, v in kwargs.items()})
+        result = subprocess.run(["/bin/bash", "-c", cmd], capture_output=True, text=True)
+        if result.returncode != 0:
+            warn("%s failed (%d): %s" % (cmd, result.returncode, result.stderr.strip()))
+            return None
+        return result.stdout
+
+    def launch(self, cmd: str, name: str = 'job') -> Job:
+        return BatchJob(self, cmd, name)
+
+
+def create_executor(configs: dict, rundir: str) -> Executor:
+    """
+        Create the executor selected by 'executor' in configs, e.g.,
+            'local' (default),
+            {'type': 'batch', 'submit': ..., 'poll': ..., 'cancel': ..., 'poll_interval': 10}.
+        Job scripts and outputs go to 'job_dir', defaults to <rundir>/jobs.
+    """
+    executor_configs = configs.get('executor') or 'local'
+    if isinstance(executor_configs, str):
+        executor_configs = {'type': executor_configs}
+    executor_configs = dict(executor_configs)
+    executor_type = executor_configs.pop('type', 'local')
+
+    if executor_type == 'local':
+        return LocalExecutor()
+
+    job_dir = executor_configs.pop('job_dir', os.path.join(rundir, 'jobs'))
+    if executor_type == 'batch':
+        return BatchQueueExecutor(job_dir, **executor_configs)
+    else:
+        raise NotImplementedError("executor %s is not supported" % executor_type)
@@ -0,0 +1,89 @@
+import os
+import hashlib
+from utils import info, remove, file_digest
+
+# configs of technology files, which the generated scripts only read by path
+TECH_FILE_KEYS = ('setup_lib_files', 'hold_lib_files', 'lef_files', 'qrc_techfiles')
+
+
+def get_tech_files(configs: dict) -> list:
+    """
+        The technology files of the configs, to be fingerprinted with the first step reading them.
+    """
+    return [path for key in TECH_FILE_KEYS for path in configs.get(key) or []]
+
+
+class StepFingerprints(object):
+    """
+        Fingerprints of finished steps, stored next to their checkpoints in the data directory.
+        A step fingerprint covers its generated scripts, its input files and the fingerprint
+        of its upstream step, so a change invalidates the step and every step after it.
+    """
+
+    def __init__(self, data_dir: str) -> None:
+        self.data_dir = data_dir
+        self.pending = dict()
+
+    def get_path(self, step: str) -> str:
+        return os.path.join(self.data_dir, '%s.fingerprint' % step)
+
+    def compute(self, files: list, upstream: str = None) -> str:
+        sha = hashlib.sha256()
+        sha.update((upstream or '').encode('utf-8'))
+        for path in files:
+            sha.update(path.encode('utf-8'))
+            sha.update(file_digest(path).encode('utf-8') if os.path.isfile(path) else b'missing')
+        return sha.hexdigest()
+
+    def load(self, step: str) -> str:
+        path = self.get_path(step)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r') as f:
+            return f.read().strip()
+
+    def is_fresh(self, step: str, fingerprint: str, checkpoints: list) -> bool:
+        """
+            A step is fresh if it finished with the same fingerprint and all its checkpoints still exist.
+        """
+        return self.load(step) == fingerprint and all(os.path.exists(c) for c in checkpoints)
+
+    def expect(self, step: str, fingerprint: str, checkpoints: list) -> None:
+        """
+            Mark the step to be (re-)run: drop its stale fingerprint and checkpoints,
+            the fingerprint is recorded by commit() once the step succeeds.
+        """
+        remove(self.get_path(step))
+        for checkpoint in checkpoints:
+            remove(checkpoint)
+        self.pending[step] = fingerprint
+
+    def commit(self, step: str) -> None:
+        if step not in self.pending:
+            return
+        with open(self.get_path(step), 'w') as f:
+            f.write(self.pending.pop(step))
+
+    def plan(self, steps: list, force: bool = False) -> list:
+        """
+            Decide which steps to run.
+
+            Args:
+                steps (list): (step, files, checkpoints) tuples in execution order.
+                force (bool, optional): Re-run all steps. Defaults to False.
+
+            Returns:
+                list: Names of the steps to run. Once a step runs, all following steps run as well,
+                      since their upstream checkpoint changes.
+        """
+        to_run = []
+        upstream = None
+        for step, files, checkpoints in steps:
+            fingerprint = self.compute(files, upstream)
+            if not force and not to_run and self.is_fresh(step, fingerprint, checkpoints):
+                info("skip step %s, fingerprint unchanged" % step)
+            else:
+                self.expect(step, fingerprint, checkpoints)
+                to_run.append(step)
+            upstream = fingerprint
+        return to_run
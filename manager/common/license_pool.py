@@ -0,0 +1,164 @@
+import os
+import uuid
+import fcntl
+import select
+import tempfile
+from utils import mkdir, info, timestamp, RoutineCancelledError, CancelToken
+
+
+DEFAULT_LICENSE_LOCK_DIR = os.path.join(tempfile.gettempdir(), 'cross-layer-dse-licenses')
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LicenseSlot(object):
+    """
+        A held license slot, i.e., an exclusive flock on one slot file.
+        The lock is dropped by the kernel if the holding process dies.
+    """
+
+    def __init__(self, tool: str, index: int, fd: int) -> None:
+        self.tool = tool
+        self.index = index
+        self.fd = fd
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+        info("release %s license slot %d" % (self.tool, self.index))
+
+
+class LicensePool(object):
+    """
+        Host-wide license slots shared by all processes through file locks.
+
+        Each tool owns a fixed number of slot files (e.g., genus=4, innovus=2),
+        holding the flock of a slot file is holding a license.
+        Waiters queue with ticket files, and only the head of the queue,
+        ordered by descending priority and then arrival, may take a free slot.
+    """
+
+    def __init__(self, slots: dict, lock_dir: str = DEFAULT_LICENSE_LOCK_DIR, interval: float = 0.5) -> None:
+        self.slots = slots
+        self.lock_dir = lock_dir
+        self.interval = interval
+
+    def get_slot_path(self, tool: str, index: int) -> str:
+        return os.path.join(self.lock_dir, '%s.%d.lock' % (tool, index))
+
+    def get_queue_dir(self, tool: str) -> str:
+        return os.path.join(self.lock_dir, '%s.queue' % tool)
+
+    def create_ticket(self, tool: str, priority: int) -> str:
+        queue_dir = self.get_queue_dir(tool)
+        mkdir(queue_dir)
+        ticket_name = '%d-%d-%s' % (timestamp() * 1e6, os.getpid(), uuid.uuid4().hex)
+        ticket_path = os.path.join(queue_dir, ticket_name)
+        # write then rename, so that other waiters never read a partial ticket
+        with open(ticket_path + '.tmp', 'w') as f:
+            f.write(str(priority))
+        os.replace(ticket_path + '.tmp', ticket_path)
+        return ticket_path
+
+    def read_queue(self, tool: str) -> list:
+        """
+            Return the ticket paths of live waiters in service order, and remove stale tickets.
+        """
+        queue_dir = self.get_queue_dir(tool)
+        tickets = []
+        for ticket_name in os.listdir(queue_dir):
+            if ticket_name.endswith('.tmp'):
+                continue
+            ticket_path = os.path.join(queue_dir, ticket_name)
+            arrival, pid, _ = ticket_name.split('-')
+            try:
+                with open(ticket_path, 'r') as f:
+                    priority = int(f.read())
+            except (FileNotFoundError, ValueError):
+                continue
+            if not pid_alive(int(pid)):
+                self.remove_ticket(ticket_path)
+                continue
+            tickets.append((-priority, int(arrival), ticket_path))
+
+        return [ticket_path for _, _, ticket_path in sorted(tickets)]
+
+    def has_waiters(self, tool: str) -> bool:
+        """
+            Whether any live process waits for a slot of the tool.
+        """
+        if not os.path.isdir(self.get_queue_dir(tool)):
+            return False
+        return len(self.read_queue(tool)) > 0
+
+    def remove_ticket(self, ticket_path: str) -> None:
+        try:
+            os.remove(ticket_path)
+        except FileNotFoundError:
+            pass
+
+    def try_lock_slot(self, tool: str):
+        for index in range(self.slots[tool]):
+            fd = os.open(self.get_slot_path(tool, index), os.O_RDWR | os.O_CREAT, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return LicenseSlot(tool, index, fd)
+        return None
+
+    def acquire(self, tool: str, priority: int = 0, timeout: float = None, cancel_token: CancelToken = None):
+        """
+        Block until a license slot of the tool is available.
+
+        Args:
+            tool (str): The tool name, e.g., genus or innovus.
+            priority (int, optional): Waiters with higher priority are served first. Defaults to 0.
+            timeout (float, optional): The maximal duration in seconds to wait. Defaults to None (forever).
+            cancel_token (CancelToken, optional): Abort waiting once cancelled. Defaults to None.
+
+        Returns:
+            LicenseSlot: The held slot, or None if the tool is not limited.
+
+        Raises:
+            TimeoutError: If no slot is available within the timeout.
+            RoutineCancelledError: If the cancel token is cancelled while waiting.
+        """
+        if self.slots.get(tool) is None:
+            return None
+
+        mkdir(self.lock_dir)
+        ticket_path = self.create_ticket(tool, priority)
+        deadline = None if timeout is None else timestamp() + timeout
+        try:
+            while True:
+                queue = self.read_queue(tool)
+                if queue and queue[0] == ticket_path:
+                    slot = self.try_lock_slot(tool)
+                    if slot is not None:
+                        info("acquire %s license slot %d" % (tool, slot.index))
+                        return slot
+
+                if deadline is not None and timestamp() > deadline:
+                    raise TimeoutError("no %s license slot within %.1f s" % (tool, timeout))
+
+                if cancel_token is None:
+                    select.select([], [], [], self.interval)
+                else:
+                    select.select([cancel_token], [], [], self.interval)
+                    if cancel_token.cancelled:
+                        raise RoutineCancelledError
+        finally:
+            self.remove_ticket(ticket_path)
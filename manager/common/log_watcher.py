@@ -0,0 +1,207 @@
+import os
+import re
+import time
+import threading
+from utils import CancelToken, warn
+
+
+# fatal log lines shared by most tools, see BaseManager.default_fatal_patterns
+LICENSE_PATTERNS = [
+    r'(?i)licen[cs]e.*(denied|unavailable|not available|checkout failed|could not be checked out)',
+    r'(?i)(could not|unable to|failed to) check ?out',
+]
+MEMORY_PATTERNS = [
+    r'(?i)out of memory',
+    r'std::bad_alloc',
+]
+NFS_PATTERNS = [
+    r'(?i)stale (nfs )?file handle',
+    r'(?i)nfs server .* not responding',
+]
+
+# bytes at the start and at the end of a stale log, which a log appended in place still has at the same offsets
+STALE_CHECK_SIZE = 4096
+
+
+def read_stale_check(path: str, size: int) -> tuple:
+    """
+        The first and the last bytes of the first size bytes of a log.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(min(size, STALE_CHECK_SIZE))
+        f.seek(max(size - STALE_CHECK_SIZE, 0))
+        tail = f.read(min(size, STALE_CHECK_SIZE))
+    return head, tail
+
+
+class LogWatch(object):
+    """
+        A log file followed by the LogWatcher on behalf of one tool invocation.
+        The token is cancelled on the first line matching a fatal pattern.
+    """
+
+    def __init__(self, paths: list, patterns: dict) -> None:
+        self.paths = paths
+        self.patterns = [
+            (category, re.compile(pattern))
+            for category, category_patterns in patterns.items()
+            for pattern in category_patterns
+        ]
+        self.token = CancelToken()
+        self.lock = threading.Lock()
+        self.category = None
+        self.line = None
+
+        self.path = None
+        self.inode = None
+        self.offset = 0
+        self.partial = b''
+        # a log left by a previous run is only followed once it is rewritten
+        self.stale = dict()
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                self.stale[path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns, read_stale_check(path, stat.st_size))
+            except FileNotFoundError:
+                continue
+
+    @property
+    def matched(self) -> bool:
+        return self.category is not None
+
+    def open_log(self):
+        """
+            Locate the log among the candidate paths, return its stat, or None if not written yet.
+        """
+        for path in ([self.path] if self.path else self.paths):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if self.path is None:
+                if path in self.stale:
+                    inode, size, mtime, check = self.stale[path]
+                    if stat.st_ino == inode and stat.st_size == size and stat.st_mtime_ns == mtime:
+                        continue
+                    # a log rewritten in place keeps its inode, e.g., truncated by tee, and may already be
+                    # longer than the old one: the old contents are only skipped if they are still there
+                    if stat.st_ino == inode and stat.st_size > size and read_stale_check(path, size) == check:
+                        self.offset = size
+                self.path = path
+                self.inode = stat.st_ino
+            return stat
+        return None
+
+    def poll(self) -> bool:
+        """
+            Read the lines appended since the last poll, return True on a fatal match.
+        """
+        stat = self.open_log()
+        if stat is None:
+            return False
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # rotated or truncated
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.partial = b''
+        if stat.st_size == self.offset:
+            return False
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(stat.st_size - self.offset)
+        self.offset += len(chunk)
+
+        lines = (self.partial + chunk).split(b'\n')
+        self.partial = lines.pop()
+        for line in lines:
+            text = line.decode('utf-8', errors='replace')
+            for category, pattern in self.patterns:
+                if pattern.search(text):
+                    self.category = category
+                    self.line = text.strip()
+                    return True
+        return False
+
+
+class LogWatcher(object):
+    """
+        Follow the logs of running tools in a single background thread, and cancel
+        the token of a watch as soon as its log reports a fatal error, e.g., a license
+        denial, instead of waiting for the tool to exit or time out.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.watches = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def watch(self, paths, patterns: dict) -> LogWatch:
+        """
+            Start following a log.
+
+            Args:
+                paths (str | list): The log path, or candidate paths if the tool may add a suffix.
+                patterns (dict): Regular expressions of fatal lines, keyed by error category.
+
+            Returns:
+                LogWatch: The watch, whose token is cancelled on a fatal match.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        log_watch = LogWatch(paths, patterns)
+        with self.lock:
+            self.watches.add(log_watch)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.loop, name='log-watcher', daemon=True)
+                self.thread.start()
+        return log_watch
+
+    def unwatch(self, log_watch: LogWatch) -> None:
+        """
+            Stop following a log, the remaining lines are checked once more.
+        """
+        with self.lock:
+            self.watches.discard(log_watch)
+        self.poll(log_watch)
+        log_watch.token.close()
+
+    def poll(self, log_watch: LogWatch) -> None:
+        with log_watch.lock:
+            if log_watch.matched:
+                return
+            try:
+                matched = log_watch.poll()
+            except OSError as e:
+                warn("log watcher: cannot read %s: %s" % (log_watch.path, e))
+                return
+        if matched:
+            warn("log watcher: fatal line (%s) in %s: %s" % (log_watch.category, log_watch.path, log_watch.line))
+            log_watch.token.cancel()
+
+    def loop(self) -> None:
+        while True:
+            with self.lock:
+                watches = list(self.watches)
+                if not watches:
+                    self.thread = None
+                    return
+            for log_watch in watches:
+                self.poll(log_watch)
+            time.sleep(self.interval)
+
+
+_log_watcher = None
+_log_watcher_lock = threading.Lock()
+
+
+def get_log_watcher() -> LogWatcher:
+    """
+        The log watcher shared by all managers of the process.
+    """
+    global _log_watcher
+    with _log_watcher_lock:
+        if _log_watcher is None:
+            _log_watcher = LogWatcher()
+        return _log_watcher
@@ -0,0 +1,152 @@
+import os
+import marshal
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utils import create_hash
+
+# bumped when the layout of the sidecar files changes
+SIDECAR_VERSION = 2
+SIDECAR_SUFFIX = '.parsed'
+
+
+def get_parser_name(parser_class) -> str:
+    return '%s.%s' % (parser_class.__module__, parser_class.__qualname__)
+
+
+class ReportCache(object):
+    """
+        Parsed results of report parsers, memoized in the process and stored in a sidecar next to each report,
+        e.g., area.rpt.<key>.parsed, so that other processes reading the same rundir do not parse it again.
+        Rundirs are shared between users and hosts, so sidecars are written with marshal, which only loads
+        plain values (results are dicts, lists, strings and numbers), never with pickle.
+
+        A result is keyed by the parser class and its arguments, and is valid for the path, size and modification
+        time of the report and the version of the parser it was parsed from. Every access stats the report,
+        a stale memo or sidecar is parsed again. Results are shared between callers and must not be modified.
+
+        Args:
+            sidecar (bool, optional): Read and write sidecar files, or only memoize in the process. Defaults to True.
+            max_entries (int, optional): The maximal number of results memoized, least recently used first out. Defaults to 256.
+    """
+
+    def __init__(self, sidecar: bool = True, max_entries: int = 256) -> None:
+        self.sidecar = sidecar
+        self.max_entries = max_entries
+        self.memo = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_key(self, parser_class, args: tuple, kwargs: dict) -> str:
+        return create_hash(repr((get_parser_name(parser_class), args, sorted(kwargs.items()))))
+
+    def get_sidecar_path(self, report_path: str, key: str) -> str:
+        return '%s.%s%s' % (report_path, key[:12], SIDECAR_SUFFIX)
+
+    def get_stamp(self, parser_class, report_path: str) -> tuple:
+        """
+            What a parsed result is valid for, an error if the report does not exist.
+        """
+        stat = os.stat(report_path)
+        return (SIDECAR_VERSION, parser_class.version, os.path.abspath(report_path), stat.st_size, stat.st_mtime_ns)
+
+    def load_sidecar(self, sidecar_path: str, key: str, stamp: tuple):
+        """
+            The result stored in a sidecar, or None if it is missing, unreadable or stale.
+        """
+        try:
+            with open(sidecar_path, 'rb') as f:
+                sidecar_key, sidecar_stamp, result = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if sidecar_key != key or sidecar_stamp != stamp:
+            return None
+        return result
+
+    def dump_sidecar(self, sidecar_path: str, key: str, stamp: tuple, result) -> None:
+        """
+            Store a result atomically, skipped if the report directory is not writable
+            or the result is not made of plain values.
+        """
+        try:
+            data = marshal.dumps((key, stamp, result))
+        except ValueError:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(sidecar_path) or '.')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, sidecar_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_entry(self, parser_class, report_path: str, args: tuple, kwargs: dict) -> list:
+        """
+            The memo entry [stamp, result, index by instance] of a parsed report, parsed only if no valid result is cached.
+        """
+        stamp = self.get_stamp(parser_class, report_path)
+        memo_key = (parser_class, stamp[2], args, tuple(sorted(kwargs.items())))
+
+        with self.lock:
+            entry = self.memo.get(memo_key)
+            if entry is not None and entry[0] == stamp:
+                self.memo.move_to_end(memo_key)
+                return entry
+
+        key = self.get_key(parser_class, args, kwargs)
+        sidecar_path = self.get_sidecar_path(report_path, key)
+        result = self.load_sidecar(sidecar_path, key, stamp) if self.sidecar else None
+        if result is None:
+            result = parser_class(report_path, *args, **kwargs).run()
+            # a report rewritten while parsing is parsed again by the next access
+            if self.get_stamp(parser_class, report_path) != stamp:
+                return [stamp, result, None]
+            if self.sidecar:
+                self.dump_sidecar(sidecar_path, key, stamp, result)
+
+        entry = [stamp, result, None]
+        with self.lock:
+            self.memo[memo_key] = entry
+            self.memo.move_to_end(memo_key)
+            while len(self.memo) > self.max_entries:
+                self.memo.popitem(last=False)
+        return entry
+
+    def get(self, parser_class, report_path: str, *args, **kwargs):
+        """
+            The result of parser_class(report_path, *args, **kwargs).run().
+        """
+        return self.get_entry(parser_class, report_path, args, kwargs)[1]
+
+    def get_row(self, parser_class, report_path: str, instance: str, *args, **kwargs) -> dict:
+        """
+            The row of an instance in the rows parsed from a report, e.g., the top module of an area report.
+            The rows are indexed by instance once per parsed result.
+        """
+        entry = self.get_entry(parser_class, report_path, args, kwargs)
+        if entry[2] is None:
+            entry[2] = {row['instance']: row for row in entry[1]}
+        return entry[2][instance]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.memo.clear()
+
+
+_report_cache = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> ReportCache:
+    """
+        The report cache shared by all flows of the process.
+    """
+    global _report_cache
+    with _report_cache_lock:
+        if _report_cache is None:
+            _report_cache = ReportCache()
+        return _report_cache
@@ -0,0 +1,91 @@
+import threading
+from utils import RoutineCheckError, RoutineCancelledError, ToolFatalError
+
+
+# failure classes
+TRANSIENT = 'transient'
+DETERMINISTIC = 'deterministic'
+
+# fatal log categories which go away on their own, see BaseManager.default_fatal_patterns
+TRANSIENT_CATEGORIES = ('license', 'memory', 'nfs')
+
+# exit codes of a tool killed by SIGKILL, e.g., by the OOM killer: the shell itself, or the tool under the shell
+KILLED_RETURNCODES = (-9, 128 + 9)
+
+
+def classify_failure(error: BaseException) -> str:
+    """
+        Classify a tool failure from its log signature and exit status.
+
+        Returns:
+            str: TRANSIENT for license, NFS and out-of-memory failures, worth a retry,
+                 DETERMINISTIC for failures the same configs will hit again, e.g., a bad netlist,
+                 None for cancellations, timeouts and failed checks without a failing exit code,
+                 neither retried nor remembered.
+    """
+    if isinstance(error, RoutineCancelledError):
+        return None
+    if isinstance(error, ToolFatalError):
+        return TRANSIENT if error.category in TRANSIENT_CATEGORIES else DETERMINISTIC
+    if isinstance(error, RoutineCheckError):
+        if error.timed_out:
+            return None
+        if error.returncode in KILLED_RETURNCODES:
+            return TRANSIENT
+        # the outputs are missing while the command succeeded, or its exit code is unknown,
+        # e.g., a tool killed in a pipe without pipefail: not proven deterministic
+        if not error.returncode:
+            return None
+        return DETERMINISTIC
+    return None
+
+
+class RetryPolicy(object):
+    """
+        Retry transient failures with exponential backoff.
+        The budget bounds the retries of all checks sharing the policy, e.g., a whole campaign,
+        so a broken license server does not turn into an endless retry loop.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 30,
+        max_delay: float = 1800,
+        factor: float = 2,
+        budget: int = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.budget = budget
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state['lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get_delay(self, attempt: int) -> float:
+        """
+            Backoff in seconds before retry number attempt (counting from 0).
+        """
+        return min(self.max_delay, self.base_delay * self.factor ** attempt)
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """
+            Whether to retry after the attempt-th retry failed with error, consumes the budget.
+        """
+        if classify_failure(error) != TRANSIENT or attempt >= self.max_retries:
+            return False
+        with self.lock:
+            if self.budget is not None:
+                if self.budget <= 0:
+                    return False
+                self.budget -= 1
+        return True
@@ -0,0 +1,140 @@
+import re
+import mmap
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def get_head_pattern(regex: re.Pattern) -> re.Pattern:
+    """
+        The pattern without its leading newline, matching a first line at the start of the report.
+    """
+    pattern = regex.pattern
+    if pattern.startswith(b'\\n'):
+        pattern = pattern[2:]
+    elif pattern.startswith(b'\n'):
+        pattern = pattern[1:]
+    return re.compile(pattern, regex.flags)
+
+
+class ReportScanner(object):
+    """
+        Forward search of precompiled byte patterns through a memory-mapped report,
+        so that only the pages searched are read, and only the matched rows are decoded by the parsers.
+
+        A pattern of whole lines begins with a literal newline, which the regex engine searches fast,
+        e.g., rb'\nPath (\d+):', the start of the report counts as a newline. A line pattern should end
+        before the newline of its last line, e.g., with the lookahead (?![^\n]), which also holds at the end
+        of a report without a last newline. The position then stays on the last line matched, and the next
+        pattern or the rows of a table start at the following line.
+    """
+
+    def __init__(self, report_path: str) -> None:
+        self.f = open(report_path, 'rb')
+        try:
+            self.data = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty report cannot be mapped
+            self.data = b''
+        # -1 is the newline before the first line
+        self.pos = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.f.close()
+
+    def search(self, regex: re.Pattern):
+        """
+            Search the pattern from the current position, and move past the match.
+
+            Returns:
+                re.Match: The match, or None at the end of the report.
+        """
+        if self.pos < 0:
+            match = get_head_pattern(regex).match(self.data) or regex.search(self.data)
+        else:
+            match = regex.search(self.data, self.pos)
+        if match is None:
+            self.pos = len(self.data)
+            return None
+        self.pos = match.end()
+        return match
+
+    def read_until(self, regex: re.Pattern):
+        """
+            Search the pattern like search, a section missing from the report raises EOFError.
+        """
+        match = self.search(regex)
+        if match is None:
+            raise EOFError
+        return match
+
+    def iter_matching_lines(self, *regexes: re.Pattern):
+        """
+            Yield each line with a match of any of the patterns, without its newline, in the order of the report.
+            Each pattern is searched on its own, as an alternation of literals is not searched as fast as a literal.
+            The position follows the lines consumed.
+        """
+        data = self.data
+        matches = [regex.search(data, max(self.pos, 0)) for regex in regexes]
+        while True:
+            starts = [match.start() for match in matches if match is not None]
+            if not starts:
+                self.pos = len(data)
+                return
+            start = data.rfind(b'\n', 0, min(starts)) + 1
+            end = data.find(b'\n', start)
+            if end < 0:
+                end = len(data)
+            self.pos = end
+            yield data[start:end]
+            # patterns matching again in the same line
+            matches = [
+                match if match is None or match.start() > end else regex.search(data, end)
+                for regex, match in zip(regexes, matches)
+            ]
+
+    def get_next_line_start(self) -> int:
+        if self.pos < 0:
+            return 0
+        start = self.data.find(b'\n', self.pos)
+        return len(self.data) if start < 0 else start + 1
+
+    def next_line(self) -> bytes:
+        """
+            Move to the line after the current one, and return it without its newline, or None at the end of the report.
+        """
+        start = self.get_next_line_start()
+        if start >= len(self.data):
+            self.pos = len(self.data)
+            return None
+        end = self.data.find(b'\n', start)
+        if end < 0:
+            end = len(self.data)
+        self.pos = end
+        return self.data[start:end]
+
+    def read_lines(self, end_regex: re.Pattern = None) -> list:
+        """
+            Read the rows of a table at once: the lines after the current one, up to the line of end_regex,
+            or up to the end of the report. The position moves past the end line.
+        """
+        start = self.get_next_line_start()
+        end = self.search(end_regex) if end_regex is not None else None
+        if end is None:
+            self.pos = len(self.data)
+            stop = len(self.data)
+        else:
+            stop = end.start()
+        if stop <= start:
+            return []
+        rows = self.data[start:stop]
+        if rows.endswith(b'\n'):
+            rows = rows[:-1]
+        return rows.split(b'\n')
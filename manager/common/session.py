@@ -0,0 +1,396 @@
+import os
+import re
+import uuid
+import atexit
+import signal
+import select
+import tempfile
+import threading
+import subprocess
+from typing import Callable
+from utils import mkdir, info, warn, timestamp, reap_process, signal_process_group, \
+    CancelToken, RoutineCheckError, RoutineCancelledError
+from .executor import Executor, Job
+
+
+DEFAULT_SESSION_DIR = os.path.join(tempfile.gettempdir(), 'cross-layer-dse-sessions')
+
+
+class SessionJob(Job):
+    """
+        A Tcl command run by a ToolSession, its output goes to log_path.
+        The exit code is 0 if the command succeeded, 1 if it raised a Tcl error,
+        or the exit code of the tool if the tool died.
+    """
+
+    def __init__(self, session, log_path: str) -> None:
+        super().__init__()
+        self.session = session
+        self.log_path = log_path
+        mkdir(os.path.dirname(os.path.abspath(log_path)))
+        self.log_file = open(log_path, 'w', buffering=1)
+        self.exit_code = None
+        # called before the job is done, e.g., to return the session to the pool
+        self.on_finish = None
+        self.done = CancelToken()
+
+    @property
+    def returncode(self) -> int:
+        return self.exit_code
+
+    def write(self, line: str) -> None:
+        self.log_file.write(line)
+
+    def finish(self, exit_code: int) -> None:
+        """
+            Called by the session once the command finished or the tool died.
+        """
+        self.exit_code = exit_code
+        self.end_time = timestamp()
+        self.log_file.close()
+        if self.on_finish is not None:
+            self.on_finish()
+        self.done.cancel()
+
+    def wait(self, timeout: float, cancel_tokens: list = None, interval: float = 1) -> bool:
+        cancel_tokens = [token for token in (cancel_tokens or []) if token is not None]
+        deadline = timestamp() + timeout
+        while not self.done.cancelled:
+            if any(token.cancelled for token in cancel_tokens):
+                return False
+            remaining = deadline - timestamp()
+            if remaining <= 0:
+                return False
+            select.select([self.done] + cancel_tokens, [], [], remaining)
+        return True
+
+    def kill(self, grace: float = 10) -> None:
+        # the state of the tool is unknown, the whole session goes
+        if not self.done.cancelled:
+            self.session.kill(grace)
+
+
+class ToolSession(object):
+    """
+        An interactive Tcl tool kept alive to run the scripts of several jobs,
+        saving the tool start-up and the license checkout of each job.
+
+        Each job is sent to the stdin of the tool as
+
+            set rc [catch {<code>} msg]; set reset [catch {<reset_code>}]; puts "<sentinel> $rc $reset"
+
+        and is done once the sentinel line shows up on stdout. The reset code brings the tool back to
+        a clean state for the next job, the session is not reused if it fails.
+        A session holds its license slot, if any, until the tool exits.
+    """
+
+    def __init__(self, cmd: str, reset_code: str = '', license_slot=None, log_path: str = None) -> None:
+        self.cmd = cmd
+        self.reset_code = reset_code
+        self.license_slot = license_slot
+        self.sentinel = '__SESSION_DONE_%s__' % uuid.uuid4().hex
+        self.sentinel_regex = re.compile(r'^%s (\d+) (\d+) ?(.*)' % self.sentinel)
+        self.jobs = 0
+        self.clean = True
+        self.job = None
+        self.lock = threading.Lock()
+        self.exited = CancelToken()
+        self.log_file = open(log_path, 'w', buffering=1) if log_path else None
+
+        info("starting session: %s" % cmd)
+        self.process = subprocess.Popen(
+            ["/bin/bash", "-c", cmd],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        self.reader = threading.Thread(target=self.read_output, daemon=True)
+        self.reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self.exited.cancelled
+
+    def read_output(self) -> None:
+        """
+            Forward the tool output to the log of the running job, and finish it on the sentinel.
+        """
+        for line in self.process.stdout:
+            line = line.decode('utf-8', errors='replace')
+            match = self.sentinel_regex.match(line)
+            with self.lock:
+                job = self.job
+                if match is not None and job is not None:
+                    self.job = None
+                    self.clean = match.group(2) == '0'
+            if match is not None and job is not None:
+                exit_code = int(match.group(1))
+                if exit_code != 0:
+                    job.write("session: %s\n" % match.group(3))
+                job.finish(exit_code)
+                continue
+            if job is not None:
+                job.write(line)
+            elif self.log_file is not None:
+                self.log_file.write(line)
+
+        # the tool exited
+        reap_process(self.process)
+        with self.lock:
+            job, self.job = self.job, None
+            self.clean = False
+        if job is not None:
+            job.write("session: tool exited with code %d\n" % self.process.returncode)
+            job.finish(self.process.returncode)
+        if self.license_slot:
+            self.license_slot.release()
+            self.license_slot = None
+        if self.log_file is not None:
+            self.log_file.close()
+        self.exited.cancel()
+
+    def send(self, code: str) -> None:
+        self.process.stdin.write(code.encode('utf-8'))
+        self.process.stdin.flush()
+
+    def submit(self, code: str, log_path: str, on_finish: Callable = None) -> SessionJob:
+        """
+            Run Tcl code in the session, e.g., "cd <rundir>; source <script>".
+            on_finish is set before the code is sent, a short job may finish before submit returns.
+        """
+        job = SessionJob(self, log_path)
+        with self.lock:
+            job.on_finish = on_finish
+            assert self.job is None, "session %d is busy" % self.process.pid
+            if not self.alive:
+                raise RuntimeError("session %d exited" % self.process.pid)
+            self.job = job
+            self.jobs += 1
+
+        reset_code = self.reset_code or 'list'
+        try:
+            self.send(
+                "set __session_rc [catch {%s} __session_msg]\n"
+                "set __session_reset [catch {%s}]\n"
+                "puts \"%s $__session_rc $__session_reset $__session_msg\"\n"
+                "flush stdout\n" % (code, reset_code, self.sentinel)
+            )
+        except OSError:
+            # the tool is gone, the reader finishes the job
+            pass
+        return job
+
+    def close(self) -> None:
+        """
+            Ask the tool to exit, without waiting.
+        """
+        try:
+            self.send("exit\n")
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+    def kill(self, grace: float = 10) -> None:
+        pgid = self.process.pid
+        if signal_process_group(pgid, signal.SIGTERM):
+            self.exited.wait(grace)
+        signal_process_group(pgid, signal.SIGKILL)
+        self.exited.wait(grace)
+
+
+class SessionPool(object):
+    """
+        Idle sessions of the process, keyed by their start command, reused across managers.
+        A released session goes to the managers of the process waiting for one first,
+        then stays idle unless other processes wait for its license.
+    """
+
+    def __init__(self) -> None:
+        self.idle = dict()
+        # key -> tokens of the managers waiting for a session, cancelled on release
+        self.waiters = dict()
+        self.lock = threading.Lock()
+
+    def acquire(self, key: str, waiter: CancelToken = None):
+        """
+            Return an idle live session of the key, None if there is none.
+            The waiter token, if any, is cancelled once a session of the key is released.
+        """
+        with self.lock:
+            sessions = self.idle.get(key, [])
+            while sessions:
+                session = sessions.pop()
+                if session.alive:
+                    return session
+            if waiter is not None:
+                self.waiters.setdefault(key, []).append(waiter)
+        return None
+
+    def remove_waiter(self, key: str, waiter: CancelToken) -> None:
+        with self.lock:
+            if waiter in self.waiters.get(key, []):
+                self.waiters[key].remove(waiter)
+
+    def release(self, key: str, session: ToolSession, size: int, license_wanted=None) -> None:
+        """
+            Keep a session for the next job, or close it if it is dirty, the pool of the key is full,
+            or license_wanted() tells that other processes wait for a license.
+        """
+        if session.alive and session.clean:
+            with self.lock:
+                waiters = self.waiters.pop(key, [])
+                sessions = self.idle.setdefault(key, [])
+                if waiters:
+                    sessions.append(session)
+            if waiters:
+                for waiter in waiters:
+                    waiter.cancel()
+                return
+            if license_wanted is not None and license_wanted():
+                info("session %d: other processes wait for a license, closing it" % session.process.pid)
+            else:
+                with self.lock:
+                    if len(sessions) < size:
+                        sessions.append(session)
+                        return
+        session.close()
+
+    def close_all(self, grace: float = 10) -> None:
+        with self.lock:
+            sessions = [session for sessions in self.idle.values() for session in sessions]
+            self.idle.clear()
+        for session in sessions:
+            session.close()
+        for session in sessions:
+            if not session.exited.wait(grace):
+                session.kill(grace)
+
+
+_session_pool = None
+_session_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """
+        The session pool shared by all managers of the process, closed at exit.
+    """
+    global _session_pool
+    with _session_pool_lock:
+        if _session_pool is None:
+            _session_pool = SessionPool()
+            atexit.register(_session_pool.close_all)
+        return _session_pool
+
+
+class SessionExecutor(Executor):
+    """
+        Run Tcl code in warm tool sessions instead of launching the tool for each command.
+
+        Args:
+            cmd (str): The command starting the tool in interactive mode.
+            log_dir (str): The output of a command named <name> goes to <log_dir>/<name>.
+            size (int): The maximal number of idle sessions, shared by executors with the same cmd and setup_code.
+            reset_code (str): Tcl code bringing the tool back to a clean state after each command.
+            setup_code (str): Tcl code run once by a new session, e.g., loading the technology.
+            setup_timeout (float): The maximal duration in seconds of the setup.
+            license_pool (LicensePool): Each session holds a license slot of license_tool, if given.
+            cancel_token (CancelToken): Stop waiting for a license once cancelled.
+            session_dir (str): Directory of the session logs.
+    """
+
+    def __init__(
+        self,
+        cmd: str,
+        log_dir: str,
+        size: int = 1,
+        reset_code: str = '',
+        setup_code: str = '',
+        setup_timeout: float = 3600,
+        license_pool=None,
+        license_tool: str = None,
+        license_priority: int = 0,
+        cancel_token: CancelToken = None,
+        session_dir: str = DEFAULT_SESSION_DIR,
+    ) -> None:
+        self.cmd = cmd
+        self.key = '%s\n%s' % (cmd, setup_code) if setup_code else cmd
+        self.log_dir = log_dir
+        self.size = size
+        self.reset_code = reset_code
+        self.setup_code = setup_code
+        self.setup_timeout = setup_timeout
+        self.license_pool = license_pool
+        self.license_tool = license_tool
+        self.license_priority = license_priority
+        self.cancel_token = cancel_token
+        self.session_dir = session_dir
+
+    def license_wanted(self) -> bool:
+        return self.license_pool is not None and self.license_pool.has_waiters(self.license_tool)
+
+    def create_session(self, license_slot) -> ToolSession:
+        mkdir(self.session_dir)
+        log_prefix = os.path.join(self.session_dir, 'session-%d-%s' % (os.getpid(), uuid.uuid4().hex[:8]))
+        try:
+            session = ToolSession(self.cmd, self.reset_code, license_slot, log_prefix + '.log')
+        except BaseException:
+            if license_slot:
+                license_slot.release()
+            raise
+        if self.setup_code:
+            # the reset must not undo the setup
+            session.reset_code, reset_code = '', session.reset_code
+            job = session.submit(self.setup_code, log_prefix + '-setup.log')
+            try:
+                finished = job.wait(self.setup_timeout, [self.cancel_token])
+            finally:
+                session.reset_code = reset_code
+            if not finished or job.returncode != 0:
+                session.kill()
+                if self.cancel_token is not None and self.cancel_token.cancelled:
+                    raise RoutineCancelledError
+                warn("session setup failed, see %s-setup.log" % log_prefix)
+                raise RoutineCheckError(job.returncode, timed_out=not finished)
+        return session
+
+    def get_session(self, pool: SessionPool) -> ToolSession:
+        """
+            Reuse an idle session, or start one once a license slot is free.
+            Waiting for a license is interrupted when a session of the process is released.
+        """
+        while True:
+            waiter = CancelToken()
+            session = pool.acquire(self.key, waiter if self.license_pool is not None else None)
+            if session is not None:
+                info("reusing session %d (%d jobs)" % (session.process.pid, session.jobs))
+                return session
+            if self.license_pool is None:
+                return self.create_session(None)
+
+            if self.cancel_token is not None:
+                self.cancel_token.add_callback(waiter.cancel)
+            try:
+                license_slot = self.license_pool.acquire(
+                    self.license_tool, priority=self.license_priority, cancel_token=waiter,
+                )
+            except RoutineCancelledError:
+                if self.cancel_token is not None and self.cancel_token.cancelled:
+                    raise
+                # a session was released in the meantime
+                continue
+            finally:
+                pool.remove_waiter(self.key, waiter)
+                if self.cancel_token is not None:
+                    self.cancel_token.remove_callback(waiter.cancel)
+            return self.create_session(license_slot)
+
+    def launch(self, cmd: str, name: str = 'job') -> Job:
+        pool = get_session_pool()
+        session = self.get_session(pool)
+        info("session %d runs %s: %s" % (session.process.pid, name, cmd))
+        return session.submit(
+            cmd,
+            os.path.join(self.log_dir, name),
+            on_finish=lambda: pool.release(self.key, session, self.size, self.license_wanted),
+        )
@@ -1 +1,2 @@
-from .dc_manager import DCManager
\ No newline at end of file
+from .dc_manager import DCManager
+from .lib_cache import LibCache
@@ -1,7 +1,8 @@
 import os
 from typing import Callable
 
-from manager.common import BaseManager
+from manager.common import BaseManager, LICENSE_PATTERNS, MEMORY_PATTERNS, NFS_PATTERNS
+from .lib_cache import LibCache, DEFAULT_LIB_CACHE_DIR, is_liberty, get_dc_version
 from utils import mkdir, if_exist
 
 class DCManager(BaseManager):
@@ -14,10 +15,16 @@ class DCManager(BaseManager):
         mkdir(self.log_dir)
         mkdir(self.report_dir)
         mkdir(self.script_dir)
+        # .db files compiled from lib_files by preprocessing, linked with db_files
+        self.compiled_db_files = []
 
     @property
     def name(self) -> str:
         return 'dc_manager'
+
+    @property
+    def license_tool(self) -> str:
+        return 'dc'
     
     @property
     def data_dir(self) -> str:
@@ -38,6 +45,15 @@ class DCManager(BaseManager):
         """
         return os.path.join(self.data_dir, '%s-mapped.v' % self.top_module)
 
+    @property
+    def default_fatal_patterns(self) -> dict:
+        # dc_shell goes on after most errors, only watch for lost runs
+        return {
+            'license': LICENSE_PATTERNS,
+            'memory': MEMORY_PATTERNS,
+            'nfs': NFS_PATTERNS,
+        }
+
     @property
     def script_dir(self) -> str:
         return os.path.join(self.rundir, 'scripts')
@@ -75,25 +91,69 @@ class DCManager(BaseManager):
         files = self.configs.get(key, [])
         return sep.join(files)
 
-    def generate_preprocessing_code(self) -> str:
-        lib_files = self.configs.get("lib_files", [])
+    @property
+    def lib_cache(self) -> LibCache:
+        """
+            Host-wide cache of compiled libraries, in 'lib_cache_dir' of configs.
+            'dc_version' of configs saves querying the version of dc_bin.
+        """
+        return LibCache(
+            self.configs.get('lib_cache_dir', DEFAULT_LIB_CACHE_DIR),
+            self.configs.get('dc_version') or get_dc_version(self.dc_bin),
+        )
+
+    def get_db_files(self) -> list:
+        """
+            Libraries to link: db_files of configs, then the .db files compiled from lib_files.
+        """
+        db_files = []
+        for db_file in self.configs.get('db_files', []) + self.compiled_db_files:
+            if db_file not in db_files:
+                db_files.append(db_file)
+        return db_files
+
+    def generate_preprocessing_code(self, lib_file: str, library: str, db_path: str) -> str:
+        """
+            Generate the code compiling a liberty file into a .db
+        """
         code = """
 # -------------------------------------------------------------
 # Preprocessing
 # -------------------------------------------------------------
-"""
-        for lib_file in lib_files:
-            if lib_file.endswith(".lib") or lib_file.endswith(".lib.gz"):
-                lib_wo_ext = lib_file.split('/')[-1].split('.')[0]
-                code += f"""
-read_lib {lib_file}
-write_lib {lib_wo_ext} -output {lib_wo_ext}.db
-"""
-                self.configs["lib_files"].remove(f"{lib_file}")
-                self.configs["lib_files"].append(f"{lib_wo_ext}.db")
-
+read_lib %s
+write_lib %s -output %s
+""" % (
+    lib_file,
+    library,
+    db_path,
+)
         return code
 
+    def compile_lib(self, lib_file: str, library: str, db_path: str) -> None:
+        script_path = os.path.join(self.script_dir, 'preprocess_%s.tcl' % library)
+        self.write_to_file(self.generate_preprocessing_code(lib_file, library, db_path), script_path, is_tcl=True)
+        self.run_tcl_script(
+            script_path=script_path,
+            step_name='preprocess_%s' % library,
+            timeout=3600,
+            condition=lambda: if_exist(db_path),
+            workdir=os.path.dirname(db_path),
+        )
+
+    def preprocess(self) -> None:
+        """
+            Link the cached .db of each liberty file in lib_files, compiling the missing ones.
+        """
+        lib_cache = self.lib_cache
+        for lib_file in self.configs.get('lib_files', []):
+            if is_liberty(lib_file):
+                db_path = lib_cache.get(lib_file, self.compile_lib, self.cancel_token)
+            elif lib_file.endswith('.db'):
+                db_path = lib_file
+            else:
+                continue
+            self.compiled_db_files.append(db_path)
+
     def generate_syn_code(self) -> str:
         """
             Generate synthesis TCL script
@@ -126,8 +186,8 @@ write_sdf %s
 write_sdc %s/constraint.sdc
 write -f verilog -hier -output %s
 """ % (
-    self.get_file_list('db_files'), 
-    self.get_file_list('db_files'), 
+    " ".join(self.get_db_files()),
+    " ".join(self.get_db_files()),
     self.get_file_list('verilog_files'),
     self.top_module,
     self.sdf_path,
@@ -206,17 +266,17 @@ write_db %s/%s.db
             if is_tcl:
                 f.write("exit 0\n")
 
-    def run_tcl_script(self, script_path: str, step_name: str, timeout: int, condition: Callable) -> None:
+    def run_tcl_script(self, script_path: str, step_name: str, timeout: int, condition: Callable, workdir: str = None) -> None:
         cmd = "cd {} && source ~/.bashrc && " \
                 "{} -no_gui " \
                 "-f {} " \
                 "-output_log_file {} ".format(
-                self.rundir,
+                workdir or self.rundir,
                 self.dc_bin,
                 script_path,
                 os.path.join(self.log_dir, step_name)
             )
-        self.routine_check(timeout, cmd, condition)
+        self.routine_check(timeout, cmd, condition, step=step_name, log_path=os.path.join(self.log_dir, step_name))
 
     def run_impl(self) -> None:
         """
@@ -224,9 +284,10 @@ write_db %s/%s.db
         """
         steps = self.configs.get('steps', ['preprocess', 'syn', 'report'])
 
-        fused_code = ""
         if 'preprocess' in steps:
-            fused_code += self.generate_preprocessing_code()
+            self.preprocess()
+
+        fused_code = ""
         if 'syn' in steps:
             fused_code += self.generate_syn_code()
         if 'report' in steps:
@@ -0,0 +1,146 @@
+import os
+import re
+import gzip
+import time
+import fcntl
+import shutil
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from typing import Callable
+
+from utils import info, warn, mkdir, create_hash, file_digest, CancelToken, RoutineCancelledError
+
+DEFAULT_LIB_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'cross-layer-dse-dc-libs')
+
+LIBERTY_SUFFIXES = ('.lib', '.lib.gz')
+# library (name) { ... } opens every liberty file
+LIBRARY_REGEX = re.compile(rb'^\s*library\s*\(\s*"?([^")\s]+)"?\s*\)', re.MULTILINE)
+# dc_shell version - S-2021.06-SP5
+VERSION_REGEX = re.compile(r'version\s*[-:]?\s*(\S+)', re.IGNORECASE)
+
+_dc_versions = dict()
+
+
+def is_liberty(path: str) -> bool:
+    return path.endswith(LIBERTY_SUFFIXES)
+
+
+def get_library_name(lib_file: str) -> str:
+    """
+        Name of the library defined in a liberty file, write_lib refers to the library by it.
+    """
+    opener = gzip.open if lib_file.endswith('.gz') else open
+    with opener(lib_file, 'rb') as f:
+        match = LIBRARY_REGEX.search(f.read(1 << 16))
+    if match is not None:
+        return match.group(1).decode('utf-8')
+    return os.path.basename(lib_file).split('.')[0]
+
+
+def get_dc_version(dc_bin: str) -> str:
+    """
+        Version of Design Compiler, a .db is only valid for the version that wrote it.
+        Memoized per process, falls back to the command itself if the version is not reported.
+    """
+    if dc_bin not in _dc_versions:
+        try:
+            output = subprocess.run(
+                ['bash', '-c', 'source ~/.bashrc > /dev/null 2>&1; %s -version' % dc_bin],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                timeout=300,
+            ).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            output = ''
+        match = VERSION_REGEX.search(output)
+        if match is None:
+            warn("cannot tell the version of %s, key compiled libraries by the command" % dc_bin)
+            _dc_versions[dc_bin] = dc_bin
+        else:
+            _dc_versions[dc_bin] = match.group(1)
+    return _dc_versions[dc_bin]
+
+
+class LibCache(object):
+    """
+        Host-wide cache of liberty files compiled into .db by Design Compiler, keyed by the
+        liberty digest and the version of Design Compiler.
+
+        Each library is compiled once, by the first run that needs it, while holding an flock
+        on its entry, concurrent runs wait for it instead of compiling it again.
+        An entry is built in a temporary directory and renamed into place once complete.
+    """
+
+    def __init__(self, cache_dir: str, dc_version: str, interval: float = 1.0) -> None:
+        self.cache_dir = cache_dir
+        self.dc_version = dc_version
+        self.interval = interval
+
+    def get_key(self, lib_file: str) -> str:
+        return create_hash(file_digest(lib_file) + '\n' + self.dc_version)
+
+    def get_entry_dir(self, lib_file: str) -> str:
+        return os.path.join(self.cache_dir, self.get_key(lib_file))
+
+    def lookup(self, lib_file: str) -> str:
+        """
+            Path of the compiled .db of a liberty file, or None if it is not compiled yet.
+        """
+        entry_dir = self.get_entry_dir(lib_file)
+        if not os.path.isdir(entry_dir):
+            return None
+        db_files = [f for f in os.listdir(entry_dir) if f.endswith('.db')]
+        return os.path.join(entry_dir, db_files[0]) if db_files else None
+
+    @contextmanager
+    def lock(self, lib_file: str, cancel_token: CancelToken = None):
+        mkdir(self.cache_dir)
+        fd = os.open(self.get_entry_dir(lib_file) + '.lock', os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    pass
+                if cancel_token is None:
+                    time.sleep(self.interval)
+                elif cancel_token.wait(self.interval):
+                    raise RoutineCancelledError
+            yield
+        finally:
+            os.close(fd)
+
+    def get(self, lib_file: str, compile_lib: Callable, cancel_token: CancelToken = None) -> str:
+        """
+            Path of the compiled .db of a liberty file, compile it on a miss.
+
+            Args:
+                lib_file (str): The liberty file, .lib or .lib.gz.
+                compile_lib (Callable): compile_lib(lib_file, library, db_path) writes the .db of the library to db_path.
+                cancel_token (CancelToken, optional): Abort waiting for a concurrent compilation. Defaults to None.
+        """
+        db_path = self.lookup(lib_file)
+        if db_path is not None:
+            return db_path
+
+        with self.lock(lib_file, cancel_token):
+            # compiled by another run while waiting for the lock
+            db_path = self.lookup(lib_file)
+            if db_path is not None:
+                return db_path
+
+            library = get_library_name(lib_file)
+            entry_dir = self.get_entry_dir(lib_file)
+            tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(entry_dir) + '.tmp-', dir=self.cache_dir)
+            try:
+                compile_lib(lib_file, library, os.path.join(tmp_dir, '%s.db' % library))
+                os.rename(tmp_dir, entry_dir)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            info("compiled %s into %s" % (lib_file, entry_dir))
+            return self.lookup(lib_file)
@@ -3,7 +3,8 @@ import os
 import itertools
 from typing import Callable
 
-from manager.common import BaseManager
+from manager.common import BaseManager, StepFingerprints, get_tech_files, LICENSE_PATTERNS, MEMORY_PATTERNS, NFS_PATTERNS
+from manager.common.session import DEFAULT_SESSION_DIR
 from utils import info, mkdir, if_exist, read_json
 
 
@@ -19,11 +20,34 @@ class GenusManager(BaseManager):
         mkdir(self.log_dir)
         mkdir(self.report_dir)
         mkdir(self.script_dir)
+        self.fingerprints = StepFingerprints(self.data_dir)
 
     @property
     def name(self) -> str:
         return 'genus_manager'
 
+    @property
+    def license_tool(self) -> str:
+        return 'genus'
+
+    @property
+    def default_fatal_patterns(self) -> dict:
+        return {
+            'license': LICENSE_PATTERNS,
+            'memory': MEMORY_PATTERNS,
+            'nfs': NFS_PATTERNS,
+            'error': [r'^Error\s*:'],
+        }
+
+    @property
+    def session_cmd(self) -> str:
+        session_dir = self.configs.get('session_dir', DEFAULT_SESSION_DIR)
+        return "cd {} && source ~/.bashrc && {} -no_gui -overwrite".format(session_dir, self.genus_bin)
+
+    @property
+    def default_session_reset_code(self) -> str:
+        return "delete_obj [get_db designs]"
+
     @property
     def data_dir(self) -> str:
         return os.path.join(self.rundir, 'data')
@@ -123,12 +147,15 @@ write_db %s/%s.db
 """ % (self.data_dir, cur_checkpoint)
                 f.write(save_codes)
 
-            if is_tcl:
+            # a session must outlive the script
+            if is_tcl and not self.use_sessions:
                 f.write("exit 0\n")
 
 
 
-    def run_tcl_script(self, script_path: str, step_name: str, timeout: int, condition: Callable) -> None:
+    def get_tcl_cmd(self, script_path: str, step_name: str) -> str:
+        if self.use_sessions:
+            return "cd {%s}; source {%s}" % (os.path.abspath(self.rundir), os.path.abspath(script_path))
         cmd = "cd {} && source ~/.bashrc && " \
                 "{} -no_gui -abort_on_error -overwrite " \
                 "-file {} " \
@@ -138,11 +165,29 @@ write_db %s/%s.db
                 script_path,
                 os.path.join(self.log_dir, step_name)
             )
-        self.routine_check(timeout, cmd, condition)
-    
-    def run_impl(self) -> None:
+        return cmd
+
+    def get_log_paths(self, step_name: str) -> list:
         """
-            Generate scripts and run genus
+            Candidate paths of the log written by -log, genus may append the .log suffix.
+        """
+        log_path = os.path.join(self.log_dir, step_name)
+        return [log_path, log_path + '.log']
+
+    def run_tcl_script(self, script_path: str, step_name: str, timeout: int, condition: Callable) -> None:
+        cmd = self.get_tcl_cmd(script_path, step_name)
+        self.routine_check(timeout, cmd, condition, step=step_name, log_path=self.get_log_paths(step_name))
+        self.fingerprints.commit(step_name)
+
+    async def run_tcl_script_async(self, script_path: str, step_name: str, timeout: int, condition: Callable) -> None:
+        cmd = self.get_tcl_cmd(script_path, step_name)
+        await self.routine_check_async(timeout, cmd, condition, step=step_name, log_path=self.get_log_paths(step_name))
+        self.fingerprints.commit(step_name)
+
+    def generate_scripts(self) -> list:
+        """
+            Generate scripts according to runmode,
+            return the keyword arguments of run_tcl_script for each step to run.
         """
         steps = self.configs.get('steps', ['syn', 'report'])
 
@@ -157,12 +202,12 @@ write_db %s/%s.db
             self.write_to_file(self.generate_mmmc_code(), self.mmmc_script_path, is_tcl=False)
             self.write_to_file(fused_code, self.fused_syn_script_path, is_tcl=True)
 
-            self.run_tcl_script(
-                script_path=self.fused_syn_script_path,
-                step_name='fused',
-                timeout=10 * 3600,
-                condition=lambda: if_exist(self.hdl_mapped_path)
-            )
+            return [{
+                'script_path': self.fused_syn_script_path,
+                'step_name': 'fused',
+                'timeout': 10 * 3600,
+                'condition': lambda: if_exist(self.hdl_mapped_path),
+            }]
 
         elif runmode == 'normal':
             self.write_to_file(self.generate_sdc_code(), self.sdc_script_path, is_tcl=False)
@@ -172,23 +217,51 @@ write_db %s/%s.db
             self.write_to_file(self.generate_report_code(), self.report_script_path,
                                prev_checkpoint='syn', cur_checkpoint='report', is_tcl=True)
             
-            # let the users determine which steps to use, we don't check it here
+            # resume: only run steps whose scripts, inputs or upstream steps changed
+            plan = []
             if 'syn' in steps:
-                self.run_tcl_script(
-                    script_path=self.syn_script_path,
-                    step_name='syn',
-                    timeout=10 * 3600,
-                    condition=lambda: if_exist(self.hdl_mapped_path)
-                )
+                files = [self.sdc_script_path, self.mmmc_script_path, self.syn_script_path]
+                files += self.configs.get('verilog_files', [])
+                files += get_tech_files(self.configs)
+                plan.append(('syn', files, [os.path.join(self.data_dir, 'syn.db'), self.hdl_mapped_path]))
             if 'report' in steps:
-                self.run_tcl_script(
-                    script_path=self.report_script_path,
-                    step_name='report',
-                    timeout=3600,
-                    condition=lambda: if_exist(self.timing_report_path)
-                )
+                files = [self.report_script_path]
+                plan.append(('report', files, [os.path.join(self.data_dir, 'report.db'), self.timing_report_path]))
+            steps_to_run = self.fingerprints.plan(plan, force=not self.configs.get('resume', True))
+
+            # let the users determine which steps to use, we don't check it here
+            scripts = []
+            if 'syn' in steps_to_run:
+                scripts.append({
+                    'script_path': self.syn_script_path,
+                    'step_name': 'syn',
+                    'timeout': 10 * 3600,
+                    'condition': lambda: if_exist(self.hdl_mapped_path),
+                })
+            if 'report' in steps_to_run:
+                scripts.append({
+                    'script_path': self.report_script_path,
+                    'step_name': 'report',
+                    'timeout': 3600,
+                    'condition': lambda: if_exist(self.timing_report_path),
+                })
+            return scripts
         else:
             raise NotImplementedError("runmode %s is not supported" % runmode)
+    
+    def run_impl(self) -> None:
+        """
+            Generate scripts and run genus
+        """
+        for script in self.generate_scripts():
+            self.run_tcl_script(**script)
+
+    async def run_impl_async(self) -> None:
+        """
+            Generate scripts and run genus with asyncio
+        """
+        for script in self.generate_scripts():
+            await self.run_tcl_script_async(**script)
 
     def generate_output_impl(self) -> None:
         output = {
@@ -1,4 +1,5 @@
 from .parser import *
+from manager.common.scanner import ReportScanner
 
 def update_dfs(dfs, label, level):
     """
@@ -19,8 +20,8 @@ class GenusAreaReportParser(GenusReportParser):
         data = line.split()
         instance, module, cell_count, cell_area, net_area, total_area = data
         return {
-            'instance': instance,
-            'module': module,
+            'instance': instance.decode('utf-8'),
+            'module': module.decode('utf-8'),
             'cell_count': int(cell_count),
             'cell_area': float(cell_area),
             'net_area': float(net_area),
@@ -30,6 +31,7 @@ class GenusAreaReportParser(GenusReportParser):
     def analyze_root_module(self, line) -> str:
         data = line.split()
         instance, cell_count, cell_area, net_area, total_area = data
+        instance = instance.decode('utf-8')
         return {
             'instance': instance,
             'module': instance,
@@ -44,28 +46,21 @@ class GenusAreaReportParser(GenusReportParser):
         parent_instance = None
         dfs = []
 
-        with open(self.report_path, 'r') as f:
-            read_until(f, r'^-+$')
+        with ReportScanner(self.report_path) as scanner:
+            scanner.read_until(DASH_LINE_REGEX)
 
-            while True:
-                try:
-                    line = f.readline()
-                    if not line:
-                        break
-                    
-                    if parent_instance is None:
-                        area_report = self.analyze_root_module(line)
-                        parent_instance = area_report['instance']
-                    else:
-                        leading_spaces = len(line) - len(line.lstrip(' '))
-                        area_report = self.analyze_child_module(line.strip(' '))
-                        instance = area_report['instance']
-                        update_dfs(dfs, instance, leading_spaces)
-                        hier_instance = "%s/" % parent_instance + "/".join([label for _, label in dfs])
-                        area_report['instance'] = hier_instance
-                    area_reports.append(area_report)
-                except EOFError:
-                    break
+            for line in scanner.read_lines():
+                if parent_instance is None:
+                    area_report = self.analyze_root_module(line)
+                    parent_instance = area_report['instance']
+                else:
+                    leading_spaces = len(line) - len(line.lstrip(b' '))
+                    area_report = self.analyze_child_module(line.strip(b' '))
+                    instance = area_report['instance']
+                    update_dfs(dfs, instance, leading_spaces)
+                    hier_instance = "%s/" % parent_instance + "/".join([label for _, label in dfs])
+                    area_report['instance'] = hier_instance
+                area_reports.append(area_report)
 
         return area_reports
     
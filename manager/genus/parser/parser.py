@@ -3,13 +3,17 @@ import re
 import abc
 from utils import if_exist
 
+# a line of dashes ending the head of a table, or the table
+DASH_LINE_REGEX = re.compile(rb'\n-+(?![^\n])')
+
 def read_until(f, pattern, return_match=True):
+    pattern = re.compile(pattern)
     while True:
         line = f.readline()
         if not line:
             raise EOFError
         
-        match = re.match(pattern, line)
+        match = pattern.match(line)
         if match:
             if return_match:
                 return match
@@ -17,6 +21,9 @@ def read_until(f, pattern, return_match=True):
                 return line
 
 class GenusReportParser(abc.ABC):
+    # bumped when the parsed results change, results cached by ReportCache are parsed again
+    version = 1
+
     def __init__(self, report_path: str) -> None:
         super().__init__()
         self.report_path = report_path
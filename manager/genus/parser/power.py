@@ -1,4 +1,7 @@
 from .parser import *
+from manager.common.scanner import ReportScanner
+
+POWER_UNIT_REGEX = re.compile(rb'\nPower[^\S\n]+Unit:[^\S\n]+(\S+)(?![^\n])')
 
 class GenusPowerReportParser(GenusReportParser):
 
@@ -6,15 +9,15 @@ class GenusPowerReportParser(GenusReportParser):
         super().__init__(report_path)
         self._power_unit = None
 
-    def get_power_unit(self, f) -> str:
-        power_unit_match = read_until(f, r'^Power\s+Unit:\s+([^\s]+)$')
-        return power_unit_match.group(1)
+    def get_power_unit(self, scanner: ReportScanner) -> str:
+        power_unit_match = scanner.read_until(POWER_UNIT_REGEX)
+        return power_unit_match.group(1).decode('utf-8')
     
     def analyze_line(self, line) -> dict:
         data = line.split()
         cell_count, pct_cells, leakage, internal, switching, total, lvl, instance = data
         return {
-            'instance': instance[1:],
+            'instance': instance[1:].decode('utf-8'),
             'cell_count': int(cell_count),
             'leakage': float(leakage),
             'internal': float(internal),
@@ -25,21 +28,15 @@ class GenusPowerReportParser(GenusReportParser):
     def run_impl(self):
         power_reports = []
 
-        with open(self.report_path, 'r') as f:
-            self._power_unit = self.get_power_unit(f)
-
-            read_until(f, r'^-+$')
-            read_until(f, r'^-+$')
-
-            while True:
-                try:
-                    line = f.readline()
-                    if re.match(r'^-+$', line):
-                        break
-                    power_report = self.analyze_line(line)
-                    power_reports.append(power_report)
-                except EOFError:
-                    break
+        with ReportScanner(self.report_path) as scanner:
+            self._power_unit = self.get_power_unit(scanner)
+
+            scanner.read_until(DASH_LINE_REGEX)
+            scanner.read_until(DASH_LINE_REGEX)
+
+            for line in scanner.read_lines(DASH_LINE_REGEX):
+                power_report = self.analyze_line(line)
+                power_reports.append(power_report)
 
         return power_reports
     
@@ -1,59 +1,59 @@
+import sys
 from .parser import *
+from manager.common.scanner import ReportScanner
+
+# the head of a path up to its slack, lines in between are skipped
+PATH_HEAD_REGEX = re.compile(
+    rb'\nPath (\d+):[^\n]*\n'
+    rb'(?:[^\n]*\n)*?[ \t]+Startpoint:[ \t]+\([A-Z]\)[ \t]+(\S+)[ \t]*\n'
+    rb'(?:[^\n]*\n)*?[ \t]+Endpoint:[ \t]+\([A-Z]\)[ \t]+(\S+)[ \t]*\n'
+    rb'(?:[^\n]*\n)*?[ \t]+Data Path:-[ \t]+(\d+)[^\n]*\n'
+    rb'(?:[^\n]*\n)*?[ \t]+Slack:=[ \t]+(-?\d+)'
+)
+# a path ends with the table of its timing points, between three separators
+SEPARATOR_REGEX = re.compile(rb'\n#-+(?![^\n])')
+
 
 class GenusTimingReportParser(GenusReportParser):
     """
-        Analyze timing report in text.    
+        Analyze timing report in text.
+
+        Paths are parsed lazily by iter_paths, which maps the report and reads it only as far as the paths consumed.
+        Begin and end points are interned, as the same points recur across the paths of a report.
     """
 
     def __init__(self, report_path: str, max_timing_paths: int = 1) -> None:
         super().__init__(report_path)
         self.max_timing_paths = max_timing_paths
-    
-    def analyze_single_path(self, f) -> dict:
-        """
-            Analyze timing report for a single path.
-        """
-        path_info = dict()
-        
-        path_title_match = read_until(f, r'^Path (\d+):')
-        path_info['path_index'] = int(path_title_match.group(1))
-
-        start_match = read_until(f, r'^\s+Startpoint:\s+\([A-Z]\)\s+([^\s]+)$')
-        path_info['begin_point'] = start_match.group(1)
 
-        end_match = read_until(f, r'^\s+Endpoint:\s+\([A-Z]\)\s+([^\s]+)$')
-        path_info['end_point'] = end_match.group(1)
-
-        datapath_match = read_until(f, r'^\s+Data Path:-\s+(\d+)')
-        path_info['arrival_time'] = int(datapath_match.group(1))
-
-        slack_match = read_until(f, r'^\s+Slack:=\s+(-?\d+)')
-        path_info['slack_time'] = int(slack_match.group(1))
-
-        read_until(f, r'^#-+$')
-        read_until(f, r'^#-+$')
-        read_until(f, r'^#-+$')
+    def iter_paths(self, max_paths: int = None):
+        """
+            Yield the index, begin point, end point, arrival time and slack of each path in the report.
 
-        return path_info
+            Args:
+                max_paths (int, optional): Stop after that many paths. Defaults to None (all).
+        """
+        count = 0
+        with ReportScanner(self.report_path) as scanner:
+            while count != max_paths:
+                head = scanner.search(PATH_HEAD_REGEX)
+                if head is None:
+                    return
+                path_info = {
+                    'path_index': int(head.group(1)),
+                    'begin_point': sys.intern(head.group(2).decode('utf-8')),
+                    'end_point': sys.intern(head.group(3).decode('utf-8')),
+                    'arrival_time': int(head.group(4)),
+                    'slack_time': int(head.group(5)),
+                }
+                for _ in range(3):
+                    if scanner.search(SEPARATOR_REGEX) is None:
+                        return
+                yield path_info
+                count += 1
 
     def run(self) -> list:
         """
-            Analyze timing report for all paths.
+            Analyze timing report for the first max_timing_paths paths, or all paths if it is None.
         """
-
-        timing_paths = []
-        cnt_path = 0
-
-        with open(self.report_path, 'r') as f:
-            while cnt_path < self.max_timing_paths:
-                try:
-                    path_info = self.analyze_single_path(f)
-                    timing_paths.append(path_info)
-                except EOFError:
-                    break
-                cnt_path += 1 
-
-        return timing_paths
-        
-        
-        
\ No newline at end of file
+        return list(self.iter_paths(self.max_timing_paths))
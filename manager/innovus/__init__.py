@@ -1,4 +1,5 @@
 from .innovus_manager import InnovusManager
+from .prefix_tree import InnovusPrefixTree
 from .parser.timing import InnovusTimingReportParser
 from .parser.area import InnovusAreaReportParser
 from .parser.power import InnovusPowerReportParser
\ No newline at end of file
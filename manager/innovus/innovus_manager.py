@@ -1,8 +1,27 @@
 import os
 from typing import Callable
 
-from manager.common import BaseManager
-from utils import mkdir, if_exist
+from manager.common import BaseManager, StepFingerprints, get_tech_files, LICENSE_PATTERNS, MEMORY_PATTERNS, NFS_PATTERNS
+from manager.common.session import DEFAULT_SESSION_DIR
+from utils import mkdir, if_exist, RoutineCancelledError
+
+
+DEFAULT_STEPS = [
+    'init',
+    'floorplan',
+    'powerplan',
+    'placement',
+    'cts',
+    'routing',
+]
+
+# the stage of the reports written by each step
+STEP_REPORT_STAGES = {
+    'init': 'prePlace',
+    'placement': 'preCTS',
+    'cts': 'postCTS',
+    'routing': 'postRoute',
+}
 
 
 class InnovusManager(BaseManager):
@@ -17,11 +36,37 @@ class InnovusManager(BaseManager):
         mkdir(self.log_dir)
         mkdir(self.report_dir)
         mkdir(self.script_dir)
+        self.fingerprints = StepFingerprints(self.data_dir)
+        self.step_callbacks = []
+        # steps skipped by generate_scripts, as their checkpoints are fresh
+        self.resumed_steps = []
 
     @property
     def name(self) -> str:
         return 'innovus_manager'
 
+    @property
+    def license_tool(self) -> str:
+        return 'innovus'
+
+    @property
+    def default_fatal_patterns(self) -> dict:
+        return {
+            'license': LICENSE_PATTERNS,
+            'memory': MEMORY_PATTERNS,
+            'nfs': NFS_PATTERNS,
+            'error': [r'^\*\*ERROR'],
+        }
+
+    @property
+    def session_cmd(self) -> str:
+        session_dir = self.configs.get('session_dir', DEFAULT_SESSION_DIR)
+        return "cd {} && source ~/.bashrc && {} -no_gui -overwrite".format(session_dir, self.innovus_bin)
+
+    @property
+    def default_session_reset_code(self) -> str:
+        return "freeDesign"
+
     @property
     def data_dir(self) -> str:
         return os.path.join(self.rundir, 'data')
@@ -78,6 +123,14 @@ class InnovusManager(BaseManager):
         else:
             raise NotImplementedError("Script %s is not implemented" % name)
 
+    def get_checkpoint_path(self, checkpoint: str) -> str:
+        """
+            Checkpoints are named by steps in data_dir, or given as .enc paths from other rundirs.
+        """
+        if os.path.isabs(checkpoint):
+            return checkpoint
+        return os.path.join(self.data_dir, f'{checkpoint}.enc')
+
     def write_to_file(self, codes: str, filepath: str, is_tcl: bool, prev_checkpoint: str = None, cur_checkpoint: str = None) -> None:
         """
             Write the code to the file, with necessary checkpoints.
@@ -91,7 +144,7 @@ class InnovusManager(BaseManager):
 # Read previous checkpoint
 # -------------------------------------------------------------
 source %s
-""" % (os.path.join(self.data_dir, f'{prev_checkpoint}.enc'))
+""" % self.get_checkpoint_path(prev_checkpoint)
                 f.write(load_codes)
 
             f.write(codes)
@@ -105,10 +158,16 @@ saveDesign %s
 """ % os.path.join(self.data_dir, f'{cur_checkpoint}.enc')
                 f.write(save_codes)
 
-            if is_tcl:
+            # a session must outlive the script
+            if is_tcl and not self.use_sessions:
                 f.write("exit 0\n")
 
-    def run_tcl_script(self, step_name: str, timeout: int, condition: Callable) -> None:
+    def get_tcl_cmd(self, step_name: str) -> str:
+        if self.use_sessions:
+            return "cd {%s}; source {%s}" % (
+                os.path.abspath(self.rundir),
+                os.path.abspath(os.path.join(self.script_dir, f'{step_name}.tcl')),
+            )
         cmd = "cd {} && source ~/.bashrc && " \
                 "{} -no_gui -abort_on_error -overwrite " \
                 "-file {} " \
@@ -118,21 +177,34 @@ saveDesign %s
                 os.path.join(self.script_dir, f'{step_name}.tcl'),
                 os.path.join(self.log_dir, step_name),
             )
-        self.routine_check(timeout, cmd, condition)
-    
-    def run_impl(self) -> None:
+        return cmd
+
+    def get_log_paths(self, step_name: str) -> list:
         """
-            Generate scripts and run innovus
+            Candidate paths of the log written by -log, innovus may append the .log suffix.
         """
-        default_steps = [
-            'init',
-            'floorplan',
-            'powerplan',
-            'placement',
-            'cts',
-            'routing',
-        ]
-        steps = self.configs.get('steps', default_steps)
+        log_path = os.path.join(self.log_dir, step_name)
+        return [log_path, log_path + '.log']
+
+    def run_tcl_script(self, step_name: str, timeout: int, condition: Callable) -> None:
+        cmd = self.get_tcl_cmd(step_name)
+        self.routine_check(timeout, cmd, condition, step=step_name, log_path=self.get_log_paths(step_name))
+        self.fingerprints.commit(step_name)
+
+    async def run_tcl_script_async(self, step_name: str, timeout: int, condition: Callable) -> None:
+        cmd = self.get_tcl_cmd(step_name)
+        await self.routine_check_async(timeout, cmd, condition, step=step_name, log_path=self.get_log_paths(step_name))
+        self.fingerprints.commit(step_name)
+
+    def checkpoint_condition(self, checkpoint: str) -> Callable:
+        return lambda: if_exist(os.path.join(self.data_dir, f'{checkpoint}.enc'))
+
+    def generate_scripts(self) -> list:
+        """
+            Generate scripts according to runmode,
+            return the keyword arguments of run_tcl_script for each step to run.
+        """
+        steps = self.configs.get('steps', DEFAULT_STEPS)
 
         runmode = self.configs.get('runmode', 'normal')
 
@@ -143,16 +215,18 @@ saveDesign %s
             self.write_to_file(fused_code, os.path.join(self.script_dir, 'fused_pnr.tcl'), 
                                is_tcl=True, cur_checkpoint='routing')
             
-            self.run_tcl_script(
-                step_name='fused_pnr',
-                timeout=24 * 3600,
-                condition=lambda: if_exist(os.path.join(self.data_dir, 'routing.enc'))
-            )
+            return [{
+                'step_name': 'fused_pnr',
+                'timeout': 24 * 3600,
+                'condition': self.checkpoint_condition('routing'),
+            }]
         
         elif runmode == 'normal':
             self.write_to_file(self.generate_mmmc_code(), self.mmmc_script_path, is_tcl=False)
 
-            prev_step = None
+            # the first step may start from a checkpoint of another rundir, e.g., a shared prefix
+            init_checkpoint = self.configs.get('init_checkpoint')
+            prev_step = init_checkpoint
             for step in steps:
                 # Possibly you don't need a clock tree for combinational module
                 # So you have to make sure you can run through the flow!
@@ -161,15 +235,92 @@ saveDesign %s
                                    is_tcl=True, prev_checkpoint=prev_step, cur_checkpoint=step)
                 prev_step = step
 
-            for step in steps:
-                self.run_tcl_script(
-                    step_name=step,
-                    timeout=10 * 3600,
-                    condition=lambda: if_exist(os.path.join(self.data_dir, f'{step}.enc'))
-                )
+            # resume: only run steps whose scripts, inputs or upstream steps changed
+            plan = []
+            for i, step in enumerate(steps):
+                files = [os.path.join(self.script_dir, f'{step}.tcl')]
+                if i == 0:
+                    files += [
+                        self.mmmc_script_path,
+                        self.configs.get('verilog_file'),
+                        self.configs.get('setup_sdc_file'),
+                        self.configs.get('hold_sdc_file'),
+                    ]
+                    files += get_tech_files(self.configs)
+                    if init_checkpoint:
+                        files.append(os.path.splitext(init_checkpoint)[0] + '.fingerprint')
+                checkpoint = os.path.join(self.data_dir, f'{step}.enc')
+                plan.append((step, [f for f in files if f], [checkpoint, checkpoint + '.dat']))
+            steps_to_run = self.fingerprints.plan(plan, force=not self.configs.get('resume', True))
+            self.resumed_steps = [step for step in steps if step not in steps_to_run]
+
+            return [{
+                'step_name': step,
+                'timeout': 10 * 3600,
+                'condition': self.checkpoint_condition(step),
+            } for step in steps_to_run]
 
         else:
             raise NotImplementedError("runmode %s is not supported" % runmode)
+    
+    def add_step_callback(self, callback: Callable) -> None:
+        """
+            Call callback(manager, step_name) after each step finishes, e.g., to inspect its reports.
+            Resumed steps with all their reports are passed to the callbacks before the remaining steps run.
+            The callback may cancel() the manager to skip the remaining steps.
+            Only normal runmode runs steps one by one.
+        """
+        self.step_callbacks.append(callback)
+
+    def get_step_reports(self, step_name: str) -> list:
+        """
+            Paths of the reports written by a step.
+        """
+        stage = STEP_REPORT_STAGES.get(step_name)
+        if stage is None:
+            return []
+        reports = [os.path.join(self.report_dir, f'{stage}_timing', 'timing.rpt')]
+        if stage in ('preCTS', 'postRoute'):
+            reports.append(os.path.join(self.report_dir, f'{stage}_area.rpt'))
+            reports.append(os.path.join(self.report_dir, f'{stage}_power.rpt'))
+        return reports
+
+    def finish_step(self, step_name: str) -> None:
+        for callback in self.step_callbacks:
+            callback(self, step_name)
+
+    def finish_resumed_steps(self) -> None:
+        """
+            Call the step callbacks on the resumed steps, e.g., a fresh placement is pruned
+            before cts and routing run again, raise RoutineCancelledError if a callback cancelled the run.
+        """
+        for step_name in self.resumed_steps:
+            if all(if_exist(report) for report in self.get_step_reports(step_name)):
+                self.finish_step(step_name)
+        if self.cancel_token.cancelled:
+            raise RoutineCancelledError
+
+    def run_impl(self) -> None:
+        """
+            Generate scripts and run innovus
+        """
+        scripts = self.generate_scripts()
+        if scripts:
+            self.finish_resumed_steps()
+        for script in scripts:
+            self.run_tcl_script(**script)
+            self.finish_step(script['step_name'])
+
+    async def run_impl_async(self) -> None:
+        """
+            Generate scripts and run innovus with asyncio
+        """
+        scripts = self.generate_scripts()
+        if scripts:
+            self.finish_resumed_steps()
+        for script in scripts:
+            await self.run_tcl_script_async(**script)
+            self.finish_step(script['step_name'])
 
     def generate_output_impl(self) -> dict:
         return dict()
@@ -1,4 +1,5 @@
 from .parser import *
+from manager.common.scanner import ReportScanner
 
 class InnovusAreaReportParser(InnovusReportParser):
     """
@@ -8,13 +9,15 @@ class InnovusAreaReportParser(InnovusReportParser):
     def __init__(self, report_path: str) -> None:
         super().__init__(report_path)
     
-    def analyze_module(self, line: str, top_module: str) -> list:
+    def analyze_module(self, line: bytes, top_module: str) -> list:
         data = line.split()
         if not top_module:  # we don't have top module yet
             hinst_name,              inst_count, total_area, buffer, inverter, combinational, flop, latch, clock_gate, macro, physical = data
             module_name = None
         else:
             hinst_name, module_name, inst_count, total_area, buffer, inverter, combinational, flop, latch, clock_gate, macro, physical = data
+            module_name = module_name.decode('utf-8')
+        hinst_name = hinst_name.decode('utf-8')
         if top_module != "":
             hinst_name = top_module + "/" + hinst_name
         return {
@@ -36,20 +39,14 @@ class InnovusAreaReportParser(InnovusReportParser):
         area_reports = []
         top_module = ""
 
-        with open(self.report_path, 'r') as f:
-            self.read_until_match(f, r'^-+$')
+        with ReportScanner(self.report_path) as scanner:
+            scanner.read_until(DASH_LINE_REGEX)
 
-            while True:
-                try:
-                    line = f.readline()
-                    if not line:
-                        break
-                    area = self.analyze_module(line.strip(' '), top_module)
-                    if not top_module:
-                        top_module = area['instance']
-                    area_reports.append(area)
-                except EOFError:
-                    break
+            for line in scanner.read_lines():
+                area = self.analyze_module(line.strip(b' '), top_module)
+                if not top_module:
+                    top_module = area['instance']
+                area_reports.append(area)
 
         return area_reports
 
@@ -3,7 +3,14 @@ import re
 import abc
 from utils import if_exist
 
+BRACKETED_VALUE_REGEX = re.compile(r'\{(.*?)\}')
+# a line of dashes ending the head of a table
+DASH_LINE_REGEX = re.compile(rb'\n-+(?![^\n])')
+
 class InnovusReportParser(abc.ABC):
+    # bumped when the parsed results change, results cached by ReportCache are parsed again
+    version = 1
+
     def __init__(self, report_path: str) -> None:
         super().__init__()
         self.report_path = report_path
@@ -13,12 +20,13 @@ class InnovusReportParser(abc.ABC):
         """
             Reads lines from a file until a line matching the given pattern is found.
         """
+        pattern = re.compile(pattern)
         while True:
             line = f.readline()
             if not line:
                 raise EOFError
             
-            match = re.match(pattern, line)
+            match = pattern.match(line)
             # print(f"[line {match is not None}]: {line}")
 
             if match:
@@ -32,12 +40,13 @@ class InnovusReportParser(abc.ABC):
 
         self.read_until_match(f, start_pattern)
         
+        end_regex = re.compile(end_pattern)
         while True:
             line = f.readline()
             if not line:
                 raise RuntimeError(f"End pattern {end_pattern} not found.")
 
-            match = re.match(end_pattern, line)
+            match = end_regex.match(line)
             if match:
                 return lines
 
@@ -47,9 +56,7 @@ class InnovusReportParser(abc.ABC):
         """
             Parse all values in the line
         """
-        pattern = r'\{(.*?)\}'
-        match = re.findall(pattern, line)
-        return match
+        return BRACKETED_VALUE_REGEX.findall(line)
 
     @abc.abstractmethod
     def run():
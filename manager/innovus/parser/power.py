@@ -1,4 +1,9 @@
 from .parser import *
+from manager.common.scanner import ReportScanner
+
+DESIGN_REGEX = re.compile(rb'\n\*[^\S\n]+Design:([^:\n]*)')
+GROUP_REGEX = re.compile(rb'\nGroup')
+HIERARCHY_REGEX = re.compile(rb'\nHierarchy')
 
 class InnovusPowerReportParser(InnovusReportParser):
     """
@@ -12,16 +17,16 @@ class InnovusPowerReportParser(InnovusReportParser):
         power_reports = []
         power_unit = 1e-3  # mW
 
-        with open(self.report_path, 'r') as f:
+        with ReportScanner(self.report_path) as scanner:
 
-            design_line = self.read_until_match(f, r'^\*\s+Design:')
-            design_name = design_line.split(':')[1].strip()
+            design_match = scanner.read_until(DESIGN_REGEX)
+            design_name = design_match.group(1).decode('utf-8').strip()
 
-            self.read_until_match(f, r'^Group')
-            self.read_until_match(f, r'^-+$')
-            self.read_until_match(f, r'^-+$')
+            scanner.read_until(GROUP_REGEX)
+            scanner.read_until(DASH_LINE_REGEX)
+            scanner.read_until(DASH_LINE_REGEX)
 
-            total_power_line = f.readline()
+            total_power_line = scanner.next_line() or b''
             total_power_vals = total_power_line.split()
 
             power_reports.append({
@@ -32,17 +37,17 @@ class InnovusPowerReportParser(InnovusReportParser):
                 'total': float(total_power_vals[4]) * power_unit,
             })
 
-            self.read_until_match(f, r'^Hierarchy')
-            self.read_until_match(f, r'^-+$')
+            scanner.read_until(HIERARCHY_REGEX)
+            scanner.read_until(DASH_LINE_REGEX)
 
-            while True:
-                power_line = f.readline()
+            # the hierarchy table ends the report
+            for power_line in scanner.read_lines():
                 power_vals = power_line.split()
                 if len(power_vals) < 6:
                     break
 
                 power_reports.append({
-                    'instance': design_name + '/' + power_vals[0],
+                    'instance': design_name + '/' + power_vals[0].decode('utf-8'),
                     'internal': float(power_vals[1]) * power_unit,
                     'switching': float(power_vals[2]) * power_unit,
                     'leakage': float(power_vals[3]) * power_unit,
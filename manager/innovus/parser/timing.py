@@ -1,57 +1,87 @@
+import os
 from .parser import *
+from manager.common.scanner import ReportScanner
+
+# a bracketed value of a machine readable report, e.g., {u0/q_reg}
+BRACKETED = rb'\{[^}\n]*\}[ \t]*'
+# the head of a path up to its slack calculation: the second value of the ENDPT and BEGINPT lines,
+# the third value of the first two SLK_CLC lines (arrival time, slack), lines in between are skipped
+PATH_HEAD_REGEX = re.compile(
+    rb'\nPATH \d+\n'
+    rb'(?:[^\n]*\n)*?[ \t]+ENDPT[ \t]*' + BRACKETED + rb'\{([^}\n]*)\}[^\n]*\n'
+    rb'(?:[^\n]*\n)*?[ \t]+BEGINPT[ \t]*' + BRACKETED + rb'\{([^}\n]*)\}[^\n]*\n'
+    rb'(?:[^\n]*\n)*?[ \t]+SLK_CLC[^\n]*\n'
+    rb'[^\n{]*' + BRACKETED * 2 + rb'\{([^}\n]*)\}[^\n]*\n'
+    rb'[^\n{]*' + BRACKETED * 2 + rb'\{([^}\n]*)\}[^\n]*'
+)
+END_PATH_REGEX = re.compile(rb'\nEND_PATH \d+(?![^\n])')
+GROUP_REPORT_REGEX = re.compile(r'^group_timing_(.+)\.rpt$')
+
 
 class InnovusTimingReportParser(InnovusReportParser):
     """
-        Analyze timing report in text.    
+        Analyze timing report in text.
+
+        Machine readable reports are parsed in a single pass, alternating between the head of a path
+        and its END_PATH line. Both patterns are searched in the mapped report, so the lines in between
+        are skipped without a Python loop over them.
     """
 
-    def __init__(self, report_path: str) -> None:
+    def __init__(self, report_path: str, max_timing_paths: int = None) -> None:
         super().__init__(report_path)
-    
-    def analyze_single_path(self, f) -> dict:
-        """
-            Analyze timing report for a single path.
-        """
-        path_info = dict()
-        
-        self.read_until_match(f, r'^PATH \d+$')
-
-        endpt_line = self.read_until_match(f, r'^\s+ENDPT')
-        endpt_vals = self.parse_bracketed_value(endpt_line)
-        path_info['end_point'] = endpt_vals[1]
-
-        beginpt_line = self.read_until_match(f, r'^\s+BEGINPT')
-        beginpt_vals = self.parse_bracketed_value(beginpt_line)
-        path_info['begin_point'] = beginpt_vals[1]
+        self.max_timing_paths = max_timing_paths
 
-        slc_clc_lines = self.read_between_match(f, r'^\s+SLK_CLC', r'^\s+END_SLK_CLC')
-        arrival_time_line = slc_clc_lines[0]
-        arrival_time_vals = self.parse_bracketed_value(arrival_time_line)
-        path_info['arrival_time'] = float(arrival_time_vals[2])
-        slack_time_line = slc_clc_lines[1]
-        slack_time_vals = self.parse_bracketed_value(slack_time_line)
-        path_info['slack_time'] = float(slack_time_vals[2])
+    def iter_paths(self, max_paths: int = None):
+        """
+            Yield the begin point, end point, arrival time and slack of each path in the report.
 
-        self.read_until_match(f, r'^END_PATH (\d+)$')
+            Args:
+                max_paths (int, optional): Stop after that many paths, e.g., 1 for the worst path. Defaults to None (all).
+        """
+        if max_paths is not None and max_paths <= 0:
+            return
 
-        return path_info
+        count = 0
+        with ReportScanner(self.report_path) as scanner:
+            while True:
+                head = scanner.search(PATH_HEAD_REGEX)
+                if head is None:
+                    return
+                path_info = {
+                    'end_point': head.group(1).decode('utf-8'),
+                    'begin_point': head.group(2).decode('utf-8'),
+                    'arrival_time': float(head.group(3)),
+                    'slack_time': float(head.group(4)),
+                }
+                if scanner.search(END_PATH_REGEX) is None:
+                    return
+                yield path_info
+                count += 1
+                if count == max_paths:
+                    return
 
-    def run(self) -> list:
+    def run(self, max_paths: int = None) -> list:
         """
-            Analyze timing report for all paths.
+            Analyze timing report for the first max_paths paths, defaults to max_timing_paths (None for all).
         """
+        return list(self.iter_paths(max_paths if max_paths is not None else self.max_timing_paths))
 
-        timing_paths = []
+    @classmethod
+    def parse_report_dir(cls, report_dir: str, max_paths: int = None) -> dict:
+        """
+            Parse timing.rpt and every group_timing_<name>.rpt of a report directory, one pass per file.
 
-        with open(self.report_path, 'r') as f:
-            while True:
-                try:
-                    path_info = self.analyze_single_path(f)
-                    timing_paths.append(path_info)
-                except EOFError:
-                    break
-
-        return timing_paths
-        
-        
-        
\ No newline at end of file
+            Returns:
+                dict: The paths of each path group by name, those of timing.rpt under None.
+        """
+        reports = {None: os.path.join(report_dir, 'timing.rpt')}
+        for filename in sorted(os.listdir(report_dir)):
+            match = GROUP_REPORT_REGEX.match(filename)
+            if match:
+                reports[match.group(1)] = os.path.join(report_dir, filename)
+
+        return {
+            path_name: cls(report_path).run(max_paths)
+            for path_name, report_path in reports.items()
+            if os.path.isfile(report_path)
+        }
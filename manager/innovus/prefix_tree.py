@@ -0,0 +1,156 @@
+import os
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils import info, warn, assert_error, create_hash
+from manager.common import RUNTIME_CONFIG_KEYS
+from .innovus_manager import InnovusManager, DEFAULT_STEPS
+
+
+# the first step whose script reads a knob, unlisted knobs conservatively affect the first step
+KNOB_FIRST_STEP = {
+    'place_site': 'floorplan',
+    'place_utilization': 'floorplan',
+    'pwr_port': 'powerplan',
+    'gnd_port': 'powerplan',
+    'route_max_layer': 'placement',
+    'route_min_layer': 'placement',
+}
+
+KNOB_PREFIX_FIRST_STEP = [
+    ('stripe_', 'powerplan'),
+    ('sroute_', 'powerplan'),
+    ('place_detail_', 'placement'),
+    ('place_global_', 'placement'),
+    ('cts_', 'cts'),
+    ('ndr_cts_', 'cts'),
+]
+
+# knobs that never change the design database
+IGNORED_KNOBS = RUNTIME_CONFIG_KEYS + (
+    'steps',
+    'runmode',
+    'max_threads',
+)
+
+
+def get_knob_first_step(knob: str) -> str:
+    if knob in KNOB_FIRST_STEP:
+        return KNOB_FIRST_STEP[knob]
+    for prefix, step in KNOB_PREFIX_FIRST_STEP:
+        if knob.startswith(prefix):
+            return step
+    return DEFAULT_STEPS[0]
+
+
+class InnovusPrefixTree():
+    """
+        Run a batch of InnovusManager configs as a tree of shared step prefixes.
+
+        Each knob is keyed on the first step it affects, points agreeing on all knobs
+        of steps[:i+1] share one run of step i. Every tree node runs a single step in the
+        rundir of one of its points, starting from the parent's .enc checkpoint,
+        and sibling nodes run in parallel.
+    """
+
+    def __init__(self, configs_list: list, max_workers: int = 4) -> None:
+        self.configs_list = configs_list
+        self.max_workers = max_workers
+
+        self.steps = configs_list[0].get('steps', DEFAULT_STEPS)
+        for configs in configs_list:
+            assert configs.get('steps', DEFAULT_STEPS) == self.steps, \
+                assert_error('all points in a prefix tree must run the same steps')
+
+    def get_knob_depth(self, knob: str) -> int:
+        """
+            Index of the first step in self.steps affected by the knob, None if no step is affected.
+        """
+        first_step = DEFAULT_STEPS.index(get_knob_first_step(knob))
+        for depth, step in enumerate(self.steps):
+            if DEFAULT_STEPS.index(step) >= first_step:
+                return depth
+        return None
+
+    def get_prefix_key(self, configs: dict, depth: int) -> str:
+        """
+            Hash of all knobs affecting steps[:depth+1].
+        """
+        knobs = dict()
+        for knob, value in configs.items():
+            if knob in IGNORED_KNOBS:
+                continue
+            knob_depth = self.get_knob_depth(knob)
+            if knob_depth is not None and knob_depth <= depth:
+                knobs[knob] = value
+        return create_hash(json.dumps(knobs, sort_keys=True, default=str))
+
+    def group_points(self, indices: list, depth: int) -> list:
+        groups = dict()
+        for index in indices:
+            key = self.get_prefix_key(self.configs_list[index], depth)
+            groups.setdefault(key, []).append(index)
+        return list(groups.values())
+
+    def run_node(self, indices: list, depth: int, init_checkpoint: str) -> str:
+        """
+            Run steps[depth] once for all points in indices, return the checkpoint of the step.
+        """
+        step = self.steps[depth]
+        configs = dict(self.configs_list[indices[0]])
+        configs['steps'] = [step]
+        configs['runmode'] = 'normal'
+        if init_checkpoint:
+            configs['init_checkpoint'] = init_checkpoint
+        else:
+            configs.pop('init_checkpoint', None)
+        info("prefix tree: run %s for %d point(s) in %s" % (step, len(indices), configs['rundir']))
+
+        manager = InnovusManager(configs)
+        manager.run()
+
+        # the other points of the node see the reports as if they ran the step themselves
+        for index in indices[1:]:
+            shutil.copytree(
+                manager.report_dir,
+                os.path.join(self.configs_list[index]['rundir'], 'reports'),
+                dirs_exist_ok=True,
+            )
+        return manager.get_checkpoint_path(step)
+
+    def run(self) -> list:
+        """
+            Run all points, return a record with the rundir and error (if any) per point.
+        """
+        records = [{'rundir': configs['rundir'], 'error': None} for configs in self.configs_list]
+        if not self.steps:
+            return records
+
+        ready = [(group, 0, None) for group in self.group_points(list(range(len(self.configs_list))), 0)]
+        running = dict()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                while ready:
+                    indices, depth, init_checkpoint = ready.pop()
+                    future = executor.submit(self.run_node, indices, depth, init_checkpoint)
+                    running[future] = (indices, depth)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indices, depth = running.pop(future)
+                    try:
+                        checkpoint = future.result()
+                    except Exception as e:
+                        warn("prefix tree: %s failed: %s" % (self.steps[depth], repr(e)))
+                        for index in indices:
+                            records[index]['error'] = repr(e)
+                        continue
+
+                    # fork the remaining steps
+                    if depth + 1 < len(self.steps):
+                        for group in self.group_points(indices, depth + 1):
+                            ready.append((group, depth + 1, checkpoint))
+
+        return records
@@ -52,7 +52,7 @@ class MacManager(BaseManager):
         def condition():
             return if_exist(self.wallace_verilog_file)
         
-        self.routine_check(5*60, cmd, condition, 1)
+        self.routine_check(5*60, cmd, condition, 1, step='wallace')
 
     def compile_ppadder(self):
         """
@@ -76,7 +76,7 @@ class MacManager(BaseManager):
         def condition():
             return if_exist(self.ppadder_verilog_file)
         
-        self.routine_check(5*60, cmd, condition, 1)
+        self.routine_check(5*60, cmd, condition, 1, step='ppadder')
 
     def compile_mac(self):
         """
@@ -107,7 +107,7 @@ class MacManager(BaseManager):
         def condition():
             return if_exist(self.mac_verilog_file)
         
-        self.routine_check(5*60, cmd, condition, 1)
+        self.routine_check(5*60, cmd, condition, 1, step='mac')
 
     def run_impl(self):
         self.complie_wallace()
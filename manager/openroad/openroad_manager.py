@@ -1,7 +1,7 @@
 import os
 from typing import Callable
 
-from manager.common import BaseManager
+from manager.common import BaseManager, MEMORY_PATTERNS, NFS_PATTERNS
 from utils import mkdir, if_exist
 from .openroad_parser import OpenroadParser
 
@@ -22,6 +22,14 @@ class OpenroadManager(BaseManager):
     def name(self) -> str:
         return 'openroad_manager'
 
+    @property
+    def default_fatal_patterns(self) -> dict:
+        return {
+            'memory': MEMORY_PATTERNS,
+            'nfs': NFS_PATTERNS,
+            'error': [r'^\[ERROR '],
+        }
+
     @property
     def data_dir(self) -> str:
         return os.path.join(self.rundir, 'data')
@@ -157,7 +165,10 @@ set rcx_rules_file "%s/Nangate45/Nangate45.rcx_rules"
         
         return codes
 
-    def run_impl(self) -> None:
+    def generate_scripts(self) -> list:
+        """
+            Generate scripts, return the keyword arguments of routine_check for each command to run.
+        """
         # generate codes
         openroad_script_path = os.path.join(self.script_dir, 'pnr.tcl')
         with open(openroad_script_path, 'w') as f:
@@ -173,7 +184,8 @@ set rcx_rules_file "%s/Nangate45/Nangate45.rcx_rules"
 
         # run pnr
         log_path = os.path.join(self.log_dir, 'report.log')
-        cmd = "cd {} && PATH=$PATH:{} " \
+        # pipefail: the exit code of openroad, not of tee, e.g., once killed by the OOM killer
+        cmd = "set -o pipefail; cd {} && PATH=$PATH:{} " \
                 "{} {} | tee {}".format(
                   self.rundir,
                   os.path.join(self.openroad_dir, 'test'),
@@ -181,11 +193,21 @@ set rcx_rules_file "%s/Nangate45/Nangate45.rcx_rules"
                   openroad_script_path,
                   log_path,
               )
-        self.routine_check(
-            period=3600*10,
-            cmd=cmd,
-            condition=lambda: if_exist(log_path),
-        )
+        return [{
+            'period': 3600*10,
+            'cmd': cmd,
+            'condition': lambda: if_exist(log_path),
+            'step': 'pnr',
+            'log_path': log_path,
+        }]
+
+    def run_impl(self) -> None:
+        for check in self.generate_scripts():
+            self.routine_check(**check)
+
+    async def run_impl_async(self) -> None:
+        for check in self.generate_scripts():
+            await self.routine_check_async(**check)
 
     def generate_output_impl(self) -> dict:
         parser = OpenroadParser(os.path.join(self.log_dir, 'report.log'))
@@ -1,5 +1,9 @@
 import re
 from utils import if_exist
+from manager.common.scanner import ReportScanner
+
+# result: <name> = <value>, printed by the flow scripts
+RESULT_REGEX = re.compile(rb'\nresult:[^\S\n]+(\w+)[^\S\n]+=[^\S\n]+(-?\d+\.\d*)')
 
 class OpenroadParser():
 
@@ -26,16 +30,13 @@ class OpenroadParser():
 
         results = dict()
 
-        with open(self.report_path, 'r') as f:
+        with ReportScanner(self.report_path) as scanner:
             while True:
-                try:
-                    line = self.read_until_match(f, r'^result:')
-                    data_match = re.match(r'^result:\s+([\w\_]+)\s+=\s+(-?\d+\.\d*)', line)
-                    results[data_match.group(1)] = float(data_match.group(2))
-
-                except EOFError:
+                data_match = scanner.search(RESULT_REGEX)
+                if data_match is None:
                     break
+                results[data_match.group(1).decode('utf-8')] = float(data_match.group(2))
 
         print(results)
 
-        return results
\ No newline at end of file
+        return results
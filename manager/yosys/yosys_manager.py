@@ -1,9 +1,15 @@
 import os
 from typing import Callable
 
-from manager.common import BaseManager
+from manager.common import BaseManager, SessionExecutor, MEMORY_PATTERNS, NFS_PATTERNS
+from manager.common.session import DEFAULT_SESSION_DIR
 from .yosys_parser import YosysParser
-from utils import mkdir, if_exist
+from utils import mkdir, if_exist, warn, RoutineCheckError, RoutineCancelledError
+
+# drop the linked design of an STA worker, keeping the technology and libraries
+DEFAULT_STA_WORKER_RESET_CODE = "odb::dbChip_destroy [[ord::get_db] getChip]"
+# drop the design of a yosys worker
+DEFAULT_YOSYS_WORKER_RESET_CODE = "yosys design -reset"
 
 class YosysManager(BaseManager):
     """
@@ -22,6 +28,15 @@ class YosysManager(BaseManager):
     def name(self) -> str:
         return 'yosys_manager'
 
+    @property
+    def default_fatal_patterns(self) -> dict:
+        # yosys for synthesis, openroad for reports
+        return {
+            'memory': MEMORY_PATTERNS,
+            'nfs': NFS_PATTERNS,
+            'error': [r'^ERROR:', r'^\[ERROR '],
+        }
+
     @property
     def data_dir(self) -> str:
         return os.path.join(self.rundir, 'data')
@@ -64,31 +79,43 @@ class YosysManager(BaseManager):
         files = self.configs.get(key, [])
         return sep.join(files)
 
-    def generate_syn_code(self) -> str:
+    def get_syn_commands(self) -> list:
         """
-            Generate synthesis codes for yosys
+            Synthesis commands for yosys
         """
-        codes = ""
+        commands = []
 
-        codes += "read -sv %s\n" % self.get_file_list('verilog_files')
+        commands.append("read -sv %s" % self.get_file_list('verilog_files'))
 
-        codes += "hierarchy -top %s\n" % self.top_module
-        codes += "flatten\n"
-        codes += "proc; techmap; opt;\n"
+        commands.append("hierarchy -top %s" % self.top_module)
+        commands.append("flatten")
+        commands += ["proc", "techmap", "opt"]
 
         # map the register files
-        codes += "dfflibmap -liberty %s\n" % self.get_file_list('lib_files')
+        commands.append("dfflibmap -liberty %s" % self.get_file_list('lib_files'))
 
         #  -constr %s
-        codes += "abc -fast -liberty %s -D %.1f \n" % (
+        commands.append("abc -fast -liberty %s -D %.1f" % (
             self.get_file_list('lib_files'),
             # os.path.join(self.script_dir, 'abc_constr'),
             self.configs.get('clk_period_ns') * 1000,
-        )
+        ))
 
-        codes += "write_verilog %s\n" % self.hdl_mapped_path
+        commands.append("write_verilog %s" % self.hdl_mapped_path)
 
-        return codes
+        return commands
+
+    def generate_syn_code(self) -> str:
+        """
+            Generate synthesis codes for yosys
+        """
+        return "".join("%s\n" % command for command in self.get_syn_commands())
+
+    def generate_syn_worker_code(self) -> str:
+        """
+            Generate synthesis codes for the Tcl shell of a yosys worker, see use_yosys_worker
+        """
+        return "".join("yosys %s\n" % command for command in self.get_syn_commands())
     
     def generate_abc_constr_code(self) -> str:
         """
@@ -101,9 +128,9 @@ set_load 10.0 [all_outputs]
 """
         return codes
     
-    def generate_report_code(self) -> str:
+    def generate_tech_code(self) -> str:
         """
-            Generate report codes for openroad
+            Generate technology loading codes for openroad
         """
         codes = ""
 
@@ -111,7 +138,13 @@ set_load 10.0 [all_outputs]
             codes += "read_lef %s\n" % lef_file
         for lib_file in self.configs.get('lib_files'):
             codes += "read_lib %s\n" % lib_file
-        codes += '''
+        return codes
+
+    def generate_sta_code(self) -> str:
+        """
+            Generate timing and area report codes for openroad, on the loaded technology
+        """
+        codes = '''
 read_verilog %s
 link_design %s
 set_max_delay -from [all_inputs] 0
@@ -119,16 +152,86 @@ set critical_path [lindex [find_timing_paths -sort_by_slack] 0]
 set path_delay [sta::format_time [[$critical_path path] arrival] 4]
 puts "result: worst_delay = $path_delay"
 report_design_area
-exit
 ''' % (
     self.hdl_mapped_path,
     self.top_module,
 )
         return codes
 
-    def run_impl(self):
+    def generate_report_code(self) -> str:
         """
-            Run Yosys
+            Generate report codes for openroad
+        """
+        return self.generate_tech_code() + self.generate_sta_code() + "exit\n"
+
+    @property
+    def use_sta_worker(self) -> bool:
+        """
+            Report with a persistent openroad worker which keeps the technology loaded,
+            enabled by 'sta_worker' in configs, the number of idle workers to keep.
+        """
+        return bool(self.configs.get('sta_worker'))
+
+    @property
+    def use_yosys_worker(self) -> bool:
+        """
+            Synthesize with a persistent yosys worker in Tcl mode, which skips the start-up of yosys
+            for each design, enabled by 'yosys_worker' in configs, the number of idle workers to keep.
+        """
+        return bool(self.configs.get('yosys_worker'))
+
+    def create_worker_executor(self, cmd: str, size: int, reset_code: str, setup_code: str = '') -> SessionExecutor:
+        session_dir = self.configs.get('session_dir', DEFAULT_SESSION_DIR)
+        return SessionExecutor(
+            "cd {} && {}".format(session_dir, cmd),
+            self.log_dir,
+            size=size,
+            reset_code=reset_code,
+            setup_code=setup_code,
+            cancel_token=self.cancel_token,
+            session_dir=session_dir,
+        )
+
+    def create_sta_executor(self) -> SessionExecutor:
+        return self.create_worker_executor(
+            "{} -no_init -no_splash".format(self.openroad_bin),
+            self.configs.get('sta_worker'),
+            self.configs.get('sta_worker_reset_code', DEFAULT_STA_WORKER_RESET_CODE),
+            setup_code=self.generate_tech_code(),
+        )
+
+    def create_yosys_executor(self) -> SessionExecutor:
+        return self.create_worker_executor(
+            "{} -C".format(self.yosys_bin),
+            self.configs.get('yosys_worker'),
+            self.configs.get('yosys_worker_reset_code', DEFAULT_YOSYS_WORKER_RESET_CODE),
+        )
+
+    def report_done(self, log_path: str) -> bool:
+        """
+            Whether the report log holds both the worst delay and the design area.
+        """
+        if not if_exist(log_path):
+            return False
+        with open(log_path, 'r') as f:
+            try:
+                return len(YosysParser.parse_lines(f)) == 2
+            except (ValueError, IndexError):
+                return False
+
+    def get_report_log_path(self) -> str:
+        """
+            Log of the one-shot openroad report, or of the STA worker job, which is named after its step.
+        """
+        log_paths = [os.path.join(self.log_dir, 'report.log'), os.path.join(self.log_dir, 'report')]
+        for log_path in log_paths:
+            if self.report_done(log_path):
+                return log_path
+        return log_paths[0]
+
+    def generate_scripts(self) -> list:
+        """
+            Generate scripts, return the keyword arguments of routine_check for each command to run.
         """
         # generate synthesis script
         yosys_script_path = os.path.join(self.script_dir, 'syn.ys')
@@ -140,34 +243,103 @@ exit
         with open(abc_constr_path, 'w') as f:
             f.write(self.generate_abc_constr_code())
 
-        # run synthesis
-        cmd = f'{self.yosys_bin} -s {yosys_script_path} | tee {os.path.join(self.log_dir, "syn.log")}'
-        self.routine_check(
-            period=3600,
-            cmd=cmd,
-            condition=lambda: if_exist(self.hdl_mapped_path),
-        )
-
         # report PPA with openroad
         report_script_path = os.path.join(self.script_dir, 'report.tcl')
         with open(report_script_path, 'w') as f:
             f.write(self.generate_report_code())
-        
-        # run report
+
+        syn_log_path = os.path.join(self.log_dir, 'syn.log')
         log_path = os.path.join(self.log_dir, 'report.log')
-        cmd = f'{self.openroad_bin} {report_script_path} | tee {log_path}'
-        self.routine_check(
-            period=3600,
-            cmd=cmd,
-            condition=lambda: if_exist(log_path),
-        )
+        checks = [
+            # run synthesis
+            {
+                'period': 3600,
+                'cmd': f'set -o pipefail; {self.yosys_bin} -s {yosys_script_path} | tee {syn_log_path}',
+                'condition': lambda: if_exist(self.hdl_mapped_path),
+                'step': 'syn',
+                'log_path': syn_log_path,
+            },
+            # run report
+            {
+                'period': 3600,
+                'cmd': f'set -o pipefail; {self.openroad_bin} {report_script_path} | tee {log_path}',
+                'condition': lambda: self.report_done(log_path),
+                'step': 'report',
+                'log_path': log_path,
+            },
+        ]
+
+        if self.use_yosys_worker:
+            # the worker runs the same commands, falls back to the one-shot synthesis
+            worker_script_path = os.path.join(self.script_dir, 'syn_worker.tcl')
+            with open(worker_script_path, 'w') as f:
+                f.write(self.generate_syn_worker_code())
+            worker_log_path = os.path.join(self.log_dir, 'syn')
+            checks[0] = {
+                'period': 3600,
+                'cmd': 'source {%s}' % os.path.abspath(worker_script_path),
+                'condition': lambda: if_exist(self.hdl_mapped_path),
+                'step': 'syn',
+                'log_path': worker_log_path,
+                'executor': self.create_yosys_executor(),
+                'fallback': checks[0],
+            }
+
+        if self.use_sta_worker:
+            # the worker only links and reports the netlist, falls back to the one-shot report
+            sta_script_path = os.path.join(self.script_dir, 'sta.tcl')
+            with open(sta_script_path, 'w') as f:
+                f.write(self.generate_sta_code())
+            sta_log_path = os.path.join(self.log_dir, 'report')
+            checks[1] = {
+                'period': 3600,
+                'cmd': 'source {%s}' % os.path.abspath(sta_script_path),
+                'condition': lambda: self.report_done(sta_log_path),
+                'step': 'report',
+                'log_path': sta_log_path,
+                'executor': self.create_sta_executor(),
+                'fallback': checks[1],
+            }
+        return checks
+
+    def run_impl(self):
+        """
+            Run Yosys
+        """
+        for check in self.generate_scripts():
+            fallback = check.pop('fallback', None)
+            try:
+                self.routine_check(**check)
+            except RoutineCancelledError:
+                raise
+            except RoutineCheckError as e:
+                if fallback is None:
+                    raise
+                warn("%s with the worker failed (%s), run it again in a new process" % (check['step'], e))
+                self.routine_check(**fallback)
+
+    async def run_impl_async(self):
+        """
+            Run Yosys with asyncio
+        """
+        for check in self.generate_scripts():
+            fallback = check.pop('fallback', None)
+            try:
+                await self.routine_check_async(**check)
+            except RoutineCancelledError:
+                raise
+            except RoutineCheckError as e:
+                if fallback is None:
+                    raise
+                warn("%s with the worker failed (%s), run it again in a new process" % (check['step'], e))
+                await self.routine_check_async(**fallback)
 
     def generate_output_impl(self) -> dict:
         output = {
             'verilog_file': self.hdl_mapped_path,
         }
 
-        parser = YosysParser(os.path.join(self.log_dir, 'report.log'))
+        parser = YosysParser(self.get_report_log_path())
         output.update(parser.run())
     
         return output
\ No newline at end of file
@@ -1,25 +1,39 @@
 import re
 from utils import if_exist
+from manager.common.scanner import ReportScanner
+
+# the lines of the report parse_lines reads
+RESULT_LINE_REGEXES = (re.compile(rb'worst_delay'), re.compile(rb'Design area'))
 
 class YosysParser():
 
     def __init__(self, report_path: str) -> None:
         self.report_path = report_path
         assert if_exist(report_path), f"Report file {report_path} does not exist."
-            
-    def run(self):
 
+    @staticmethod
+    def parse_lines(lines) -> dict:
+        """
+            Extract the worst delay and the design area from the report lines of openroad.
+        """
         results = dict()
 
-        with open(self.report_path, 'r') as f:
-            for line in f.readlines():
-                if 'worst_delay' in line:
-                    delay = float(line.strip().split()[-1])
-                    results['delay'] = delay
-                elif 'Design area' in line:
-                    area = float(line.strip().split()[2])
-                    results['area'] = area
+        for line in lines:
+            if 'worst_delay' in line:
+                delay = float(line.strip().split()[-1])
+                results['delay'] = delay
+            elif 'Design area' in line:
+                area = float(line.strip().split()[2])
+                results['area'] = area
+
+        return results
+
+    def run(self):
+
+        with ReportScanner(self.report_path) as scanner:
+            lines = scanner.iter_matching_lines(*RESULT_LINE_REGEXES)
+            results = self.parse_lines(line.decode('utf-8') for line in lines)
 
         print(results)
 
-        return results
\ No newline at end of file
+        return results
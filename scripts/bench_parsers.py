@@ -0,0 +1,287 @@
+"""
+    Benchmark the report parsers on synthetic reports:
+
+        python scripts/bench_parsers.py [--baseline REV] [--scale N] [--repeat N]
+
+    Genus, Innovus, OpenROAD and Yosys reports of a synthetic design are generated once in a work directory,
+    then a subprocess times each parser of the working tree (best of --repeat runs). With --baseline, the parsers
+    of a git revision, e.g., the commit before the ReportScanner, are exported with git archive and timed the same way,
+    and the results of both trees must be equal.
+"""
+import os
+import sys
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import io
+import json
+import time
+import random
+import hashlib
+import tarfile
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+# report name -> parser class, constructor arguments after the report path
+BENCHMARKS = {
+    'genus_timing_first': ('manager.genus', 'GenusTimingReportParser', ()),
+    'genus_timing_all': ('manager.genus', 'GenusTimingReportParser', (10 ** 9,)),
+    'genus_area': ('manager.genus', 'GenusAreaReportParser', ()),
+    'genus_power': ('manager.genus', 'GenusPowerReportParser', ()),
+    'innovus_timing': ('manager.innovus', 'InnovusTimingReportParser', ()),
+    'innovus_area': ('manager.innovus', 'InnovusAreaReportParser', ()),
+    'innovus_power': ('manager.innovus', 'InnovusPowerReportParser', ()),
+    'openroad': ('manager.openroad.openroad_parser', 'OpenroadParser', ()),
+    'yosys': ('manager.yosys.yosys_parser', 'YosysParser', ()),
+}
+
+# the timing reports share genus_timing.rpt
+REPORT_NAMES = {
+    'genus_timing_first': 'genus_timing',
+    'genus_timing_all': 'genus_timing',
+}
+
+
+def get_report_path(workdir: str, name: str) -> str:
+    return os.path.join(workdir, '%s.rpt' % REPORT_NAMES.get(name, name))
+
+
+def write_genus_timing(f, scale: int) -> None:
+    f.write('=' * 60 + '\n  Generated by:  Genus(TM) Synthesis Solution 21.14\n' + '=' * 60 + '\n\n')
+    separator = '#' + '-' * 90 + '\n'
+    for i in range(1, 200 * scale + 1):
+        slack = random.randint(-50, 50)
+        data_path = random.randint(100, 900)
+        f.write(
+            'Path %d: VIOLATED (%d ps) Setup Check with Pin u%d/q_reg/CK->D\n'
+            '          Group: C2C\n     Startpoint: (R) u%d/q_reg/CK\n          Clock: (R) clk\n'
+            '       Endpoint: (F) u%d/q_reg/D\n          Clock: (R) clk\n\n' % (i, slack, i, i % 50, (i * 7) % 50)
+        )
+        f.write(
+            '                     Capture       Launch\n        Clock Edge:+    1000            0\n'
+            '        Src Latency:+       0            0\n       Net Latency:+       0 (I)        0 (I)\n'
+            '           Arrival:=    1000            0\n\n             Setup:-      20\n'
+            '       Uncertainty:-       0\n     Required Time:=     980\n      Launch Clock:-       0\n'
+            '         Data Path:-     %d\n             Slack:=     %d\n\n' % (data_path, slack)
+        )
+        f.write(
+            separator + '#   Timing Point   Flags   Arc   Edge   Cell   Fanout  Load  Trans Delay Arrival Instance\n'
+            '#                                                       (fF)  (ps)  (ps)   (ps)  Location\n' + separator
+        )
+        for j in range(30):
+            f.write('  u%d/g%d/Y   -   A->Y   F   INVX1   1  1.2  10  %d  %d    (-,-)\n' % (i, j, j, j * 10))
+        f.write(separator + '\n')
+
+
+def write_innovus_timing(f, scale: int) -> None:
+    f.write('#' * 60 + '\n#  Generated by:  Cadence Innovus 21.1\n' + '#' * 60 + '\n\n')
+    for i in range(1, 20 * scale + 1):
+        arrival = random.uniform(100, 900)
+        slack = random.uniform(-50, 50)
+        f.write('PATH %d\n  VIEW  default_view\n  CHECK_TYPE {Setup Check}\n  REF {u%d/q_reg} {CK}\n' % (i, i))
+        f.write('  ENDPT {u%d/q_reg} {D} {DFFHQNx1_ASAP7_75t_R} {v} {leading} {clk} {clk(C)(P)}\n' % i)
+        f.write('  BEGINPT {u%d/q_reg} {CK} {DFFHQNx1_ASAP7_75t_R} {^} {leading} {clk} {clk(C)(P)}\n' % (i + 1))
+        f.write(
+            '  CLK_PATH {clk} {clk(C)(P)}\n  SLK_CLC\n    ARRIVAL {} {} {%.3f} {} {}\n    SLK {} {} {%.3f} {} {}\n'
+            '    REQ {} {} {1000}\n  END_SLK_CLC\n  SLK %.3f\n' % (arrival, slack, slack)
+        )
+        f.write('  TIMING_PATH\n')
+        for j in range(200):
+            f.write(
+                '    INST {u%d/g%d} {A} {^} {Y} {v} {} {INVx1_ASAP7_75t_R} {%.1f} {%.1f} {%.1f} {1.2} {3} {(10.0, 20.0)}\n'
+                % (i, j, j * 1.5, j * 2.0, j * 3.1)
+            )
+        f.write('  END_TIMING_PATH\nEND_PATH %d\n\n' % i)
+
+
+def iter_hierarchy(count: int):
+    """
+        Yield (depth, instance) of a module tree in depth-first order.
+    """
+    depth = 1
+    for i in range(count):
+        yield depth, 'u%d' % i
+        depth = max(1, min(depth + random.choice((-1, 0, 1)), 6))
+
+
+def write_genus_area(f, scale: int) -> None:
+    f.write('=' * 60 + '\n  Generated by:  Genus(TM) Synthesis Solution 21.14\n' + '=' * 60 + '\n\n')
+    f.write('   Instance     Module   Cell Count  Cell Area  Net Area   Total Area\n' + '-' * 72 + '\n')
+    f.write('top   %d  %.3f  %.3f  %.3f\n' % (1000 * scale, 5000.0 * scale, 800.0 * scale, 5800.0 * scale))
+    for depth, instance in iter_hierarchy(2000 * scale):
+        f.write('%s%s  mod_%s  %d  %.3f  %.3f  %.3f\n' % (
+            '  ' * depth, instance, instance, random.randint(1, 500),
+            random.uniform(1, 500), random.uniform(1, 50), random.uniform(1, 550),
+        ))
+
+
+def write_genus_power(f, scale: int) -> None:
+    f.write('=' * 60 + '\n  Generated by:  Genus(TM) Synthesis Solution 21.14\n' + '=' * 60 + '\n\n')
+    f.write('Power Unit: W\n PDB Frames: /stim#0/frame#0\n\n' + '-' * 80 + '\n')
+    f.write('    Cells   Pct  Leakage  Internal  Switching  Total  Lvl  Instance\n' + '-' * 80 + '\n')
+    f.write('%d  100.0  1.0e-04  2.0e-03  1.0e-03  3.1e-03  0  /top\n' % (1000 * scale))
+    for depth, instance in iter_hierarchy(2000 * scale):
+        f.write('%d  %.1f  %.3e  %.3e  %.3e  %.3e  %d  /top/%s\n' % (
+            random.randint(1, 500), random.uniform(0, 10), random.uniform(0, 1e-5),
+            random.uniform(0, 1e-4), random.uniform(0, 1e-4), random.uniform(0, 2e-4), depth, instance,
+        ))
+    f.write('-' * 80 + '\n')
+
+
+def write_innovus_area(f, scale: int) -> None:
+    f.write('#' * 60 + '\n#  Generated by:  Cadence Innovus 21.1\n' + '#' * 60 + '\n\n')
+    f.write('Hinst Name  Module Name  Inst Count  Total Area  Buffer  Inverter  Combinational  Flop  Latch  '
+            'Clock Gate  Macro  Physical\n' + '-' * 120 + '\n')
+    f.write('top  %d  %.3f  10.0  20.0  3000.0  1500.0  0.0  5.0  0.0  50.0\n' % (1000 * scale, 5000.0 * scale))
+    for depth, instance in iter_hierarchy(2000 * scale):
+        f.write('%s%s  mod_%s  %d  %s\n' % (
+            '  ' * depth, instance, instance, random.randint(1, 500),
+            '  '.join('%.3f' % random.uniform(0, 100) for _ in range(9)),
+        ))
+
+
+def write_innovus_power(f, scale: int) -> None:
+    f.write('*' * 60 + '\n*\n*  Innovus 21.1\n*\n*  Design: top\n*\n' + '*' * 60 + '\n\n')
+    f.write('Total Power\n' + '-' * 60 + '\nTotal Internal Power:  2.0  40.0%\n\n\n')
+    f.write('Group  Internal  Switching  Leakage  Total  Percentage\n' + '-' * 60 + '\n')
+    f.write('       Power     Power      Power    Power  (%)\n' + '-' * 60 + '\n')
+    f.write('Total  2.0  1.5  0.1  3.6  100\n' + '-' * 60 + '\n\n')
+    f.write('Hierarchy  Internal  Switching  Leakage  Total  Percentage\n' + '-' * 60 + '\n')
+    for depth, instance in iter_hierarchy(2000 * scale):
+        f.write('%s  %.4e  %.4e  %.4e  %.4e  %.2f\n' % (
+            '/'.join('u%d' % d for d in range(depth)) + '/' + instance,
+            random.uniform(0, 1e-2), random.uniform(0, 1e-2), random.uniform(0, 1e-4),
+            random.uniform(0, 2e-2), random.uniform(0, 1),
+        ))
+    f.write('\n')
+
+
+def write_noise(f, count: int) -> None:
+    for i in range(count):
+        f.write('[INFO GRT-%04d] routing layer %d, %d nets, %d%% congestion\n' % (
+            i % 10000, i % 10, random.randint(0, 10 ** 5), random.randint(0, 100),
+        ))
+
+
+def write_openroad(f, scale: int) -> None:
+    for name in ('worst_slack', 'worst_delay', 'tns', 'design_area', 'utilization', 'power'):
+        write_noise(f, 5000 * scale)
+        f.write('result: %s = %.4f\n' % (name, random.uniform(-100, 1000)))
+    write_noise(f, 1000 * scale)
+
+
+def write_yosys(f, scale: int) -> None:
+    write_noise(f, 20000 * scale)
+    f.write('worst_delay %.4f\n' % random.uniform(100, 1000))
+    write_noise(f, 5000 * scale)
+    f.write('Design area %.4f u^2 60%% utilization.\n' % random.uniform(1e3, 1e5))
+    write_noise(f, 5000 * scale)
+
+
+REPORT_WRITERS = {
+    'genus_timing': write_genus_timing,
+    'genus_area': write_genus_area,
+    'genus_power': write_genus_power,
+    'innovus_timing': write_innovus_timing,
+    'innovus_area': write_innovus_area,
+    'innovus_power': write_innovus_power,
+    'openroad': write_openroad,
+    'yosys': write_yosys,
+}
+
+
+def generate_reports(workdir: str, scale: int) -> None:
+    random.seed(0)
+    for name, writer in REPORT_WRITERS.items():
+        with open(os.path.join(workdir, '%s.rpt' % name), 'w') as f:
+            writer(f, scale)
+
+
+def time_parsers(workdir: str, repeat: int) -> dict:
+    """
+        Best runtime and a digest of the results of each parser importable from sys.path.
+    """
+    import importlib
+
+    timings = dict()
+    for name, (module_name, class_name, args) in BENCHMARKS.items():
+        parser_class = getattr(importlib.import_module(module_name), class_name)
+        report_path = get_report_path(workdir, name)
+        best = None
+        for _ in range(repeat):
+            # some parsers print their results
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                results = parser_class(report_path, *args).run()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = (best, hashlib.sha256(repr(results).encode('utf-8')).hexdigest())
+    return timings
+
+
+def run_tree(tree: str, workdir: str, repeat: int) -> dict:
+    """
+        Time the parsers of a source tree in a fresh interpreter.
+    """
+    output_path = os.path.join(workdir, 'timings.json')
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--tree', tree, '--workdir', workdir,
+         '--repeat', str(repeat), '--output', output_path],
+        check=True,
+    )
+    with open(output_path, 'r') as f:
+        return json.load(f)
+
+
+def export_revision(revision: str, tree: str) -> None:
+    archive = subprocess.run(['git', '-C', REPO_ROOT, 'archive', '--format=tar', revision],
+                             check=True, stdout=subprocess.PIPE).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(tree)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the report parsers on synthetic reports.')
+    parser.add_argument('--baseline', help='git revision of the parsers to compare with')
+    parser.add_argument('--scale', type=int, default=20, help='size of the synthetic reports')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per parser, the best one counts')
+    parser.add_argument('--workdir', help='directory of the reports, a temporary one by default')
+    # internal: time the parsers of a tree
+    parser.add_argument('--tree', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.tree:
+        sys.path.insert(0, args.tree)
+        with open(args.output, 'w') as f:
+            json.dump(time_parsers(args.workdir, args.repeat), f)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = args.workdir or tmpdir
+        os.makedirs(workdir, exist_ok=True)
+        generate_reports(workdir, args.scale)
+
+        timings = run_tree(REPO_ROOT, workdir, args.repeat)
+        baseline = None
+        if args.baseline:
+            baseline_tree = os.path.join(tmpdir, 'baseline')
+            export_revision(args.baseline, baseline_tree)
+            baseline = run_tree(baseline_tree, workdir, args.repeat)
+
+        print('%-20s %10s %10s %10s %8s' % ('report', 'MB', 'baseline', 'current', 'speedup'))
+        for name, (seconds, digest) in timings.items():
+            size = os.path.getsize(get_report_path(workdir, name)) / 1e6
+            if baseline is None:
+                print('%-20s %10.1f %10s %9.3fs %8s' % (name, size, '-', seconds, '-'))
+                continue
+            baseline_seconds, baseline_digest = baseline[name]
+            print('%-20s %10.1f %9.3fs %9.3fs %7.1fx%s' % (
+                name, size, baseline_seconds, seconds, baseline_seconds / seconds,
+                '' if digest == baseline_digest else '  results differ',
+            ))
+
+
+if __name__ == '__main__':
+    main()
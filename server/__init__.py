@@ -0,0 +1,3 @@
+from .store import JobStore
+from .server import JobServer
+from .client import JobClient
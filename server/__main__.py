@@ -0,0 +1,32 @@
+"""
+    Long-running DSE job server:
+
+        python -m server --socket SOCKET --db DB [--max-workers N] [--policy fifo|sjf|priority] [--aging A]
+
+    Clients submit flow jobs over a Unix socket (see JobClient). Jobs and results persist in
+    SQLite and run in detached worker processes, so a restarted server re-attaches to the
+    workers still running and re-queues the jobs whose workers are gone.
+"""
+import signal
+import argparse
+import threading
+from .server import JobServer
+from flow.scheduler import JobScheduler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--socket', required=True)
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--policy', choices=JobScheduler.POLICIES, default='priority')
+    parser.add_argument('--aging', type=float, default=1.0)
+    args = parser.parse_args()
+
+    job_server = JobServer(args.socket, args.db, max_workers=args.max_workers, policy=args.policy, aging=args.aging)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=job_server.shutdown).start())
+    job_server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import socket
+from .store import FINAL_STATES
+
+
+class JobClient(object):
+    """
+        Client of the JobServer Unix socket API.
+    """
+
+    def __init__(self, socket_path: str, owner: str = None) -> None:
+        self.socket_path = socket_path
+        self.owner = owner or os.environ.get('USER')
+
+    def request(self, request: dict) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            with sock.makefile('rwb') as f:
+                f.write((json.dumps(request) + '\n').encode('utf-8'))
+                f.flush()
+                response = json.loads(f.readline())
+        if not response.get('ok'):
+            raise RuntimeError("job server: %s" % response.get('error', response))
+        return response
+
+    def submit(self, kind: str, payload: dict, priority: int = 0) -> int:
+        """
+            Submit a job, e.g., kind 'genus_innovus' with the arguments of GenusInnovusFlow
+            (see server/worker.py), return the job id. The payload may carry the post-synthesis
+            'area' of a prior stage, which sharpens the runtime estimate of the scheduler.
+        """
+        return self.request({
+            'op': 'submit',
+            'kind': kind,
+            'payload': payload,
+            'priority': priority,
+            'owner': self.owner,
+        })['job_id']
+
+    def status(self, job_id: int) -> dict:
+        return self.request({'op': 'status', 'job_id': job_id})['job']
+
+    def list(self, state: str = None) -> list:
+        return self.request({'op': 'list', 'state': state})['jobs']
+
+    def cancel(self, job_id: int) -> str:
+        return self.request({'op': 'cancel', 'job_id': job_id})['state']
+
+    def shutdown(self) -> None:
+        self.request({'op': 'shutdown'})
+
+    def wait(self, job_id: int, interval: float = 5) -> dict:
+        """
+            Block until the job reaches a final state, return the job.
+        """
+        while True:
+            job = self.status(job_id)
+            if job['state'] in FINAL_STATES:
+                return job
+            time.sleep(interval)
@@ -0,0 +1,259 @@
+import os
+import sys
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+
+import json
+import signal
+import threading
+import subprocess
+import socketserver
+from utils import mkdir, info, warn, get_process_start
+from manager.common.license_pool import pid_alive
+from flow.scheduler import CostModel, JobScheduler
+from .store import JobStore, QUEUED, RUNNING, DONE, FAILED, CANCELLED
+from .worker import get_flow_class
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+        One JSON request per line, answered by one JSON response per line.
+    """
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.job_server.handle_request(json.loads(line))
+            except Exception as e:
+                response = {'ok': False, 'error': repr(e)}
+            self.wfile.write((json.dumps(response, default=str) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class JobServer(object):
+    """
+        Accept jobs over a Unix socket, keep them in a JobStore and run at most max_workers at once.
+
+        Each job runs in its own worker process (server/worker.py) in a new session, which records
+        the results in the store. Cancelling a running job sends SIGTERM to its worker, which
+        reclaims the running tool. A worker dying without a final state is re-queued up to
+        max_attempts, e.g., killed by the OOM killer.
+
+        Queued jobs are ordered by a JobScheduler (see flow/scheduler.py), by default by the user
+        priority, then shortest expected job first, with aging so that long jobs do not starve.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        db_path: str,
+        max_workers: int = 4,
+        interval: float = 1,
+        max_attempts: int = 2,
+        policy: str = 'priority',
+        aging: float = 1.0,
+    ) -> None:
+        self.socket_path = socket_path
+        self.store = JobStore(db_path)
+        self.max_workers = max_workers
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.scheduler = JobScheduler(policy, aging=aging)
+        self.cost_model = CostModel()
+        # job id -> expected runtime, estimated once per job
+        self.costs = dict()
+        self.log_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), 'workers')
+        mkdir(self.log_dir)
+
+        # job id -> worker Popen, or (pid, start) of a worker re-attached after a restart
+        self.workers = dict()
+        self.cancelling = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.server = None
+
+    def handle_request(self, request: dict) -> dict:
+        op = request.get('op')
+        if op == 'submit':
+            job_id = self.store.submit(
+                request['kind'],
+                request['payload'],
+                priority=request.get('priority', 0),
+                owner=request.get('owner'),
+            )
+            info("job %d submitted (%s)" % (job_id, request['kind']))
+            self.wakeup.set()
+            return {'ok': True, 'job_id': job_id}
+        elif op == 'status':
+            job = self.store.get(request['job_id'])
+            if job is None:
+                return {'ok': False, 'error': 'job %s not found' % request['job_id']}
+            return {'ok': True, 'job': job}
+        elif op == 'list':
+            return {'ok': True, 'jobs': self.store.list(request.get('state'))}
+        elif op == 'cancel':
+            state = self.store.cancel(request['job_id'])
+            self.wakeup.set()
+            return {'ok': state is not None, 'state': state}
+        elif op == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        return {'ok': False, 'error': 'unknown op %s' % op}
+
+    def recover(self) -> None:
+        """
+            Re-attach to workers which survived the previous server, re-queue the other running jobs.
+        """
+        for job in self.store.list(RUNNING):
+            worker = (job['worker_pid'], job['worker_start'])
+            # the pid alone may be another process after a reboot or once reused
+            if job['worker_pid'] and self.is_worker_alive(worker):
+                info("job %d: re-attach to worker %d" % (job['id'], job['worker_pid']))
+                self.workers[job['id']] = worker
+            else:
+                info("job %d: worker is gone, re-queue" % job['id'])
+                self.store.requeue(job['id'])
+
+    def launch(self, job: dict) -> None:
+        log_path = os.path.join(self.log_dir, 'job-%d.log' % job['id'])
+        with open(log_path, 'ab') as log:
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'server.worker', '--db', self.store.db_path, '--job-id', str(job['id'])],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')]))),
+                # outlives the server, see recover()
+                start_new_session=True,
+            )
+        self.store.set_worker(job['id'], process.pid, get_process_start(process.pid))
+        self.workers[job['id']] = process
+        info("job %d: started worker %d" % (job['id'], process.pid))
+
+    def is_worker_alive(self, worker) -> bool:
+        if isinstance(worker, subprocess.Popen):
+            return worker.poll() is None
+        pid, start = worker
+        return pid_alive(pid) and get_process_start(pid) == start
+
+    def get_worker_pid(self, worker) -> int:
+        return worker.pid if isinstance(worker, subprocess.Popen) else worker[0]
+
+    def reap(self) -> None:
+        """
+            Forget finished workers, a worker gone without a final state is re-queued or failed.
+        """
+        for job_id, worker in list(self.workers.items()):
+            if self.is_worker_alive(worker):
+                continue
+            del self.workers[job_id]
+            self.cancelling.discard(job_id)
+            job = self.store.get(job_id)
+            if job['state'] != RUNNING:
+                info("job %d: %s" % (job_id, job['state']))
+                # a cache hit tells nothing about the runtime of the flow
+                if job['state'] == DONE and not job['cache_hit']:
+                    self.cost_model.observe(job['kind'], self.get_cost(job), job['finished'] - job['started'])
+                self.costs.pop(job_id, None)
+                continue
+            if job['cancel_requested']:
+                self.store.finish(job_id, CANCELLED, error='cancelled')
+            elif job['attempts'] >= self.max_attempts:
+                self.store.finish(job_id, FAILED, error='worker %d exited without results' % self.get_worker_pid(worker))
+                warn("job %d: worker exited without results" % job_id)
+            else:
+                self.store.requeue(job_id)
+                warn("job %d: worker exited without results, re-queue" % job_id)
+
+    def signal_cancelled(self) -> None:
+        for job in self.store.list(RUNNING):
+            if job['cancel_requested'] and job['id'] in self.workers and job['id'] not in self.cancelling:
+                info("job %d: cancel worker" % job['id'])
+                try:
+                    os.kill(self.get_worker_pid(self.workers[job['id']]), signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+                self.cancelling.add(job['id'])
+
+    def get_cost(self, job: dict) -> float:
+        if job['id'] not in self.costs:
+            payload = job['payload']
+            self.costs[job['id']] = self.cost_model.estimate(
+                get_flow_class(job['kind']),
+                payload.get('design_config', dict()),
+                payload.get('syn_options', dict()),
+                payload.get('pnr_options', dict()),
+                area=payload.get('area'),
+            )
+        return self.costs[job['id']]
+
+    def rank_queued(self) -> list:
+        """
+            Return the ids of the queued jobs in the order they should run.
+        """
+        jobs = self.store.list(QUEUED)
+        return self.scheduler.rank(
+            [job['id'] for job in jobs],
+            [self.get_cost(job) for job in jobs],
+            [job['priority'] for job in jobs],
+            [job['submitted'] for job in jobs],
+        )
+
+    def dispatch(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                with self.lock:
+                    self.reap()
+                    self.signal_cancelled()
+                    if len(self.workers) < self.max_workers:
+                        for job_id in self.rank_queued():
+                            if len(self.workers) >= self.max_workers:
+                                break
+                            # None if cancelled in the meantime
+                            job = self.store.claim(job_id)
+                            if job is not None:
+                                self.launch(job)
+            except Exception as e:
+                # e.g. the database is locked for too long, retry on the next round
+                warn("dispatcher: %s" % repr(e))
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+    def remove_socket(self) -> None:
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def serve_forever(self) -> None:
+        """
+            Serve until shutdown() or SIGTERM. Running workers are left running, and re-attached on restart.
+        """
+        self.recover()
+        self.remove_socket()
+        mkdir(os.path.dirname(os.path.abspath(self.socket_path)))
+        self.server = UnixServer(self.socket_path, RequestHandler)
+        self.server.job_server = self
+
+        dispatcher = threading.Thread(target=self.dispatch, name='dispatcher', daemon=True)
+        dispatcher.start()
+        info("job server listening on %s" % self.socket_path)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.stopped.set()
+            self.wakeup.set()
+            dispatcher.join()
+            self.server.server_close()
+            self.remove_socket()
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+
@@ -0,0 +1,168 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import sqlite3
+from contextlib import closing
+from utils import mkdir, timestamp
+
+
+# job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    owner TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    submitted REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    worker_pid INTEGER,
+    worker_start TEXT,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    results TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority, id);
+"""
+
+
+class JobStore(object):
+    """
+        Durable job queue and results in a SQLite database, shared by the server and its workers.
+        Every call opens its own connection, so the store is safe across threads and processes.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = os.path.abspath(db_path)
+        mkdir(os.path.dirname(os.path.abspath(db_path)))
+        with closing(self.connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            # databases of earlier servers
+            columns = [row['name'] for row in conn.execute('PRAGMA table_info(jobs)')]
+            if 'worker_start' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN worker_start TEXT')
+            if 'cache_hit' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN cache_hit INTEGER NOT NULL DEFAULT 0')
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def to_job(self, row: sqlite3.Row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['results'] = json.loads(job['results']) if job['results'] is not None else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['cache_hit'] = bool(job['cache_hit'])
+        return job
+
+    def submit(self, kind: str, payload: dict, priority: int = 0, owner: str = None) -> int:
+        with closing(self.connect()) as conn:
+            cursor = conn.execute(
+                'INSERT INTO jobs (kind, payload, owner, priority, state, submitted) VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, json.dumps(payload), owner, priority, QUEUED, timestamp()),
+            )
+            return cursor.lastrowid
+
+    def get(self, job_id: int) -> dict:
+        with closing(self.connect()) as conn:
+            return self.to_job(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+    def list(self, state: str = None) -> list:
+        with closing(self.connect()) as conn:
+            if state is None:
+                rows = conn.execute('SELECT * FROM jobs ORDER BY id').fetchall()
+            else:
+                rows = conn.execute('SELECT * FROM jobs WHERE state = ? ORDER BY id', (state,)).fetchall()
+            return [self.to_job(row) for row in rows]
+
+    def claim(self, job_id: int = None) -> dict:
+        """
+            Atomically move a queued job to running, by default the next one (highest priority, then oldest).
+            Return the job, or None if the queue is empty or the job is no longer queued.
+        """
+        with closing(self.connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if job_id is None:
+                    row = conn.execute(
+                        'SELECT * FROM jobs WHERE state = ? ORDER BY priority DESC, id LIMIT 1', (QUEUED,)
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        'SELECT * FROM jobs WHERE id = ? AND state = ?', (job_id, QUEUED)
+                    ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        'UPDATE jobs SET state = ?, started = ?, attempts = attempts + 1 WHERE id = ?',
+                        (RUNNING, timestamp(), row['id']),
+                    )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return self.get(row['id']) if row is not None else None
+
+    def set_worker(self, job_id: int, worker_pid: int, worker_start: str = None) -> None:
+        """
+            Record the worker of a job, worker_start tells it from a later process with the same pid, see get_process_start.
+        """
+        with closing(self.connect()) as conn:
+            conn.execute('UPDATE jobs SET worker_pid = ?, worker_start = ? WHERE id = ?', (worker_pid, worker_start, job_id))
+
+    def finish(self, job_id: int, state: str, results: dict = None, error: str = None, cache_hit: bool = False) -> None:
+        """
+            Record the final state of a running job, a job finished elsewhere is left untouched.
+            cache_hit tells results loaded from the flow result cache, which the cost model does not learn from.
+        """
+        assert state in FINAL_STATES
+        with closing(self.connect()) as conn:
+            conn.execute(
+                'UPDATE jobs SET state = ?, finished = ?, results = ?, error = ?, cache_hit = ? WHERE id = ? AND state = ?',
+                (state, timestamp(), json.dumps(results, default=str) if results is not None else None, error,
+                 int(cache_hit), job_id, RUNNING),
+            )
+
+    def requeue(self, job_id: int) -> None:
+        with closing(self.connect()) as conn:
+            conn.execute(
+                'UPDATE jobs SET state = ?, started = NULL, worker_pid = NULL, worker_start = NULL WHERE id = ? AND state = ?',
+                (QUEUED, job_id, RUNNING),
+            )
+
+    def cancel(self, job_id: int) -> str:
+        """
+            Cancel a queued job right away, or flag a running job for its worker to be stopped.
+            Return the state of the job afterwards, None if it does not exist.
+        """
+        with closing(self.connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    'UPDATE jobs SET state = ?, finished = ? WHERE id = ? AND state = ?',
+                    (CANCELLED, timestamp(), job_id, QUEUED),
+                )
+                conn.execute('UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state = ?', (job_id, RUNNING))
+                row = conn.execute('SELECT state FROM jobs WHERE id = ?', (job_id,)).fetchone()
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return row['state'] if row is not None else None
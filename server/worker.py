@@ -0,0 +1,93 @@
+"""
+    Job worker, started by the JobServer as a detached process per job:
+
+        python -m server.worker --db DB --job-id ID
+
+    The worker runs the job and records its results in the store itself,
+    so a job outlives a restart of the server.
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import signal
+import argparse
+import traceback
+from utils import info
+from .store import JobStore, DONE, FAILED, CANCELLED
+
+
+class JobCancelled(BaseException):
+    """
+        Raised in the worker on SIGTERM, unwinds through routine_check which reclaims the running tool.
+    """
+    pass
+
+
+def get_flow_class(kind: str) -> type:
+    # import lazily, so a worker only loads the flow it runs
+    if kind == 'yosys_openroad':
+        from flow import YosysOpenroadFlow
+        return YosysOpenroadFlow
+    elif kind == 'genus_innovus':
+        from flow import GenusInnovusFlow
+        return GenusInnovusFlow
+    return None
+
+
+def run_job(kind: str, payload: dict) -> tuple:
+    """
+        Run a job and return its results, and whether they were loaded from the flow result cache.
+
+        Flow jobs ('yosys_openroad', 'genus_innovus') take the arguments of the flow:
+            {'design_config', 'tech_config', 'syn_options', 'pnr_options', 'rundir', 'flow_kwargs'}.
+        Manager jobs ('chipyard') take {'configs'}, the manager configs.
+    """
+    flow_class = get_flow_class(kind)
+    if flow_class is not None:
+        flow = flow_class(
+            payload['design_config'],
+            payload['tech_config'],
+            payload.get('syn_options', dict()),
+            payload.get('pnr_options', dict()),
+            payload['rundir'],
+            **payload.get('flow_kwargs', dict()),
+        )
+        results = flow.run()
+        return results, flow.cache_hit
+
+    elif kind == 'chipyard':
+        from manager.chipyard import ChipyardManager
+        return ChipyardManager(payload['configs']).run(), False
+
+    raise NotImplementedError("job kind %s is not supported" % kind)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--job-id', type=int, required=True)
+    args = parser.parse_args()
+
+    def on_terminate(signum, frame):
+        raise JobCancelled
+
+    signal.signal(signal.SIGTERM, on_terminate)
+
+    store = JobStore(args.db)
+    job = store.get(args.job_id)
+    info("worker %d: run job %d (%s)" % (os.getpid(), job['id'], job['kind']))
+    try:
+        results, cache_hit = run_job(job['kind'], job['payload'])
+    except JobCancelled:
+        store.finish(job['id'], CANCELLED, error='cancelled')
+        sys.exit(1)
+    except Exception as e:
+        traceback.print_exc()
+        store.finish(job['id'], FAILED, error=repr(e))
+        sys.exit(1)
+    store.finish(job['id'], DONE, results=results, cache_hit=cache_hit)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+    A local stand-in of a batch scheduler CLI, for testing BatchQueueExecutor without a farm.
+
+    Usage:
+        python fake_queue.py submit --queue-dir DIR [--output FILE] SCRIPT    # prints the job id
+        python fake_queue.py poll --queue-dir DIR JOB_ID                     # prints RUNNING, or nothing once gone
+        python fake_queue.py cancel --queue-dir DIR [--kill-wait SEC] JOB_ID
+
+    Jobs run detached on the local host, their state lives in DIR. Only the standard library
+    is used, so the script runs with any interpreter.
+"""
+import os
+import time
+import fcntl
+import signal
+import argparse
+import subprocess
+
+
+def get_pid_path(queue_dir: str, job_id: str) -> str:
+    return os.path.join(queue_dir, '%s.pid' % job_id)
+
+
+def next_job_id(queue_dir: str) -> str:
+    counter_path = os.path.join(queue_dir, 'counter')
+    with open(counter_path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        job_id = int(f.read() or 0) + 1
+        f.seek(0)
+        f.truncate()
+        f.write(str(job_id))
+    return str(job_id)
+
+
+def read_pid(queue_dir: str, job_id: str):
+    try:
+        with open(get_pid_path(queue_dir, job_id), 'r') as f:
+            return int(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # an exited but unreaped job is gone as well
+    try:
+        with open('/proc/%d/stat' % pid, 'r') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (FileNotFoundError, IndexError):
+        return True
+
+
+def submit(args) -> None:
+    job_id = next_job_id(args.queue_dir)
+    output = open(args.output or os.devnull, 'ab')
+    process = subprocess.Popen(
+        ['/bin/bash', args.script],
+        stdin=subprocess.DEVNULL,
+        stdout=output,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+    )
+    with open(get_pid_path(args.queue_dir, job_id), 'w') as f:
+        f.write(str(process.pid))
+    print(job_id)
+
+
+def poll(args) -> None:
+    pid = read_pid(args.queue_dir, args.job_id)
+    if pid is not None and is_running(pid):
+        print('RUNNING')
+
+
+def cancel(args) -> None:
+    pid = read_pid(args.queue_dir, args.job_id)
+    if pid is None:
+        return
+    try:
+        os.killpg(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    deadline = time.time() + args.kill_wait
+    while time.time() < deadline and is_running(pid):
+        time.sleep(0.1)
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    submit_parser = subparsers.add_parser('submit')
+    submit_parser.add_argument('--queue-dir', required=True)
+    submit_parser.add_argument('--output', default=None)
+    submit_parser.add_argument('script')
+    submit_parser.set_defaults(func=submit)
+
+    poll_parser = subparsers.add_parser('poll')
+    poll_parser.add_argument('--queue-dir', required=True)
+    poll_parser.add_argument('job_id')
+    poll_parser.set_defaults(func=poll)
+
+    cancel_parser = subparsers.add_parser('cancel')
+    cancel_parser.add_argument('--queue-dir', required=True)
+    cancel_parser.add_argument('--kill-wait', type=float, default=10)
+    cancel_parser.add_argument('job_id')
+    cancel_parser.set_defaults(func=cancel)
+
+    args = parser.parse_args()
+    os.makedirs(args.queue_dir, exist_ok=True)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
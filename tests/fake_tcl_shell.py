@@ -0,0 +1,258 @@
+"""
+    Scripted stand-in for the interactive Tcl shell of an EDA tool (genus, innovus),
+    to exercise ToolSession and the managers without the tools:
+
+        python fake_tcl_shell.py [-file SCRIPT | SCRIPT] [-log LOG] [-abort_on_error] [other tool options]
+
+    It understands a small subset of Tcl: set, puts, flush, cd, source, catch, error, exit and after,
+    with "..." and {...} quoting, $var and [cmd] substitution, and `yosys cmd ...` of yosys -C. Any other command is accepted and does
+    nothing, except that its output redirection, `cmd ... > path`, creates path as the reports and
+    netlists of the real tools do. FAKE_TCL_STARTUP_S delays the prompt, like a tool start-up and
+    license checkout.
+"""
+import os
+import re
+import sys
+import time
+
+VARIABLE_REGEX = re.compile(r'\$(\{[^}]*\}|[A-Za-z0-9_:]+)')
+
+
+class TclError(Exception):
+    pass
+
+
+class TclExit(Exception):
+    def __init__(self, code: int) -> None:
+        Exception.__init__(self, code)
+        self.code = code
+
+
+class FakeTclShell(object):
+
+    def __init__(self, log_path: str = None) -> None:
+        self.vars = dict()
+        self.log = open(log_path, 'w') if log_path else None
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        if self.log:
+            self.log.write(text)
+            self.log.flush()
+
+    def match(self, script: str, i: int, open_char: str, close_char: str) -> int:
+        """
+            Index of the bracket closing the one at i.
+        """
+        depth = 0
+        while i < len(script):
+            if script[i] == '\\':
+                i += 1
+            elif script[i] == open_char:
+                depth += 1
+            elif script[i] == close_char:
+                depth -= 1
+                if depth == 0:
+                    return i
+            i += 1
+        raise TclError('missing close-%s' % ('brace' if open_char == '{' else 'bracket'))
+
+    def parse(self, script: str):
+        """
+            Yield the words of each command, as (substitute, text) pairs.
+        """
+        i, n = 0, len(script)
+        while i < n:
+            while i < n and script[i] in ' \t\r\n;':
+                i += 1
+            if i < n and script[i] == '#':
+                while i < n and script[i] != '\n':
+                    i += 1
+                continue
+            words = []
+            while i < n and script[i] not in '\n;':
+                if script[i] in ' \t\r':
+                    i += 1
+                elif script[i] == '\\' and i + 1 < n and script[i + 1] == '\n':
+                    i += 2
+                elif script[i] == '{':
+                    j = self.match(script, i, '{', '}')
+                    words.append((False, script[i + 1:j]))
+                    i = j + 1
+                elif script[i] == '"':
+                    j = i + 1
+                    while j < n and script[j] != '"':
+                        if script[j] == '\\':
+                            j += 1
+                        elif script[j] == '[':
+                            j = self.match(script, j, '[', ']')
+                        j += 1
+                    words.append((True, script[i + 1:j]))
+                    i = j + 1
+                else:
+                    j = i
+                    while j < n and script[j] not in ' \t\r\n;':
+                        if script[j] == '\\':
+                            j += 1
+                        elif script[j] == '[':
+                            j = self.match(script, j, '[', ']')
+                        j += 1
+                    words.append((True, script[i:j]))
+                    i = j
+            if words:
+                yield words
+
+    def substitute(self, text: str) -> str:
+        result = []
+        i = 0
+        while i < len(text):
+            if text[i] == '\\' and i + 1 < len(text):
+                result.append({'n': '\n', 't': '\t'}.get(text[i + 1], text[i + 1]))
+                i += 2
+            elif text[i] == '$':
+                match = VARIABLE_REGEX.match(text, i)
+                if match is None:
+                    result.append('$')
+                    i += 1
+                    continue
+                name = match.group(1).strip('{}')
+                if name not in self.vars:
+                    raise TclError('can\'t read "%s": no such variable' % name)
+                result.append(self.vars[name])
+                i = match.end()
+            elif text[i] == '[':
+                j = self.match(text, i, '[', ']')
+                result.append(self.eval(text[i + 1:j]))
+                i = j + 1
+            else:
+                result.append(text[i])
+                i += 1
+        return ''.join(result)
+
+    def eval(self, script: str) -> str:
+        result = ''
+        for words in self.parse(script):
+            words = [self.substitute(text) if substitute else text for substitute, text in words]
+            result = self.call(words[0], words[1:])
+        return result
+
+    def call(self, name: str, args: list) -> str:
+        redirect = None
+        if '>' in args:
+            index = args.index('>')
+            redirect = args[index + 1] if index + 1 < len(args) else None
+            args = args[:index]
+
+        handler = getattr(self, 'cmd_%s' % name, None)
+        try:
+            result = handler(*args) if handler is not None else ''
+            if redirect:
+                with open(redirect, 'w') as f:
+                    f.write('%s %s\n' % (name, ' '.join(args)))
+        except (OSError, TypeError) as e:
+            # e.g. a missing file or wrong arguments
+            raise TclError('%s: %s' % (name, e))
+        return result
+
+    def cmd_set(self, name: str, value: str = None) -> str:
+        if value is not None:
+            self.vars[name] = value
+        if name not in self.vars:
+            raise TclError('can\'t read "%s": no such variable' % name)
+        return self.vars[name]
+
+    def cmd_puts(self, *args) -> str:
+        newline = '\n'
+        if args and args[0] == '-nonewline':
+            newline = ''
+            args = args[1:]
+        self.write(args[-1] + newline)
+        return ''
+
+    def cmd_flush(self, *args) -> str:
+        sys.stdout.flush()
+        return ''
+
+    def cmd_cd(self, path: str) -> str:
+        os.chdir(path)
+        return ''
+
+    def cmd_source(self, path: str) -> str:
+        with open(path, 'r') as f:
+            return self.eval(f.read())
+
+    def cmd_catch(self, script: str, var: str = None) -> str:
+        try:
+            result, code = self.eval(script), '0'
+        except TclError as e:
+            result, code = str(e), '1'
+        if var is not None:
+            self.vars[var] = result
+        return code
+
+    def cmd_error(self, message: str) -> str:
+        raise TclError(message)
+
+    def cmd_exit(self, code: str = '0') -> str:
+        raise TclExit(int(code))
+
+    def cmd_after(self, ms: str) -> str:
+        time.sleep(int(ms) / 1000.0)
+        return ''
+
+    def cmd_yosys(self, name: str, *args) -> str:
+        return self.call(name, list(args))
+
+
+def is_complete(script: str) -> bool:
+    depth = 0
+    i = 0
+    while i < len(script):
+        if script[i] == '\\':
+            i += 1
+        elif script[i] in '{[':
+            depth += 1
+        elif script[i] in '}]':
+            depth -= 1
+        i += 1
+    return depth <= 0 and not script.endswith('\\\n')
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    get_option = lambda option: args[args.index(option) + 1] if option in args[:-1] else None
+    abort_on_error = '-abort_on_error' in args
+
+    shell = FakeTclShell(get_option('-log'))
+    time.sleep(float(os.environ.get('FAKE_TCL_STARTUP_S', 0)))
+    shell.write("fake tcl shell %d\n" % os.getpid())
+
+    def run(script: str) -> None:
+        try:
+            shell.eval(script)
+        except TclError as e:
+            shell.write("Error : %s\n" % e)
+            if abort_on_error:
+                sys.exit(1)
+        except TclExit as e:
+            sys.exit(e.code)
+
+    # genus -file script, or openroad script
+    scripts = [arg for i, arg in enumerate(args) if not arg.startswith('-') and (i == 0 or args[i - 1] not in ('-file', '-log'))]
+    for script in [get_option('-file')] + scripts:
+        if script:
+            run('source {%s}' % script)
+
+    # interactive, a command may span several lines
+    buffer = ''
+    for line in sys.stdin:
+        buffer += line
+        if is_complete(buffer):
+            run(buffer)
+            buffer = ''
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import RoutineCheckError
+from flow import BatchEvaluator, GenusInnovusFlow
+
+
+def test_fanout_cached_failure_fails_only_its_point(tmp_path):
+    """
+        A cached deterministic failure of one point must not abort the other points of a fanout batch.
+    """
+    cache_dir = str(tmp_path / 'cache')
+    design_config = {'top_module': 'top'}
+    points = [
+        (design_config, {'clk_period_ns': 1.0}, {}),
+        (design_config, {'clk_period_ns': 2.0}, {}),
+    ]
+    failed = GenusInnovusFlow(design_config, {}, points[0][1], points[0][2], str(tmp_path / 'a'), cache_dir=cache_dir)
+    failed.store_failure(RoutineCheckError(1))
+    cached = GenusInnovusFlow(design_config, {}, points[1][1], points[1][2], str(tmp_path / 'b'), cache_dir=cache_dir)
+    cached.results = {'Post-Syn Area': 1.0}
+    cached.store_cache()
+
+    evaluator = BatchEvaluator(GenusInnovusFlow, {}, str(tmp_path / 'batch'), fanout=True, cache_dir=cache_dir)
+    records = sorted(evaluator.run(points), key=lambda record: record['index'])
+
+    assert len(records) == 2
+    assert records[0]['results'] is None
+    assert 'CachedFailureError' in records[0]['error']
+    assert records[1]['results'] == {'Post-Syn Area': 1.0}
+    assert records[1]['error'] is None
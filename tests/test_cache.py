@@ -0,0 +1,22 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flow.cache import FlowResultCache
+
+
+def test_runtime_configs_do_not_change_the_key(tmp_path):
+    cache = FlowResultCache(str(tmp_path / 'cache'))
+    configs = {'genus': {'top_module': 'top', 'clk_period_ns': 1.0}, 'innovus': {'place_utilization': 0.5}}
+    runtime = {
+        'rundir': str(tmp_path / 'run'),
+        'license_slots': {'innovus': 2},
+        'retry': {'max_retries': 3},
+        'kill_grace': 30,
+        'executor': {'type': 'slurm'},
+        'sessions': 2,
+        'resume': False,
+    }
+    key = cache.get_key(configs)
+    assert cache.get_key({stage: dict(stage_configs, **runtime) for stage, stage_configs in configs.items()}) == key
+    assert cache.get_key(dict(configs, innovus={'place_utilization': 0.6})) != key
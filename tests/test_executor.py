@@ -0,0 +1,69 @@
+import os
+import sys
+import shlex
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import CancelToken
+from manager.common import BatchQueueExecutor
+
+FAKE_QUEUE = '%s %s' % (shlex.quote(sys.executable), shlex.quote(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_queue.py')))
+
+
+def create_executor(tmp_path, **kwargs) -> BatchQueueExecutor:
+    queue_dir = shlex.quote(str(tmp_path / 'queue'))
+    return BatchQueueExecutor(
+        str(tmp_path / 'jobs'),
+        submit='%s submit --queue-dir %s --output {output} {script}' % (FAKE_QUEUE, queue_dir),
+        poll='%s poll --queue-dir %s {job_id}' % (FAKE_QUEUE, queue_dir),
+        cancel='%s cancel --queue-dir %s --kill-wait 1 {job_id}' % (FAKE_QUEUE, queue_dir),
+        poll_interval=0.1,
+        **kwargs,
+    )
+
+
+def test_submit_and_poll(tmp_path):
+    executor = create_executor(tmp_path)
+    marker = str(tmp_path / 'marker')
+    job = executor.launch('echo hello > %s' % shlex.quote(marker), 'echo')
+    assert job.job_id == '1'
+    assert job.wait(30)
+    assert job.returncode == 0
+    with open(marker, 'r') as f:
+        assert f.read() == 'hello\n'
+    assert job.get_usage()['returncode'] == 0
+
+    job = executor.launch('exit 3', 'fail')
+    assert job.job_id == '2'
+    assert job.wait(30)
+    assert job.returncode == 3
+
+
+def test_wait_times_out_and_cancel_stops_the_job(tmp_path):
+    executor = create_executor(tmp_path)
+    marker = str(tmp_path / 'marker')
+    job = executor.launch('sleep 30; touch %s' % shlex.quote(marker), 'sleep')
+    assert not job.wait(0.5)
+    assert job.returncode is None
+
+    job.kill(grace=10)
+    # killed before it recorded an exit code
+    assert job.returncode == -1
+    assert not os.path.exists(marker)
+
+
+def test_wait_wakes_up_on_cancel_token(tmp_path):
+    executor = create_executor(tmp_path)
+    job = executor.launch('sleep 30', 'sleep')
+    token = CancelToken()
+    token.cancel()
+    assert not job.wait(30, [token])
+    job.kill(grace=10)
+
+
+def test_job_lost_by_the_queue_fails(tmp_path):
+    executor = create_executor(tmp_path)
+    # a job which left the queue without an exit code, e.g., purged after a node failure
+    executor.commands['poll'] = 'true'
+    job = executor.launch('sleep 1', 'lost')
+    assert job.wait(30)
+    assert job.returncode == -1
@@ -0,0 +1,96 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from utils import RoutineCancelledError
+from manager.innovus import InnovusManager
+from manager.innovus.innovus_manager import DEFAULT_STEPS
+
+
+def get_configs(tmp_path) -> dict:
+    return {
+        'rundir': str(tmp_path / 'innovus-rundir'),
+        'top_module': 'top',
+        'runmode': 'normal',
+        'stripe_width': 0.1,
+        'stripe_spacing': 0.1,
+        'stripe_distance': 10.0,
+    }
+
+
+def finish_steps(manager: InnovusManager, steps: list) -> None:
+    """
+        Pretend the steps ran: write their checkpoints and reports, and commit their fingerprints.
+    """
+    for step in steps:
+        checkpoint = os.path.join(manager.data_dir, '%s.enc' % step)
+        for path in [checkpoint, checkpoint + '.dat'] + manager.get_step_reports(step):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(step)
+        manager.fingerprints.commit(step)
+
+
+def test_resumed_placement_is_pruned_before_cts(tmp_path, monkeypatch):
+    """
+        A fresh placement skipped by the resume must still reach the step callbacks,
+        so that a dominated point does not run cts and routing again.
+    """
+    manager = InnovusManager(get_configs(tmp_path))
+    manager.generate_scripts()
+    finish_steps(manager, DEFAULT_STEPS[:DEFAULT_STEPS.index('placement') + 1])
+
+    launched = []
+    monkeypatch.setattr(InnovusManager, 'run_tcl_script', lambda self, step_name, **kwargs: launched.append(step_name))
+    finished = []
+
+    def prune(innovus_manager, step_name):
+        finished.append(step_name)
+        if step_name == 'placement':
+            innovus_manager.cancel()
+
+    manager = InnovusManager(get_configs(tmp_path))
+    manager.add_step_callback(prune)
+    with pytest.raises(RoutineCancelledError):
+        manager.run_impl()
+
+    assert manager.resumed_steps == ['init', 'floorplan', 'powerplan', 'placement']
+    assert finished == ['init', 'floorplan', 'powerplan', 'placement']
+    assert launched == []
+
+
+def test_resumed_step_without_reports_is_not_passed_to_callbacks(tmp_path, monkeypatch):
+    manager = InnovusManager(get_configs(tmp_path))
+    manager.generate_scripts()
+    finish_steps(manager, DEFAULT_STEPS[:DEFAULT_STEPS.index('placement') + 1])
+    os.remove(manager.get_step_reports('placement')[0])
+
+    launched = []
+    monkeypatch.setattr(InnovusManager, 'run_tcl_script', lambda self, step_name, **kwargs: launched.append(step_name))
+    finished = []
+
+    manager = InnovusManager(get_configs(tmp_path))
+    manager.add_step_callback(lambda innovus_manager, step_name: finished.append(step_name))
+    manager.run_impl()
+
+    assert finished == ['init', 'floorplan', 'powerplan', 'cts', 'routing']
+    assert launched == ['cts', 'routing']
+
+
+def test_replaced_tech_file_invalidates_the_first_step(tmp_path):
+    """
+        The scripts only hold the paths of the libraries and LEF files, their contents must be fingerprinted.
+    """
+    lef_path = str(tmp_path / 'tech.lef')
+    with open(lef_path, 'w') as f:
+        f.write('VERSION 5.8 ;\n')
+    configs = dict(get_configs(tmp_path), lef_files=[lef_path])
+    manager = InnovusManager(configs)
+    manager.generate_scripts()
+    finish_steps(manager, DEFAULT_STEPS)
+    assert InnovusManager(configs).generate_scripts() == []
+
+    with open(lef_path, 'w') as f:
+        f.write('VERSION 5.8 ;\nSITE coreSite ;\n')
+    assert [script['step_name'] for script in InnovusManager(configs).generate_scripts()] == DEFAULT_STEPS
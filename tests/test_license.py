@@ -0,0 +1,125 @@
+import os
+import sys
+import signal
+import asyncio
+import threading
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager.common import BaseManager
+from manager.common.license_pool import LicensePool
+
+
+class LicensedManager(BaseManager):
+
+    @property
+    def name(self) -> str:
+        return 'licensed'
+
+    @property
+    def license_tool(self) -> str:
+        return 'tool'
+
+    def run_impl(self) -> None:
+        pass
+
+    def generate_output_impl(self) -> dict:
+        return dict()
+
+
+def test_cancelled_license_wait_releases_late_slot(tmp_path):
+    """
+        A slot acquired by the waiting thread after the check was cancelled must not stay held.
+    """
+    lock_dir = str(tmp_path / 'licenses')
+    manager = LicensedManager({
+        'rundir': str(tmp_path / 'run'),
+        'license_slots': {'tool': 1},
+        'license_lock_dir': lock_dir,
+    })
+    pool = LicensePool({'tool': 1}, lock_dir, interval=0.05)
+    held = pool.acquire('tool')
+
+    async def cancel_waiting():
+        task = asyncio.ensure_future(manager.acquire_license_async())
+        await asyncio.sleep(0.3)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # the worker thread takes the slot once it is free
+        held.release()
+        await asyncio.sleep(2)
+
+    asyncio.run(cancel_waiting())
+
+    slot = pool.acquire('tool', timeout=5)
+    assert slot is not None
+    slot.release()
+
+
+def test_waiters_served_by_priority_then_arrival(tmp_path):
+    """
+        Once the slot is free, higher priority waiters go first, then waiters of equal priority in arrival order.
+    """
+    pool = LicensePool({'tool': 1}, str(tmp_path / 'licenses'), interval=0.02)
+    held = pool.acquire('tool')
+    served = []
+
+    def wait(name, priority):
+        slot = pool.acquire('tool', priority=priority, timeout=30)
+        served.append(name)
+        slot.release()
+
+    threads = []
+    for name, priority in [('first', 0), ('second', 0), ('urgent', 1), ('third', 0)]:
+        thread = threading.Thread(target=wait, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        # one ticket at a time, so that arrivals are ordered
+        while len(pool.read_queue('tool')) < len(threads):
+            threading.Event().wait(0.01)
+
+    held.release()
+    for thread in threads:
+        thread.join(30)
+    assert served == ['urgent', 'first', 'second', 'third']
+
+
+def test_slot_of_dead_holder_is_released(tmp_path):
+    """
+        A slot held by a process killed without releasing it becomes available again.
+    """
+    lock_dir = str(tmp_path / 'licenses')
+    holder = subprocess.Popen(
+        [sys.executable, '-c', (
+            'import sys, time\n'
+            'sys.path.append(%r)\n'
+            'from manager.common.license_pool import LicensePool\n'
+            'slot = LicensePool({"tool": 1}, %r).acquire("tool")\n'
+            'print("held", flush=True)\n'
+            'time.sleep(60)\n'
+        ) % (os.path.dirname(os.path.dirname(os.path.abspath(__file__))), lock_dir)],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        # skip the log lines of the holder
+        while holder.stdout.readline().strip() != b'held':
+            assert holder.poll() is None
+        pool = LicensePool({'tool': 1}, lock_dir, interval=0.02)
+        try:
+            pool.acquire('tool', timeout=0.2)
+            assert False, "the slot of a live holder was acquired"
+        except TimeoutError:
+            pass
+
+        holder.send_signal(signal.SIGKILL)
+        holder.wait(30)
+        slot = pool.acquire('tool', timeout=5)
+        assert slot is not None
+        slot.release()
+    finally:
+        if holder.poll() is None:
+            holder.kill()
+        holder.stdout.close()
@@ -0,0 +1,42 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager.common.log_watcher import LogWatch, LICENSE_PATTERNS
+
+PATTERNS = {'license': LICENSE_PATTERNS}
+
+
+def test_log_rewritten_in_place_is_read_from_the_start(tmp_path):
+    """
+        A log truncated and rewritten by the next attempt keeps its inode, and may have outgrown the old log
+        by the first poll, its first lines must still be read.
+    """
+    log_path = str(tmp_path / 'report.log')
+    with open(log_path, 'w') as f:
+        f.write('old run\n' * 10)
+    log_watch = LogWatch([log_path], PATTERNS)
+
+    inode = os.stat(log_path).st_ino
+    with open(log_path, 'w') as f:
+        f.write('**ERROR: license denied for Innovus_Impl_System\n')
+        f.write('new run\n' * 20)
+    assert os.stat(log_path).st_ino == inode
+
+    assert log_watch.poll()
+    assert log_watch.category == 'license'
+
+
+def test_log_appended_in_place_skips_the_old_contents(tmp_path):
+    log_path = str(tmp_path / 'report.log')
+    with open(log_path, 'w') as f:
+        f.write('**ERROR: license denied in an earlier run\n')
+    log_watch = LogWatch([log_path], PATTERNS)
+
+    with open(log_path, 'a') as f:
+        f.write('new run\n' * 20)
+    assert not log_watch.poll()
+
+    with open(log_path, 'a') as f:
+        f.write('could not check out a license\n')
+    assert log_watch.poll()
@@ -0,0 +1,49 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flow import MultiFidelityCampaign, YosysOpenroadFlow, CostModel
+
+
+class SpyCostModel(CostModel):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.observed = []
+
+    def observe(self, kind: str, estimated: float, elapsed: float) -> None:
+        self.observed.append(kind)
+
+
+def test_cached_place_and_route_is_not_run_again(tmp_path):
+    """
+        A campaign run again loads the place and route results of its points from the flow result cache,
+        and does not calibrate the cost model by them.
+    """
+    cache_dir = str(tmp_path / 'cache')
+    cost_model = SpyCostModel()
+    campaign = MultiFidelityCampaign({}, str(tmp_path / 'campaign'), max_workers=1, cost_model=cost_model,
+                                     cache_dir=cache_dir)
+    record = {
+        'index': 0,
+        'rundir': campaign.get_point_rundir(0),
+        'design_config': {'top_module': 'top'},
+        'syn_options': {},
+        'pnr_options': {},
+        'fidelity': 'syn',
+        'results': {'syn': {'delay': 100.0, 'area': 50.0}},
+        'errors': dict(),
+        'ranks': dict(),
+        # no netlist, the place and route would fail if it ran
+        'syn_output': {'verilog_file': str(tmp_path / 'missing.v'), 'delay': 100.0, 'area': 50.0},
+    }
+    tasks = campaign.get_pnr_tasks([record], 'fast', 'fast')
+    flow = YosysOpenroadFlow(record['design_config'], {}, {}, tasks[0][4][4], record['rundir'], cache_dir=cache_dir)
+    flow.results = {'post_syn_delay': 100.0, 'post_syn_area': 50.0, 'post_pnr_delay': 120.0, 'post_pnr_area': 60.0}
+    flow.store_cache()
+
+    campaign.run_fidelity(tasks)
+
+    assert record['errors'] == dict()
+    assert record['results']['fast'] == {'delay': 120.0, 'area': 60.0}
+    assert cost_model.observed == []
@@ -0,0 +1,59 @@
+import os
+import sys
+import pickle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager.common import ReportCache
+
+
+class LineParser(object):
+    version = 1
+    runs = 0
+
+    def __init__(self, report_path: str) -> None:
+        self.report_path = report_path
+
+    def run(self) -> list:
+        LineParser.runs += 1
+        with open(self.report_path, 'r') as f:
+            return [{'instance': line.split()[0], 'area': float(line.split()[1])} for line in f]
+
+
+class Exploit(object):
+
+    def __init__(self, marker: str) -> None:
+        self.marker = marker
+
+    def __reduce__(self):
+        return (open, (self.marker, 'w'))
+
+
+def write_report(tmp_path) -> str:
+    report_path = str(tmp_path / 'area.rpt')
+    with open(report_path, 'w') as f:
+        f.write('top 10.5\ntop/u0 4.0\n')
+    return report_path
+
+
+def test_sidecar_is_shared_between_caches(tmp_path):
+    report_path = write_report(tmp_path)
+    LineParser.runs = 0
+    result = ReportCache().get(LineParser, report_path)
+    assert ReportCache().get_row(LineParser, report_path, 'top/u0') == {'instance': 'top/u0', 'area': 4.0}
+    assert ReportCache().get(LineParser, report_path) == result
+    assert LineParser.runs == 1
+
+
+def test_pickled_sidecar_is_never_unpickled(tmp_path):
+    """
+        Rundirs are shared, a sidecar planted by another user must not run code.
+    """
+    report_path = write_report(tmp_path)
+    cache = ReportCache()
+    key = cache.get_key(LineParser, (), dict())
+    marker = str(tmp_path / 'exploited')
+    with open(cache.get_sidecar_path(report_path, key), 'wb') as f:
+        pickle.dump((key, cache.get_stamp(LineParser, report_path), Exploit(marker)), f)
+
+    assert cache.get(LineParser, report_path)[0] == {'instance': 'top', 'area': 10.5}
+    assert not os.path.exists(marker)
@@ -0,0 +1,132 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager.common import SessionExecutor, ToolSession, get_session_pool
+
+FAKE_TCL_SHELL = '%s %s' % (sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_tcl_shell.py'))
+
+
+def test_instant_job_returns_session_to_pool(tmp_path, monkeypatch):
+    """
+        A job finishing before submit returns, e.g., a short command of a fast tool,
+        must still hand its session back to the pool.
+    """
+    send = ToolSession.send
+
+    def send_and_wait(self, code):
+        # the tool answers before submit returns
+        send(self, code)
+        if self.job is not None:
+            self.job.done.wait(30)
+
+    monkeypatch.setattr(ToolSession, 'send', send_and_wait)
+
+    executor = SessionExecutor(FAKE_TCL_SHELL + ' -instant', str(tmp_path / 'log'), session_dir=str(tmp_path / 'sessions'))
+    job = executor.launch('set a 1', 'instant')
+    assert job.wait(30)
+    assert job.returncode == 0
+
+    pool = get_session_pool()
+    sessions = pool.idle.get(executor.key, [])
+    assert len(sessions) == 1 and sessions[0].alive
+    pool.close_all()
+
+
+def read(path) -> str:
+    with open(str(path), 'r') as f:
+        return f.read()
+
+
+def test_sentinel_frames_job_output(tmp_path):
+    """
+        A job ends on the sentinel of its session only: its whole output goes to its log,
+        a look-alike sentinel does not end it, and a Tcl error ends it with its message.
+    """
+    executor = SessionExecutor(FAKE_TCL_SHELL, str(tmp_path / 'log'), session_dir=str(tmp_path / 'sessions'))
+    job = executor.launch('puts first; puts "__SESSION_DONE_0__ 1 1 fake"; puts last', 'framed')
+    try:
+        assert job.wait(30)
+        assert job.returncode == 0
+        log = read(tmp_path / 'log' / 'framed')
+        # the start-up banner of the tool may come first
+        assert log.endswith('first\n__SESSION_DONE_0__ 1 1 fake\nlast\n')
+        assert job.session.sentinel not in log
+
+        job = executor.launch('error "no such design"', 'failed')
+        assert job.wait(30)
+        assert job.returncode == 1
+        assert read(tmp_path / 'log' / 'failed') == 'session: no such design\n'
+    finally:
+        get_session_pool().close_all()
+
+
+def test_failed_job_is_reset_and_session_reused(tmp_path):
+    """
+        The reset code runs after a failed job, the session stays clean and serves the next job.
+    """
+    executor = SessionExecutor(
+        FAKE_TCL_SHELL, str(tmp_path / 'log'), reset_code='set design none',
+        session_dir=str(tmp_path / 'sessions'),
+    )
+    job = executor.launch('set design top; error "placement failed"', 'failed')
+    try:
+        assert job.wait(30)
+        assert job.returncode == 1
+        session = job.session
+        assert session.clean
+
+        job = executor.launch('puts $design', 'next')
+        assert job.wait(30)
+        assert job.returncode == 0
+        assert job.session is session and session.jobs == 2
+        assert read(tmp_path / 'log' / 'next') == 'none\n'
+    finally:
+        get_session_pool().close_all()
+
+
+def test_failed_reset_falls_back_to_fresh_session(tmp_path):
+    """
+        A session whose reset fails is closed, the next job starts a fresh tool.
+    """
+    executor = SessionExecutor(
+        FAKE_TCL_SHELL, str(tmp_path / 'log'), reset_code='error "cannot reset"',
+        session_dir=str(tmp_path / 'sessions'),
+    )
+    job = executor.launch('set a 1', 'first')
+    try:
+        assert job.wait(30)
+        assert job.returncode == 0
+        session = job.session
+        assert not session.clean
+        assert session.exited.wait(30)
+        assert not get_session_pool().idle.get(executor.key)
+
+        job = executor.launch('set a 2', 'second')
+        assert job.wait(30)
+        assert job.returncode == 0
+        assert job.session is not session and job.session.jobs == 1
+    finally:
+        get_session_pool().close_all()
+
+
+def test_tool_exit_falls_back_to_fresh_session(tmp_path):
+    """
+        A tool dying in a job fails the job with its exit code, the next job starts a fresh tool.
+    """
+    executor = SessionExecutor(FAKE_TCL_SHELL, str(tmp_path / 'log'), session_dir=str(tmp_path / 'sessions'))
+    job = executor.launch('exit 3', 'crash')
+    try:
+        assert job.wait(30)
+        assert job.returncode == 3
+        assert 'tool exited with code 3' in read(tmp_path / 'log' / 'crash')
+        session = job.session
+        assert not session.alive
+
+        job = executor.launch('puts alive', 'next')
+        assert job.wait(30)
+        assert job.returncode == 0
+        assert job.session is not session
+        assert read(tmp_path / 'log' / 'next').endswith('alive\n')
+    finally:
+        get_session_pool().close_all()
@@ -1,2 +1,3 @@
 from .exceptions import *
-from .funcs import *
\ No newline at end of file
+from .funcs import *
+from .process import *
\ No newline at end of file
@@ -7,8 +7,38 @@ class NotFoundException(Exception):
         return self.msg
     
 class RoutineCheckError(Exception):
+    returncode = None
+    timed_out = False
+
+    def __init__(self, returncode=None, timed_out=False):
+        # keep the arguments, so the error survives pickling across worker processes
+        Exception.__init__(self, returncode, timed_out)
+        self.returncode = returncode
+        self.timed_out = timed_out
+        if timed_out:
+            self.msg = "Routine check timed out."
+        elif returncode is not None:
+            self.msg = "Routine check failed (exit code %d)." % returncode
+        else:
+            self.msg = "Routine check failed."
+
+    def __str__(self):
+        return self.msg
+
+class RoutineCancelledError(RoutineCheckError):
     def __init__(self):
-        self.msg = "Routine check failed."
+        self.msg = "Routine check cancelled."
 
     def __str__(self):
-        return self.msg
\ No newline at end of file
+        return self.msg
+
+class ToolFatalError(RoutineCheckError):
+    def __init__(self, category, line):
+        # keep the arguments, so the error survives pickling across worker processes
+        Exception.__init__(self, category, line)
+        self.category = category
+        self.line = line
+        self.msg = "Tool reported a fatal error (%s): %s" % (category, line)
+
+    def __str__(self):
+        return self.msg
@@ -3,6 +3,7 @@
 
 import os
 import sys
+import signal
 import shutil
 import yaml
 import json
@@ -212,6 +213,7 @@ class Timer(object):
 def execute(cmd: str, verbose: bool = True, wait: bool = True):
     """
     Executes a command in the shell and returns the process object.
+    The shell leads a new session, so the whole process tree can be signalled as a group.
 
     Args:
         cmd (str): The command to be executed.
@@ -224,8 +226,15 @@ def execute(cmd: str, verbose: bool = True, wait: bool = True):
     info("executing: {}".format(cmd))
     stdout = None if verbose else subprocess.PIPE
     stderr = None if verbose else subprocess.PIPE
-    process = subprocess.Popen(["/bin/bash", "-c", cmd], stdout=stdout, stderr=stderr)
-    if wait: process.wait()
+    process = subprocess.Popen(["/bin/bash", "-c", cmd], stdout=stdout, stderr=stderr, start_new_session=True)
+    if wait:
+        try:
+            process.wait()
+        except BaseException:
+            # the tree no longer receives terminal signals, e.g. Ctrl-C
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+            raise
     return process
 
 def init_worker():
@@ -267,4 +276,27 @@ def dump_json(context, path):
 # consistent hashing
 def create_hash(obj):
     hash_hex = hashlib.sha256(obj.encode('utf-8')).hexdigest()
-    return hash_hex
\ No newline at end of file
+    return hash_hex
+
+_file_digests = dict()
+
+def file_digest(path: str) -> str:
+    """
+    Compute the sha256 digest of a file's contents.
+    Digests are memoized per process, keyed by path, size and modification time.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_digests:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        _file_digests[key] = sha.hexdigest()
+    return _file_digests[key]
\ No newline at end of file
@@ -0,0 +1,331 @@
+# process.py
+# Helpers to wait on launched tool processes without sleep polling, and to reclaim their process trees.
+
+import os
+import signal
+import select
+import asyncio
+import threading
+import selectors
+import subprocess
+from typing import Callable
+from .funcs import timestamp
+
+
+class CancelToken(object):
+    """
+        Cancellation handle shared between a coordinator and the routines waiting on tools.
+        Cancelling makes the token readable, so every blocked waiter wakes up immediately.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+        self._read_fd, self._write_fd = os.pipe()
+
+    def __getstate__(self) -> dict:
+        # pipe descriptors and callbacks are meaningless in another process
+        return {'cancelled': self._cancelled}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+        if state.get('cancelled'):
+            self.cancel()
+
+    def __del__(self) -> None:
+        self.close()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled or self._write_fd is None:
+                return
+            self._cancelled = True
+            # the byte is never consumed, keeping the pipe readable for all waiters
+            os.write(self._write_fd, b'x')
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable) -> None:
+        """
+            Call callback() once the token is cancelled, immediately if it already is.
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def wait(self, timeout: float) -> bool:
+        """
+            Sleep up to timeout seconds, return True early if the token is cancelled.
+        """
+        if not self._cancelled:
+            select.select([self], [], [], timeout)
+        return self._cancelled
+
+    async def wait_async(self, timeout: float) -> bool:
+        """
+            Asyncio counterpart of wait.
+        """
+        loop = asyncio.get_running_loop()
+        cancelled = loop.create_future()
+
+        def on_cancel():
+            loop.call_soon_threadsafe(lambda: cancelled.done() or cancelled.set_result(None))
+
+        self.add_callback(on_cancel)
+        try:
+            await asyncio.wait({cancelled}, timeout=timeout)
+        finally:
+            self.remove_callback(on_cancel)
+            cancelled.cancel()
+        return self._cancelled
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in (self._read_fd, self._write_fd):
+                if fd is not None:
+                    os.close(fd)
+            self._read_fd, self._write_fd = None, None
+
+
+def open_pidfd(pid: int):
+    """
+        Open a file descriptor which becomes readable when the process exits.
+        Returns None if pidfd is not supported by the platform.
+    """
+    if not hasattr(os, 'pidfd_open'):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        return None
+
+
+def get_process_start(pid: int) -> str:
+    """
+        Identify a process instance across PID reuse and reboots: the boot id and the start time
+        of the process in clock ticks since boot, field 22 of /proc/<pid>/stat.
+        Returns None if the process does not exist or /proc is not available.
+    """
+    try:
+        with open('/proc/%d/stat' % pid, 'r') as f:
+            stat = f.read()
+        with open('/proc/sys/kernel/random/boot_id', 'r') as f:
+            boot_id = f.read().strip()
+    except OSError:
+        return None
+    # the command name in field 2 may contain spaces and parentheses
+    fields = stat[stat.rfind(')') + 2:].split()
+    return '%s/%s' % (boot_id, fields[22 - 3])
+
+
+def reap_process(process: subprocess.Popen, block: bool = True) -> bool:
+    """
+    Reap an exited process with wait4, so that its resource usage is kept in process.rusage.
+    The usage includes all descendants the process waited for, e.g., the tools under bash.
+
+    Args:
+        process (subprocess.Popen): The process to reap.
+        block (bool, optional): If False, return immediately if the process is still running. Defaults to True.
+
+    Returns:
+        bool: True if the process is reaped.
+    """
+    if process.returncode is not None:
+        return True
+    try:
+        pid, status, rusage = os.wait4(process.pid, 0 if block else os.WNOHANG)
+    except ChildProcessError:
+        # already reaped elsewhere, the usage is lost
+        process.wait()
+        return True
+    if pid == 0:
+        return False
+    process.returncode = os.waitstatus_to_exitcode(status)
+    process.rusage = rusage
+    return True
+
+
+def get_process_usage(process: subprocess.Popen, wall_time: float) -> dict:
+    """
+        Summarize the resource usage of a reaped process tree.
+        The CPU times add up the whole tree, but the kernel only keeps the largest RSS of a single process
+        of the tree (ru_maxrss), not the peak of the tree, so max_process_rss_mb underestimates parallel tools.
+    """
+    usage = {'wall_time_s': round(wall_time, 3)}
+    rusage = getattr(process, 'rusage', None)
+    if rusage is not None:
+        usage.update({
+            'user_time_s': round(rusage.ru_utime, 3),
+            'sys_time_s': round(rusage.ru_stime, 3),
+            'max_process_rss_mb': round(rusage.ru_maxrss / 1024, 1),  # ru_maxrss is in KB on Linux
+        })
+    usage['returncode'] = process.returncode
+    return usage
+
+
+def wait_process(
+    process: subprocess.Popen,
+    timeout: float,
+    cancel_tokens: list = None,
+    interval: float = 1,
+) -> bool:
+    """
+    Block until the process exits, the timeout expires or any cancel token is cancelled.
+
+    Args:
+        process (subprocess.Popen): The process to wait on.
+        timeout (float): The maximal duration in seconds to wait.
+        cancel_tokens (list, optional): CancelToken objects that abort the wait. Defaults to None.
+        interval (float, optional): Polling interval in seconds, only used when pidfd is unavailable. Defaults to 1.
+
+    Returns:
+        bool: True if the process exited (and is reaped, see reap_process), False on timeout or cancellation.
+    """
+    cancel_tokens = [token for token in (cancel_tokens or []) if token is not None]
+    deadline = timestamp() + timeout
+
+    def is_cancelled():
+        return any(token.cancelled for token in cancel_tokens)
+
+    pidfd = open_pidfd(process.pid)
+    if pidfd is None:
+        # fallback: poll the child in short slices, waking up early on cancellation
+        while not is_cancelled():
+            if reap_process(process, block=False):
+                return True
+            remaining = deadline - timestamp()
+            if remaining <= 0:
+                return False
+            select.select(cancel_tokens, [], [], min(interval, remaining))
+        return False
+
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(pidfd, selectors.EVENT_READ)
+            for token in cancel_tokens:
+                selector.register(token, selectors.EVENT_READ)
+
+            while not is_cancelled():
+                remaining = deadline - timestamp()
+                if remaining <= 0:
+                    return False
+                for key, _ in selector.select(remaining):
+                    if key.fileobj == pidfd:
+                        reap_process(process)
+                        return True
+            return False
+    finally:
+        os.close(pidfd)
+
+
+async def wait_process_async(
+    process: subprocess.Popen,
+    timeout: float,
+    cancel_tokens: list = None,
+) -> bool:
+    """
+    Asyncio counterpart of wait_process, the pidfd is watched by the event loop.
+
+    Args:
+        process (subprocess.Popen): The process to wait on.
+        timeout (float): The maximal duration in seconds to wait.
+        cancel_tokens (list, optional): CancelToken objects that abort the wait. Defaults to None.
+
+    Returns:
+        bool: True if the process exited (and is reaped), False on timeout or cancellation.
+    """
+    pidfd = open_pidfd(process.pid)
+    if pidfd is None:
+        return await asyncio.to_thread(wait_process, process, timeout, cancel_tokens)
+
+    cancel_tokens = [token for token in (cancel_tokens or []) if token is not None]
+    loop = asyncio.get_running_loop()
+    exited = loop.create_future()
+    cancelled = loop.create_future()
+
+    def on_exit():
+        if not exited.done():
+            exited.set_result(None)
+
+    def on_cancel():
+        # tokens may be cancelled from any thread
+        loop.call_soon_threadsafe(lambda: cancelled.done() or cancelled.set_result(None))
+
+    loop.add_reader(pidfd, on_exit)
+    for token in cancel_tokens:
+        token.add_callback(on_cancel)
+    try:
+        done, _ = await asyncio.wait(
+            {exited, cancelled},
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if exited in done:
+            reap_process(process)
+            return True
+        return False
+    finally:
+        for token in cancel_tokens:
+            token.remove_callback(on_cancel)
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+        exited.cancel()
+        cancelled.cancel()
+
+
+def signal_process_group(pgid: int, sig: int) -> bool:
+    """
+        Send a signal to a process group, return False if the group is gone.
+    """
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def kill_process_tree(process: subprocess.Popen, grace: float = 10) -> None:
+    """
+    Reclaim the whole process tree of a process started in its own session (see execute).
+    Send SIGTERM to the process group, escalate to SIGKILL after the grace period,
+    and reap the group leader.
+
+    Args:
+        process (subprocess.Popen): The group leader.
+        grace (float, optional): Duration in seconds between SIGTERM and SIGKILL. Defaults to 10.
+    """
+    pgid = process.pid
+    if signal_process_group(pgid, signal.SIGTERM):
+        wait_process(process, grace)
+    # stragglers may survive their leader, e.g., tee or tool daemons
+    signal_process_group(pgid, signal.SIGKILL)
+    reap_process(process)
+
+
+async def kill_process_tree_async(process: subprocess.Popen, grace: float = 10) -> None:
+    """
+        Asyncio counterpart of kill_process_tree.
+    """
+    pgid = process.pid
+    if signal_process_group(pgid, signal.SIGTERM):
+        await wait_process_async(process, grace)
+    signal_process_group(pgid, signal.SIGKILL)
+    await wait_process_async(process, grace)
+    reap_process(process)